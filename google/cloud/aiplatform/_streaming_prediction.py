@@ -16,7 +16,11 @@
 #
 """Streaming prediction functions."""
 
-from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+import asyncio
+import contextlib
+import queue
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 from google.cloud.aiplatform_v1.services import prediction_service
 from google.cloud.aiplatform_v1.types import (
@@ -26,6 +30,10 @@ from google.cloud.aiplatform_v1.types import (
     types as aiplatform_types,
 )
 
+# Seconds the reader of a buffered stream waits for room in the buffer before
+# checking again whether the stream was closed.
+_BUFFER_PUT_TIMEOUT = 0.1
+
 
 def value_to_tensor(value: Any) -> aiplatform_types.Tensor:
     """Converts a Python value to `Tensor`.
@@ -60,26 +68,209 @@ def value_to_tensor(value: Any) -> aiplatform_types.Tensor:
 def tensor_to_value(tensor_pb: aiplatform_types.Tensor) -> Any:
     """Converts `Tensor` to a Python value.
 
+    The tensor is decoded iteratively, which avoids a Python call per nested
+    tensor.
+
     Args:
         tensor_pb: A `Tensor` object
 
     Returns:
         A corresponding Python object
     """
-    list_of_fields = tensor_pb.ListFields()
-    if not list_of_fields:
-        return None
-    descriptor, value = tensor_pb.ListFields()[0]
-    if descriptor.name == "list_val":
-        return [tensor_to_value(x) for x in value]
-    elif descriptor.name == "struct_val":
-        return {k: tensor_to_value(v) for k, v in value.items()}
-    if not isinstance(value, Sequence):
-        raise TypeError(f"Unexpected non-list tensor value {value}")
-    if len(value) == 1:
-        return value[0]
-    else:
-        return value
+    root = [None]
+    # Each entry is the container and key receiving the value of a tensor.
+    stack = [(root, 0, tensor_pb)]
+    while stack:
+        container, key, node = stack.pop()
+        list_of_fields = node.ListFields()
+        if not list_of_fields:
+            container[key] = None
+            continue
+        descriptor, value = list_of_fields[0]
+        if descriptor.name == "struct_val":
+            result = container[key] = dict.fromkeys(value)
+            stack.extend((result, k, v) for k, v in value.items())
+        elif descriptor.name == "list_val":
+            result = container[key] = [None] * len(value)
+            stack.extend(zip([result] * len(value), range(len(value)), value))
+        elif descriptor.label != descriptor.LABEL_REPEATED:
+            raise TypeError(f"Unexpected non-list tensor value {value}")
+        elif len(value) == 1:
+            container[key] = value[0]
+        else:
+            container[key] = value
+    return root[0]
+
+
+@contextlib.asynccontextmanager
+async def aclosing(stream: AsyncIterator[Any]) -> AsyncIterator[AsyncIterator[Any]]:
+    """Closes an async generator on exit, like `contextlib.aclosing` in Python 3.10.
+
+    Async generators are not closed when their consumer stops iterating, so
+    streams are wrapped in this context manager to cancel the underlying call
+    right away.
+    """
+    try:
+        yield stream
+    finally:
+        await stream.aclose()
+
+
+def _check_buffer_size(buffer_size: Optional[int]) -> None:
+    """Raises if `buffer_size` is negative. `None` and 0 disable read-ahead."""
+    if buffer_size is not None and buffer_size < 0:
+        raise ValueError("`buffer_size` must not be negative.")
+
+
+def _cancel(responses: Any) -> None:
+    """Cancels a streaming call, if the response stream supports it."""
+    cancel = getattr(responses, "cancel", None)
+    if cancel is not None:
+        cancel()
+
+
+class _BufferedResponseStream:
+    """Reads a response stream ahead of the consumer in a background thread.
+
+    At most `buffer_size` responses are buffered. When the buffer is full the
+    reader stops pulling from the stream, so gRPC flow control holds back the
+    server until the consumer catches up.
+    """
+
+    def __init__(self, responses: Iterator[Any], buffer_size: int):
+        """Starts reading the responses ahead of the consumer.
+
+        Raises:
+            ValueError: If `buffer_size` is less than 1.
+        """
+        if buffer_size < 1:
+            raise ValueError("`buffer_size` must be at least 1.")
+        self._responses = responses
+        self._buffer = queue.Queue(maxsize=buffer_size)
+        self._closed = threading.Event()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        try:
+            for response in self._responses:
+                self._put(response, None)
+                if self._closed.is_set():
+                    return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._put(None, exc)
+        else:
+            self._put(None, None)
+
+    def _put(self, response: Any, exc: Optional[Exception]) -> None:
+        while not self._closed.is_set():
+            try:
+                self._buffer.put((response, exc), timeout=_BUFFER_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            response, exc = self._buffer.get()
+            if exc is not None:
+                raise exc
+            if response is None:
+                return
+            yield response
+
+    def close(self) -> None:
+        """Stops the reader and cancels the call."""
+        self._closed.set()
+        _cancel(self._responses)
+        # Frees the buffered responses and makes room for a waiting reader,
+        # which then sees `_closed` and stops.
+        while True:
+            try:
+                self._buffer.get_nowait()
+            except queue.Empty:
+                break
+
+
+def _predict_stream(
+    prediction_service_client: prediction_service.PredictionServiceClient,
+    request: prediction_service_types.StreamingPredictRequest,
+    buffer_size: Optional[int] = None,
+) -> Iterator[prediction_service_types.StreamingPredictResponse]:
+    """Yields the responses of a streaming prediction call.
+
+    The call is cancelled as soon as the generator is closed before the
+    stream is exhausted, e.g. when the consumer stops iterating.
+
+    Raises:
+        ValueError: If `buffer_size` is negative.
+    """
+    _check_buffer_size(buffer_size)
+    responses = prediction_service_client.server_streaming_predict(request=request)
+    stream = _BufferedResponseStream(responses, buffer_size) if buffer_size else None
+    exhausted = False
+    try:
+        yield from stream if stream else responses
+        exhausted = True
+    finally:
+        if stream:
+            stream.close()
+        elif not exhausted:
+            _cancel(responses)
+
+
+async def _predict_stream_async(
+    prediction_service_async_client: prediction_service.PredictionServiceAsyncClient,
+    request: prediction_service_types.StreamingPredictRequest,
+    buffer_size: Optional[int] = None,
+) -> AsyncIterator[prediction_service_types.StreamingPredictResponse]:
+    """Asynchronously yields the responses of a streaming prediction call.
+
+    The call is cancelled as soon as the generator is closed before the
+    stream is exhausted, e.g. when the consumer stops iterating.
+
+    Raises:
+        ValueError: If `buffer_size` is negative.
+    """
+    _check_buffer_size(buffer_size)
+    responses = await prediction_service_async_client.server_streaming_predict(
+        request=request
+    )
+    if not buffer_size:
+        exhausted = False
+        try:
+            async for response in responses:
+                yield response
+            exhausted = True
+        finally:
+            if not exhausted:
+                _cancel(responses)
+        return
+
+    buffer = asyncio.Queue(maxsize=buffer_size)
+
+    async def read():
+        try:
+            async for response in responses:
+                await buffer.put((response, None))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            await buffer.put((None, exc))
+        else:
+            await buffer.put((None, None))
+
+    reader = asyncio.ensure_future(read())
+    try:
+        while True:
+            response, exc = await buffer.get()
+            if exc is not None:
+                raise exc
+            if response is None:
+                return
+            yield response
+    finally:
+        if not reader.done():
+            reader.cancel()
+            _cancel(responses)
 
 
 def predict_stream_of_tensor_lists_from_single_tensor_list(
@@ -87,6 +278,7 @@ def predict_stream_of_tensor_lists_from_single_tensor_list(
     endpoint_name: str,
     tensor_list: List[aiplatform_types.Tensor],
     parameters_tensor: Optional[aiplatform_types.Tensor] = None,
+    buffer_size: Optional[int] = None,
 ) -> Iterator[List[aiplatform_types.Tensor]]:
     """Predicts a stream of lists of `Tensor` objects from a single list of `Tensor` objects.
 
@@ -95,6 +287,9 @@ def predict_stream_of_tensor_lists_from_single_tensor_list(
         parameters_tensor: Optional. Prediction parameters in `Tensor` form.
         prediction_service_client: A PredictionServiceClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer in a background thread. If not set or 0, responses are
+            only read when the consumer asks for them.
 
     Yields:
         A generator of model prediction `Tensor` lists.
@@ -104,7 +299,11 @@ def predict_stream_of_tensor_lists_from_single_tensor_list(
         inputs=tensor_list,
         parameters=parameters_tensor,
     )
-    for response in prediction_service_client.server_streaming_predict(request=request):
+    for response in _predict_stream(
+        prediction_service_client=prediction_service_client,
+        request=request,
+        buffer_size=buffer_size,
+    ):
         yield response.outputs
 
 
@@ -113,6 +312,7 @@ async def predict_stream_of_tensor_lists_from_single_tensor_list_async(
     endpoint_name: str,
     tensor_list: List[aiplatform_types.Tensor],
     parameters_tensor: Optional[aiplatform_types.Tensor] = None,
+    buffer_size: Optional[int] = None,
 ) -> AsyncIterator[List[aiplatform_types.Tensor]]:
     """Asynchronously predicts a stream of lists of `Tensor` objects from a single list of `Tensor` objects.
 
@@ -121,6 +321,9 @@ async def predict_stream_of_tensor_lists_from_single_tensor_list_async(
         parameters_tensor: Optional. Prediction parameters in `Tensor` form.
         prediction_service_async_client: A PredictionServiceAsyncClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer in a background task. If not set or 0, responses are
+            only read when the consumer asks for them.
 
     Yields:
         A generator of model prediction `Tensor` lists.
@@ -130,10 +333,15 @@ async def predict_stream_of_tensor_lists_from_single_tensor_list_async(
         inputs=tensor_list,
         parameters=parameters_tensor,
     )
-    async for response in await prediction_service_async_client.server_streaming_predict(
-        request=request
-    ):
-        yield response.outputs
+    async with aclosing(
+        _predict_stream_async(
+            prediction_service_async_client=prediction_service_async_client,
+            request=request,
+            buffer_size=buffer_size,
+        )
+    ) as responses:
+        async for response in responses:
+            yield response.outputs
 
 
 def predict_stream_of_dict_lists_from_single_dict_list(
@@ -141,6 +349,7 @@ def predict_stream_of_dict_lists_from_single_dict_list(
     endpoint_name: str,
     dict_list: List[Dict[str, Any]],
     parameters: Optional[Dict[str, Any]] = None,
+    buffer_size: Optional[int] = None,
 ) -> Iterator[List[Dict[str, Any]]]:
     """Predicts a stream of lists of dicts from a stream of lists of dicts.
 
@@ -149,6 +358,9 @@ def predict_stream_of_dict_lists_from_single_dict_list(
         parameters: Optional. Prediction parameters `dict` form.
         prediction_service_client: A PredictionServiceClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer. If not set or 0, responses are only read when the
+            consumer asks for them.
 
     Yields:
         A generator of model prediction dict lists.
@@ -160,6 +372,7 @@ def predict_stream_of_dict_lists_from_single_dict_list(
         endpoint_name=endpoint_name,
         tensor_list=tensor_list,
         parameters_tensor=parameters_tensor,
+        buffer_size=buffer_size,
     ):
         yield [tensor_to_value(tensor._pb) for tensor in tensor_list]
 
@@ -169,6 +382,7 @@ async def predict_stream_of_dict_lists_from_single_dict_list_async(
     endpoint_name: str,
     dict_list: List[Dict[str, Any]],
     parameters: Optional[Dict[str, Any]] = None,
+    buffer_size: Optional[int] = None,
 ) -> AsyncIterator[List[Dict[str, Any]]]:
     """Asynchronously predicts a stream of lists of dicts from a stream of lists of dicts.
 
@@ -177,19 +391,26 @@ async def predict_stream_of_dict_lists_from_single_dict_list_async(
         parameters: Optional. Prediction parameters `dict` form.
         prediction_service_async_client: A PredictionServiceAsyncClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer. If not set or 0, responses are only read when the
+            consumer asks for them.
 
     Yields:
         A generator of model prediction dict lists.
     """
     tensor_list = [value_to_tensor(d) for d in dict_list]
     parameters_tensor = value_to_tensor(parameters) if parameters else None
-    async for tensor_list in predict_stream_of_tensor_lists_from_single_tensor_list_async(
-        prediction_service_async_client=prediction_service_async_client,
-        endpoint_name=endpoint_name,
-        tensor_list=tensor_list,
-        parameters_tensor=parameters_tensor,
-    ):
-        yield [tensor_to_value(tensor._pb) for tensor in tensor_list]
+    async with aclosing(
+        predict_stream_of_tensor_lists_from_single_tensor_list_async(
+            prediction_service_async_client=prediction_service_async_client,
+            endpoint_name=endpoint_name,
+            tensor_list=tensor_list,
+            parameters_tensor=parameters_tensor,
+            buffer_size=buffer_size,
+        )
+    ) as tensor_lists:
+        async for tensor_list in tensor_lists:
+            yield [tensor_to_value(tensor._pb) for tensor in tensor_list]
 
 
 def predict_stream_of_dicts_from_single_dict(
@@ -197,6 +418,7 @@ def predict_stream_of_dicts_from_single_dict(
     endpoint_name: str,
     instance: Dict[str, Any],
     parameters: Optional[Dict[str, Any]] = None,
+    buffer_size: Optional[int] = None,
 ) -> Iterator[Dict[str, Any]]:
     """Predicts a stream of dicts from a single instance dict.
 
@@ -205,6 +427,9 @@ def predict_stream_of_dicts_from_single_dict(
         parameters: Optional. Prediction parameters `dict`.
         prediction_service_client: A PredictionServiceClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer. If not set or 0, responses are only read when the
+            consumer asks for them.
 
     Yields:
         A generator of model prediction dicts.
@@ -214,6 +439,7 @@ def predict_stream_of_dicts_from_single_dict(
         endpoint_name=endpoint_name,
         dict_list=[instance],
         parameters=parameters,
+        buffer_size=buffer_size,
     ):
         if len(dict_list) > 1:
             raise ValueError(
@@ -227,6 +453,7 @@ async def predict_stream_of_dicts_from_single_dict_async(
     endpoint_name: str,
     instance: Dict[str, Any],
     parameters: Optional[Dict[str, Any]] = None,
+    buffer_size: Optional[int] = None,
 ) -> AsyncIterator[Dict[str, Any]]:
     """Asynchronously predicts a stream of dicts from a single instance dict.
 
@@ -235,18 +462,25 @@ async def predict_stream_of_dicts_from_single_dict_async(
         parameters: Optional. Prediction parameters `dict`.
         prediction_service_async_client: A PredictionServiceAsyncClient object.
         endpoint_name: Resource name of Endpoint or PublisherModel.
+        buffer_size: Optional. The number of responses read ahead of the
+            consumer. If not set or 0, responses are only read when the
+            consumer asks for them.
 
     Yields:
         A generator of model prediction dicts.
     """
-    async for dict_list in predict_stream_of_dict_lists_from_single_dict_list_async(
-        prediction_service_async_client=prediction_service_async_client,
-        endpoint_name=endpoint_name,
-        dict_list=[instance],
-        parameters=parameters,
-    ):
-        if len(dict_list) > 1:
-            raise ValueError(
-                f"Expected to receive a single output, but got {dict_list}"
-            )
-        yield dict_list[0]
+    async with aclosing(
+        predict_stream_of_dict_lists_from_single_dict_list_async(
+            prediction_service_async_client=prediction_service_async_client,
+            endpoint_name=endpoint_name,
+            dict_list=[instance],
+            parameters=parameters,
+            buffer_size=buffer_size,
+        )
+    ) as dict_lists:
+        async for dict_list in dict_lists:
+            if len(dict_list) > 1:
+                raise ValueError(
+                    f"Expected to receive a single output, but got {dict_list}"
+                )
+            yield dict_list[0]
@@ -249,6 +249,9 @@ DEFAULT_LOCAL_RUN_GPU_COUNT = -1
 
 CUSTOM_PREDICTION_ROUTINES = "custom-prediction-routines"
 CUSTOM_PREDICTION_ROUTINES_SERVER_ERROR_HEADER_KEY = "X-AIP-CPR-SYSTEM-ERROR"
+# The latency of each stage of a prediction, in the format of
+# https://www.w3.org/TR/server-timing/.
+PREDICTION_TIMING_HEADER_KEY = "Server-Timing"
 
 # Headers' related constants for the handler usage.
 CONTENT_TYPE_HEADER_REGEX = re.compile("^[Cc]ontent-?[Tt]ype$")
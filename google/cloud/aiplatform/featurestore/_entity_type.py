@@ -15,11 +15,25 @@
 # limitations under the License.
 #
 
+from concurrent import futures
 import datetime
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+import math
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 import uuid
 from google.protobuf import timestamp_pb2
 
+from google.api_core import exceptions as api_exceptions
+from google.api_core import retry
 from google.auth import credentials as auth_credentials
 from google.protobuf import field_mask_pb2
 
@@ -36,12 +50,99 @@ from google.cloud.aiplatform import featurestore
 from google.cloud.aiplatform import initializer
 from google.cloud.aiplatform import utils
 from google.cloud.aiplatform.utils import featurestore_utils
+from google.cloud.aiplatform.utils import gcs_utils
 from google.cloud.aiplatform.utils import resource_manager_utils
 
 from google.cloud import bigquery
+from google.cloud import storage
 
 _LOGGER = base.Logger(__name__)
 _ALL_FEATURE_IDS = "*"
+# The maximum number of entity IDs of a streaming read request.
+_MAX_ENTITY_IDS_PER_READ = 100
+_DEFAULT_READ_MAX_CONCURRENCY = 8
+# The maximum number of feature values across the payloads of a write request.
+_MAX_FEATURE_VALUES_PER_WRITE = 100000
+# Leaves room under the default 4 MiB gRPC message size limit.
+_DEFAULT_WRITE_MAX_REQUEST_BYTES = 3 * 1024 * 1024
+_DEFAULT_WRITE_MAX_CONCURRENCY = 8
+# Upper bound of the bytes added by the field tag and length of a payload.
+_PAYLOAD_OVERHEAD_BYTES = 6
+# Retries applied to each request sent by `write_feature_values`. Writes are
+# idempotent, so requests failing with a transient error are sent again.
+_WRITE_FEATURE_VALUES_RETRY = retry.Retry(
+    predicate=retry.if_exception_type(
+        api_exceptions.Aborted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+    )
+)
+# The maximum number of rows of a CSV file staged by `ingest_from_df`.
+_MAX_ROWS_PER_INGEST_CSV_SHARD = 100000
+_DEFAULT_INGEST_MAX_CONCURRENCY = 8
+# Feature value types which can be imported from CSV files.
+_CSV_FEATURE_VALUE_TYPES = frozenset(("BOOL", "DOUBLE", "INT64", "STRING"))
+_ARRAY_FEATURE_VALUE_TYPES = frozenset(
+    (
+        "bool_array_value",
+        "double_array_value",
+        "int64_array_value",
+        "string_array_value",
+    )
+)
+_NUMPY_FEATURE_VALUE_TYPES = {
+    "bool_value": "bool",
+    "double_value": "float64",
+    "int64_value": "int64",
+}
+
+
+# FeatureValue fields of the values of NumPy arrays, by dtype kind.
+_NUMPY_KIND_TO_FEATURE_VALUE_TYPE = {
+    "b": "bool_value",
+    "i": "int64_value",
+    "u": "int64_value",
+    "f": "double_value",
+}
+
+
+class _FeatureColumns(NamedTuple):
+    """Feature values of entities, decoded into one column per feature."""
+
+    feature_ids: List[str]
+    entity_ids: List[str]
+    columns: List[List[Any]]
+    # The name of the set `FeatureValue.value` field of each column, or None
+    # if all values of the column are missing.
+    value_types: List[Optional[str]]
+
+    @classmethod
+    def concat(cls, feature_columns: List["_FeatureColumns"]) -> "_FeatureColumns":
+        """Concatenates the columns of several reads of the same features."""
+        first = feature_columns[0]
+        return cls(
+            feature_ids=first.feature_ids,
+            entity_ids=[
+                entity_id for chunk in feature_columns for entity_id in chunk.entity_ids
+            ],
+            columns=[
+                [value for chunk in feature_columns for value in chunk.columns[index]]
+                for index in range(len(first.columns))
+            ],
+            value_types=[
+                next(
+                    (
+                        chunk.value_types[index]
+                        for chunk in feature_columns
+                        if chunk.value_types[index]
+                    ),
+                    None,
+                )
+                for index in range(len(first.columns))
+            ],
+        )
 
 
 class _EntityType(base.VertexAiResourceNounWithFutureManager):
@@ -1208,6 +1309,8 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
         entity_id_field: Optional[str] = None,
         request_metadata: Optional[Sequence[Tuple[str, str]]] = (),
         ingest_request_timeout: Optional[float] = None,
+        gcs_staging_dir: Optional[str] = None,
+        max_concurrency: int = _DEFAULT_INGEST_MAX_CONCURRENCY,
     ) -> "_EntityType":
         """Ingest feature values from DataFrame.
 
@@ -1217,6 +1320,11 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
             as the intermediary storage for ingesting feature values
             from dataframe to featurestore.
 
+            If `gcs_staging_dir` is set, the DataFrame is instead written as
+            CSV files to that directory, which are imported and then deleted.
+            This skips the BigQuery dataset and load job, but only supports
+            BOOL, DOUBLE, INT64 and STRING features.
+
             The call will return upon ingestion completes, where the
             feature values will be ingested into the entity_type.
 
@@ -1270,11 +1378,26 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
                 Optional. Strings which should be sent along with the request as metadata.
             ingest_request_timeout (float):
                 Optional. The timeout for the ingest request in seconds.
+            gcs_staging_dir (str):
+                Optional. The Google Cloud Storage directory to stage the
+                DataFrame in, as CSV files, instead of a temporary BigQuery
+                dataset. Example: "gs://my_bucket/staging"
+            max_concurrency (int):
+                Optional. The maximum number of CSV files uploaded to
+                `gcs_staging_dir` at the same time.
 
         Returns:
             EntityType - The entityType resource object with feature values imported.
 
+        Raises:
+            ValueError: If a feature does not exist in this EntityType, if
+                `gcs_staging_dir` is set and a feature has a value type which
+                cannot be imported from CSV files, or if `max_concurrency` is
+                less than 1.
         """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+
         import pandas.api.types as pd_types
 
         try:
@@ -1285,6 +1408,25 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
                 f"{self.ingest_from_df.__name__}"
             )
 
+        self.wait()
+
+        feature_source_fields = feature_source_fields or {}
+        feature_value_types = self._get_feature_value_types(feature_ids)
+
+        if gcs_staging_dir:
+            return self._ingest_from_df_through_gcs(
+                feature_ids=feature_ids,
+                feature_time=feature_time,
+                df_source=df_source,
+                feature_value_types=feature_value_types,
+                feature_source_fields=feature_source_fields,
+                entity_id_field=entity_id_field,
+                gcs_staging_dir=gcs_staging_dir,
+                request_metadata=request_metadata,
+                ingest_request_timeout=ingest_request_timeout,
+                max_concurrency=max_concurrency,
+            )
+
         if any(
             [
                 pd_types.is_datetime64_any_dtype(df_source[column])
@@ -1299,13 +1441,10 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
             project=self.project, credentials=self.credentials
         )
 
-        self.wait()
-
-        feature_source_fields = feature_source_fields or {}
         bq_schema = []
         for feature_id in feature_ids:
             feature_field_name = feature_source_fields.get(feature_id, feature_id)
-            feature_value_type = self.get_feature(feature_id).to_dict()["valueType"]
+            feature_value_type = feature_value_types[feature_id]
             bq_schema_field = self._get_bq_schema_field(
                 feature_field_name, feature_value_type
             )
@@ -1369,6 +1508,171 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
 
         return entity_type_obj
 
+    def _get_feature_value_types(self, feature_ids: List[str]) -> Dict[str, str]:
+        """Gets the value types of features with a single list request.
+
+        Args:
+            feature_ids (List[str]):
+                Required. IDs of the features.
+
+        Returns:
+            Dict[str, str] - The value type of each feature, e.g. "INT64".
+
+        Raises:
+            ValueError: If a feature does not exist in this EntityType.
+        """
+        value_types = {
+            feature.name: feature.to_dict()["valueType"]
+            for feature in self.list_features()
+        }
+        missing_feature_ids = [
+            feature_id for feature_id in feature_ids if feature_id not in value_types
+        ]
+        if missing_feature_ids:
+            raise ValueError(
+                f"Features {missing_feature_ids} do not exist in EntityType "
+                f"{self.resource_name}."
+            )
+        return {feature_id: value_types[feature_id] for feature_id in feature_ids}
+
+    def _ingest_from_df_through_gcs(
+        self,
+        feature_ids: List[str],
+        feature_time: Union[str, datetime.datetime],
+        df_source: "pd.DataFrame",  # noqa: F821 - skip check for undefined name 'pd'
+        feature_value_types: Dict[str, str],
+        feature_source_fields: Dict[str, str],
+        entity_id_field: Optional[str],
+        gcs_staging_dir: str,
+        request_metadata: Optional[Sequence[Tuple[str, str]]],
+        ingest_request_timeout: Optional[float],
+        max_concurrency: int,
+    ) -> "_EntityType":
+        """Ingests feature values from DataFrame through CSV files staged in GCS.
+
+        The DataFrame is converted to an Arrow table once, then its row shards
+        are written as CSV files and uploaded concurrently. The files are
+        deleted once imported.
+
+        Returns:
+            EntityType - The entityType resource object with feature values imported.
+
+        Raises:
+            ValueError: If a feature has a value type which cannot be imported
+                from CSV files.
+        """
+        import pyarrow
+
+        gcs_utils.validate_gcs_path(gcs_staging_dir)
+        unsupported_feature_ids = [
+            feature_id
+            for feature_id in feature_ids
+            if feature_value_types[feature_id] not in _CSV_FEATURE_VALUE_TYPES
+        ]
+        if unsupported_feature_ids:
+            raise ValueError(
+                f"Features {unsupported_feature_ids} cannot be ingested through "
+                "CSV files, only BOOL, DOUBLE, INT64 and STRING features are "
+                "supported. Ingest them without `gcs_staging_dir` instead."
+            )
+
+        columns = [entity_id_field or "entity_id"]
+        columns.extend(
+            feature_source_fields.get(feature_id, feature_id)
+            for feature_id in feature_ids
+        )
+        if isinstance(feature_time, str):
+            columns.append(feature_time)
+        columns = list(dict.fromkeys(columns))
+        table = self._format_timestamp_columns(
+            pyarrow.Table.from_pandas(df_source[columns], preserve_index=False)
+        )
+
+        num_shards = max(1, math.ceil(table.num_rows / _MAX_ROWS_PER_INGEST_CSV_SHARD))
+        entity_type_id = self._parse_resource_name(self.resource_name)["entity_type"]
+        staging_prefix = (
+            f"{gcs_staging_dir.rstrip('/')}/temp_{entity_type_id}_{uuid.uuid4()}"
+        )
+        gcs_source_uris = [
+            f"{staging_prefix}/{index:05d}.csv" for index in range(num_shards)
+        ]
+
+        storage_client = storage.Client(
+            project=self.project, credentials=self.credentials
+        )
+        blobs = [
+            storage.Blob.from_string(uri, client=storage_client)
+            for uri in gcs_source_uris
+        ]
+
+        def upload_shard(index: int) -> None:
+            shard = table.slice(
+                index * _MAX_ROWS_PER_INGEST_CSV_SHARD, _MAX_ROWS_PER_INGEST_CSV_SHARD
+            )
+            blobs[index].upload_from_string(
+                self._table_to_csv(shard), content_type="text/csv"
+            )
+
+        try:
+            with futures.ThreadPoolExecutor(
+                max_workers=min(max_concurrency, num_shards)
+            ) as executor:
+                list(executor.map(upload_shard, range(num_shards)))
+
+            entity_type_obj = self.ingest_from_gcs(
+                feature_ids=feature_ids,
+                feature_time=feature_time,
+                gcs_source_uris=gcs_source_uris,
+                gcs_source_type="csv",
+                feature_source_fields=feature_source_fields,
+                entity_id_field=entity_id_field,
+                request_metadata=request_metadata,
+                ingest_request_timeout=ingest_request_timeout,
+            )
+
+        finally:
+            blobs[0].bucket.delete_blobs(blobs, on_error=lambda blob: None)
+
+        return entity_type_obj
+
+    @staticmethod
+    def _format_timestamp_columns(
+        table: "pa.Table",  # noqa: F821 - skip check for undefined name 'pa'
+    ) -> "pa.Table":  # noqa: F821 - skip check for undefined name 'pa'
+        """Formats the timestamp columns of a table as RFC 3339 strings.
+
+        Timestamps without a time zone are assumed to be in UTC.
+        """
+        import pyarrow
+        from pyarrow import compute as pyarrow_compute
+
+        for index, field in enumerate(table.schema):
+            if not pyarrow.types.is_timestamp(field.type):
+                continue
+            column = pyarrow_compute.cast(
+                table.column(index),
+                pyarrow.timestamp("ms", tz="UTC"),
+                safe=False,
+            )
+            table = table.set_column(
+                index,
+                field.name,
+                pyarrow_compute.strftime(column, format="%Y-%m-%dT%H:%M:%SZ"),
+            )
+        return table
+
+    @staticmethod
+    def _table_to_csv(
+        table: "pa.Table",  # noqa: F821 - skip check for undefined name 'pa'
+    ) -> bytes:
+        """Writes a table as CSV with a header row."""
+        import pyarrow
+        from pyarrow import csv as pyarrow_csv
+
+        sink = pyarrow.BufferOutputStream()
+        pyarrow_csv.write_csv(table, sink)
+        return sink.getvalue().to_pybytes()
+
     @staticmethod
     def _get_bq_schema_field(
         name: str, feature_value_type: str
@@ -1425,24 +1729,45 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
         feature_ids: Union[str, List[str]] = "*",
         request_metadata: Optional[Sequence[Tuple[str, str]]] = (),
         read_request_timeout: Optional[float] = None,
-    ) -> "pd.DataFrame":  # noqa: F821 - skip check for undefined name 'pd'
+        max_concurrency: int = _DEFAULT_READ_MAX_CONCURRENCY,
+        return_arrow: bool = False,
+    ) -> Union[
+        "pd.DataFrame", "pa.Table"  # noqa: F821 - skip check for undefined names
+    ]:
         """Reads feature values for given feature IDs of given entity IDs in this EntityType.
 
+        A list of entity IDs is split into chunks of at most 100 IDs, which are
+        read with concurrent streaming read requests.
+
         Args:
             entity_ids (Union[str, List[str]]):
                 Required. ID for a specific entity, or a list of IDs of entities
-                to read Feature values of. The maximum number of IDs is 100 if a list.
+                to read Feature values of.
             feature_ids (Union[str, List[str]]):
                 Required. ID for a specific feature, or a list of IDs of Features in the EntityType
                 for reading feature values. Default to "*", where value of all features will be read.
             request_metadata (Sequence[Tuple[str, str]]):
                 Optional. Strings which should be sent along with the request as metadata.
             read_request_timeout (float):
-                Optional. The timeout for the read request in seconds.
+                Optional. The timeout for each read request in seconds.
+            max_concurrency (int):
+                Optional. The maximum number of streaming read requests in
+                flight when reading a list of entity IDs.
+            return_arrow (bool):
+                Optional. Default value is False. If set to True, the feature
+                values are returned as a `pyarrow.Table` with typed columns,
+                and array features as Arrow list columns.
 
         Returns:
-            pd.DataFrame: entities' feature values in DataFrame
+            pd.DataFrame: entities' feature values in DataFrame, or in a
+            pyarrow.Table if `return_arrow` is set.
+
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
         """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+
         self.wait()
         if isinstance(feature_ids, str):
             feature_ids = [feature_ids]
@@ -1467,41 +1792,191 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
                 )
             )
             header = read_feature_values_response.header
-            entity_views = [read_feature_values_response.entity_view]
-        elif isinstance(entity_ids, list):
-            streaming_read_feature_values_request = (
-                gca_featurestore_online_service.StreamingReadFeatureValuesRequest(
-                    entity_type=self.resource_name,
-                    entity_ids=entity_ids,
-                    feature_selector=feature_selector,
-                )
+            feature_columns = self._entity_views_to_columns(
+                feature_ids=[
+                    feature_descriptor.id
+                    for feature_descriptor in header.feature_descriptors
+                ],
+                entity_views_pb=[read_feature_values_response._pb.entity_view],
             )
-            streaming_read_feature_values_responses = list(
-                self._featurestore_online_client.streaming_read_feature_values(
-                    request=streaming_read_feature_values_request,
-                    metadata=request_metadata,
-                    timeout=read_request_timeout,
+        else:
+            entity_id_chunks = [
+                entity_ids[i : i + _MAX_ENTITY_IDS_PER_READ]
+                for i in range(0, len(entity_ids), _MAX_ENTITY_IDS_PER_READ)
+            ] or [entity_ids]
+
+            def _read_chunk(entity_id_chunk: List[str]) -> _FeatureColumns:
+                streaming_read_feature_values_request = (
+                    gca_featurestore_online_service.StreamingReadFeatureValuesRequest(
+                        entity_type=self.resource_name,
+                        entity_ids=entity_id_chunk,
+                        feature_selector=feature_selector,
+                    )
+                )
+                responses = iter(
+                    self._featurestore_online_client.streaming_read_feature_values(
+                        request=streaming_read_feature_values_request,
+                        metadata=request_metadata,
+                        timeout=read_request_timeout,
+                    )
                 )
+                header = next(responses).header
+                # Entity views are decoded as they arrive, so the raw responses
+                # are never held all at once.
+                return self._entity_views_to_columns(
+                    feature_ids=[
+                        feature_descriptor.id
+                        for feature_descriptor in header.feature_descriptors
+                    ],
+                    entity_views_pb=(
+                        response._pb.entity_view for response in responses
+                    ),
+                )
+
+            if len(entity_id_chunks) == 1:
+                chunk_columns = [_read_chunk(entity_id_chunks[0])]
+            else:
+                with futures.ThreadPoolExecutor(
+                    max_workers=min(max_concurrency, len(entity_id_chunks))
+                ) as executor:
+                    chunk_columns = list(executor.map(_read_chunk, entity_id_chunks))
+            feature_columns = _FeatureColumns.concat(chunk_columns)
+
+        if return_arrow:
+            return self._columns_to_arrow_table(feature_columns)
+        return self._columns_to_dataframe(feature_columns)
+
+    @staticmethod
+    def _entity_views_to_columns(
+        feature_ids: List[str],
+        entity_views_pb: Iterable[Any],
+    ) -> "_FeatureColumns":
+        """Decodes entity views into one column of values per feature.
+
+        Values are read from the raw protobuf messages, without building
+        proto-plus wrappers or a dict per entity.
+
+        Args:
+            feature_ids (List[str]):
+                Required. A list of feature ids corresponding to the feature values for each entity in entity_views.
+            entity_views_pb (Iterable[Any]):
+                Required. Raw `EntityView` protobuf messages with Feature
+                values, e.g. `response._pb.entity_view`.
+
+        Returns:
+            _FeatureColumns - the entity ids and feature values by column.
+        """
+        entity_ids = []
+        columns = [[] for _ in feature_ids]
+        value_types = [None] * len(feature_ids)
+        for entity_view_pb in entity_views_pb:
+            entity_ids.append(entity_view_pb.entity_id)
+            data_pb = entity_view_pb.data
+            for index, column in enumerate(columns):
+                if index >= len(data_pb):
+                    column.append(None)
+                    continue
+                # An unset value is an empty message whose oneof is not set.
+                value_pb = data_pb[index].value
+                value_type = value_pb.WhichOneof("value")
+                if value_type is None:
+                    column.append(None)
+                    continue
+                value = getattr(value_pb, value_type)
+                if value_type in _ARRAY_FEATURE_VALUE_TYPES:
+                    value = list(value.values)
+                column.append(value)
+                value_types[index] = value_type
+        return _FeatureColumns(
+            feature_ids=list(feature_ids),
+            entity_ids=entity_ids,
+            columns=columns,
+            value_types=value_types,
+        )
+
+    @staticmethod
+    def _columns_to_dataframe(
+        feature_columns: "_FeatureColumns",
+    ) -> "pd.DataFrame":  # noqa: F821 - skip check for undefined name 'pd'
+        """Builds a dataframe from decoded feature columns.
+
+        Scalar numeric and boolean features are stored in typed NumPy arrays.
+        Integer and double features with missing values are stored as floats
+        with NaN, and other features as Python objects.
+
+        Raises:
+            ImportError: If pandas is not installed when using this method.
+        """
+        try:
+            import numpy as np
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                f"Pandas is not installed. Please install pandas to use "
+                f"{_EntityType._construct_dataframe.__name__}"
             )
-            header = streaming_read_feature_values_responses[0].header
-            entity_views = [
-                response.entity_view
-                for response in streaming_read_feature_values_responses[1:]
-            ]
 
-        feature_ids = [
-            feature_descriptor.id for feature_descriptor in header.feature_descriptors
-        ]
+        data = {"entity_id": feature_columns.entity_ids}
+        for feature_id, column, value_type in zip(
+            feature_columns.feature_ids,
+            feature_columns.columns,
+            feature_columns.value_types,
+        ):
+            dtype = _NUMPY_FEATURE_VALUE_TYPES.get(value_type)
+            if dtype is not None:
+                if None not in column:
+                    column = np.array(column, dtype=dtype)
+                elif dtype != "bool":
+                    column = np.array(
+                        [np.nan if value is None else value for value in column],
+                        dtype="float64",
+                    )
+            data[feature_id] = column
+        return pd.DataFrame(
+            data=data, columns=["entity_id"] + feature_columns.feature_ids
+        )
+
+    @staticmethod
+    def _columns_to_arrow_table(
+        feature_columns: "_FeatureColumns",
+    ) -> "pa.Table":  # noqa: F821 - skip check for undefined name 'pa'
+        """Builds a pyarrow.Table with one typed column per feature.
+
+        Raises:
+            ImportError: If pyarrow is not installed when using this method.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(
+                "Pyarrow is not installed. Please install pyarrow to read "
+                "feature values as a pyarrow.Table."
+            )
 
-        return self._construct_dataframe(
-            feature_ids=feature_ids,
-            entity_views=entity_views,
+        arrow_types = {
+            "bool_value": pa.bool_(),
+            "double_value": pa.float64(),
+            "int64_value": pa.int64(),
+            "string_value": pa.string(),
+            "bytes_value": pa.binary(),
+            "bool_array_value": pa.list_(pa.bool_()),
+            "double_array_value": pa.list_(pa.float64()),
+            "int64_array_value": pa.list_(pa.int64()),
+            "string_array_value": pa.list_(pa.string()),
+        }
+        arrays = [pa.array(feature_columns.entity_ids, type=pa.string())]
+        for column, value_type in zip(
+            feature_columns.columns, feature_columns.value_types
+        ):
+            arrays.append(pa.array(column, type=arrow_types.get(value_type, pa.null())))
+        return pa.Table.from_arrays(
+            arrays, names=["entity_id"] + feature_columns.feature_ids
         )
 
     @staticmethod
     def _construct_dataframe(
         feature_ids: List[str],
-        entity_views: List[
+        entity_views: Iterable[
             gca_featurestore_online_service.ReadFeatureValuesResponse.EntityView
         ],
     ) -> "pd.DataFrame":  # noqa: F821 - skip check for undefined name 'pd'
@@ -1510,8 +1985,8 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
         Args:
             feature_ids (List[str]):
                 Required. A list of feature ids corresponding to the feature values for each entity in entity_views.
-            entity_views (List[gca_featurestore_online_service.ReadFeatureValuesResponse.EntityView]):
-                Required. A list of Entity views with Feature values.
+            entity_views (Iterable[gca_featurestore_online_service.ReadFeatureValuesResponse.EntityView]):
+                Required. Entity views with Feature values.
                 For each Entity view, it may be
                 the entity in the Featurestore if values for all
                 Features were requested, or a projection of the
@@ -1525,30 +2000,12 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
             pd.DataFrame - entities feature values in DataFrame
         )
         """
-
-        try:
-            import pandas as pd
-        except ImportError:
-            raise ImportError(
-                f"Pandas is not installed. Please install pandas to use "
-                f"{_EntityType._construct_dataframe.__name__}"
+        return _EntityType._columns_to_dataframe(
+            _EntityType._entity_views_to_columns(
+                feature_ids=feature_ids,
+                entity_views_pb=(entity_view._pb for entity_view in entity_views),
             )
-
-        data = []
-        for entity_view in entity_views:
-            entity_data = {"entity_id": entity_view.entity_id}
-            for feature_id, feature_data in zip(feature_ids, entity_view.data):
-                if feature_data._pb.HasField("value"):
-                    value_type = feature_data.value._pb.WhichOneof("value")
-                    feature_value = getattr(feature_data.value, value_type)
-                    if hasattr(feature_value, "values"):
-                        feature_value = feature_value.values
-                    entity_data[feature_id] = feature_value
-                else:
-                    entity_data[feature_id] = None
-            data.append(entity_data)
-
-        return pd.DataFrame(data=data, columns=["entity_id"] + feature_ids)
+        )
 
     def write_feature_values(
         self,
@@ -1574,9 +2031,16 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
             "pd.DataFrame",  # type: ignore # noqa: F821 - skip check for undefined name 'pd'
         ],
         feature_time: Union[str, datetime.datetime] = None,
+        max_payloads_per_request: Optional[int] = None,
+        max_request_bytes: int = _DEFAULT_WRITE_MAX_REQUEST_BYTES,
+        max_concurrency: int = _DEFAULT_WRITE_MAX_CONCURRENCY,
     ) -> "EntityType":  # noqa: F821
         """Streaming ingestion. Write feature values directly to Feature Store.
 
+        The payloads are split into requests that stay under the service
+        limits, which are sent concurrently. Requests failing with a transient
+        error are retried.
+
         ```
         my_entity_type = aiplatform.EntityType(
             entity_type_name="my_entity_type_id",
@@ -1696,18 +2160,33 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
                 or a pandas Dataframe, where the index column holds the unique entity
                 ID strings and each remaining column represents a feature.  Each row
                 in the pandas Dataframe represents an entity, which has an entity ID
-                and its associated feature values. Currently, a single payload can be
-                written in a single request.
+                and its associated feature values.
             feature_time Union[str, datetime.datetime]:
                 Optional. Either column name in DataFrame or Dict which contains timestamp value,
                 or datetime to apply to the entire DataFrame or Dict.
                 Timestamp will be applied to generate_timestmap in all FeatureValue.
                 If not provided, curreent timestamp is used. This param is not used
                 when instances is List[WriteFeatureValuesPayload].
+            max_payloads_per_request (int):
+                Optional. The maximum number of payloads sent in one write
+                request. By default, requests are only limited by
+                `max_request_bytes` and the service limit of 100,000 feature
+                values per request.
+            max_request_bytes (int):
+                Optional. The maximum size in bytes of the payloads of a write
+                request. A payload larger than this is sent on its own.
+            max_concurrency (int):
+                Optional. The maximum number of write requests in flight.
 
         Returns:
             EntityType - The updated EntityType object.
+
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
         """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+
         if isinstance(instances, Dict):
             payloads = self._generate_payloads(
                 instances=instances, feature_time=feature_time
@@ -1715,20 +2194,39 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
         elif isinstance(instances, List):
             payloads = instances
         else:
-            instances_dict = instances.to_dict(orient="index")
-            payloads = self._generate_payloads(
-                instances=instances_dict, feature_time=feature_time
+            payloads = self._generate_payloads_from_df(
+                df=instances, feature_time=feature_time
             )
 
+        batches = self._batch_payloads(
+            payloads=payloads,
+            max_payloads_per_request=max_payloads_per_request,
+            max_request_bytes=max_request_bytes,
+        ) or [payloads]
+
         _LOGGER.log_action_start_against_resource(
             "Writing",
             "feature values",
             self,
         )
 
-        self._featurestore_online_client.write_feature_values(
-            entity_type=self.resource_name, payloads=payloads
-        )
+        def _write_batch(
+            batch: List[gca_featurestore_online_service.WriteFeatureValuesPayload],
+        ) -> None:
+            self._featurestore_online_client.write_feature_values(
+                entity_type=self.resource_name,
+                payloads=batch,
+                retry=_WRITE_FEATURE_VALUES_RETRY,
+            )
+
+        if len(batches) == 1:
+            _write_batch(batches[0])
+        else:
+            with futures.ThreadPoolExecutor(
+                max_workers=min(max_concurrency, len(batches))
+            ) as executor:
+                # Consumes the results to raise the first failure.
+                list(executor.map(_write_batch, batches))
 
         _LOGGER.log_action_completed_against_resource("feature values", "written", self)
 
@@ -1804,6 +2302,132 @@ class _EntityType(base.VertexAiResourceNounWithFutureManager):
 
         return payloads
 
+    @classmethod
+    def _generate_payloads_from_df(
+        cls,
+        df: "pd.DataFrame",  # noqa: F821 - skip check for undefined name 'pd'
+        feature_time: Union[str, datetime.datetime] = None,
+    ) -> List[gca_featurestore_online_service.WriteFeatureValuesPayload]:
+        """Helper method used to generate GAPIC WriteFeatureValuesPayloads from
+        a pandas DataFrame.
+
+        Values are converted column by column. Boolean, integer and float
+        columns are written to the payloads without inspecting each value,
+        other columns are converted value by value.
+
+        Args:
+            df (pd.DataFrame):
+                Required. DataFrame whose index holds the entity IDs and whose
+                columns are the features.
+            feature_time Union[str, datetime.datetime]:
+                Optional. Either string representing column name which stores
+                feature timestamp, or timestamp to apply to entire DataFrame.
+        Returns:
+            List[gca_featurestore_online_service.WriteFeatureValuesPayload] -
+            A list of WriteFeatureValuesPayload objects ready to be written to the Feature Store.
+        """
+        import numpy as np
+
+        metadata_pb = None
+        row_metadata_pbs = None
+        if feature_time and cls._is_timestamp(feature_time):
+            metadata_pb = gca_featurestore_online_service.FeatureValue.Metadata(
+                generate_time=feature_time
+            )._pb
+        elif feature_time is not None and feature_time in df.columns:
+            row_metadata_pbs = [
+                gca_featurestore_online_service.FeatureValue.Metadata(
+                    generate_time=timestamp
+                )._pb
+                if cls._is_timestamp(timestamp)
+                else None
+                for timestamp in df[feature_time].tolist()
+            ]
+
+        # Each column is either the name of the FeatureValue field its values
+        # are set to, or None and the converted FeatureValue messages.
+        columns = []
+        for feature_id in df.columns:
+            if feature_id == feature_time:
+                continue
+            column = df[feature_id]
+            field_name = None
+            if isinstance(column.dtype, np.dtype):
+                field_name = _NUMPY_KIND_TO_FEATURE_VALUE_TYPE.get(column.dtype.kind)
+            values = column.tolist()
+            if field_name is None:
+                values = [
+                    cls._convert_value_to_gapic_feature_value(
+                        feature_id=feature_id, value=value
+                    )._pb
+                    for value in values
+                ]
+            columns.append((feature_id, field_name, values))
+
+        payload_class = gca_featurestore_online_service.WriteFeatureValuesPayload
+        payloads = []
+        for row, entity_id in enumerate(df.index.tolist()):
+            payload_pb = payload_class.pb()(entity_id=entity_id)
+            feature_values = payload_pb.feature_values
+            if row_metadata_pbs is not None:
+                metadata_pb = row_metadata_pbs[row]
+            for feature_id, field_name, values in columns:
+                feature_value_pb = feature_values[feature_id]
+                if field_name is None:
+                    feature_value_pb.CopyFrom(values[row])
+                else:
+                    setattr(feature_value_pb, field_name, values[row])
+                if metadata_pb is not None:
+                    feature_value_pb.metadata.CopyFrom(metadata_pb)
+            payloads.append(payload_class.wrap(payload_pb))
+        return payloads
+
+    @staticmethod
+    def _batch_payloads(
+        payloads: List[gca_featurestore_online_service.WriteFeatureValuesPayload],
+        max_payloads_per_request: Optional[int] = None,
+        max_request_bytes: int = _DEFAULT_WRITE_MAX_REQUEST_BYTES,
+    ) -> List[List[gca_featurestore_online_service.WriteFeatureValuesPayload]]:
+        """Splits payloads into batches that each fit in a write request.
+
+        Args:
+            payloads (List[gca_featurestore_online_service.WriteFeatureValuesPayload]):
+                Required. The payloads to write.
+            max_payloads_per_request (int):
+                Optional. The maximum number of payloads of a batch.
+            max_request_bytes (int):
+                Optional. The maximum serialized size of the payloads of a
+                batch. A larger payload makes up a batch on its own.
+
+        Returns:
+            List[List[gca_featurestore_online_service.WriteFeatureValuesPayload]] -
+            The batches, in the order of the payloads.
+        """
+        batches = []
+        batch = []
+        batch_bytes = 0
+        batch_feature_values = 0
+        for payload in payloads:
+            payload_pb = getattr(payload, "_pb", payload)
+            payload_bytes = payload_pb.ByteSize() + _PAYLOAD_OVERHEAD_BYTES
+            payload_feature_values = len(payload_pb.feature_values)
+            if batch and (
+                len(batch) == max_payloads_per_request
+                or batch_bytes + payload_bytes > max_request_bytes
+                or batch_feature_values + payload_feature_values
+                > _MAX_FEATURE_VALUES_PER_WRITE
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+                batch_feature_values = 0
+            batch.append(payload)
+            batch_bytes += payload_bytes
+            batch_feature_values += payload_feature_values
+        if batch:
+            batches.append(batch)
+        return batches
+
     @staticmethod
     def _apply_feature_timestamp(
         cls,
@@ -15,7 +15,10 @@
 # limitations under the License.
 #
 
-from typing import Dict, List, Optional, Sequence, Tuple, Union
+from concurrent import futures
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import uuid
 
 from google.auth import credentials as auth_credentials
@@ -40,6 +43,141 @@ from google.cloud.aiplatform.utils import (
 from google.cloud import bigquery
 
 _LOGGER = base.Logger(__name__)
+_DEFAULT_BATCH_SERVE_READ_MAX_CONCURRENCY = 8
+# The maximum number of record batches read ahead of the consumer of the
+# iterator returned by `batch_serve_to_df`.
+_MAX_BUFFERED_RECORD_BATCHES = 16
+# The time in seconds a stream reader waits for room in the buffer before
+# checking whether the consumer stopped iterating.
+_BUFFER_PUT_TIMEOUT = 0.1
+
+
+def _read_record_batches(
+    bigquery_storage_read_client: Any,
+    stream_names: List[str],
+    max_concurrency: int,
+    buffer_size: int = 0,
+) -> Iterator["pa.RecordBatch"]:  # noqa: F821 - skip check for undefined name 'pa'
+    """Yields the Arrow record batches of BigQuery Storage read streams.
+
+    The streams are read concurrently, and their batches are yielded as they
+    arrive, so batches of different streams are interleaved. Readers stop once
+    the generator is closed.
+
+    Args:
+        bigquery_storage_read_client (bigquery_storage.BigQueryReadClient):
+            Required. The client reading the streams.
+        stream_names (List[str]):
+            Required. The names of the streams of an Arrow read session.
+        max_concurrency (int):
+            Required. The maximum number of streams read at the same time.
+        buffer_size (int):
+            Optional. The maximum number of batches read ahead of the
+            consumer. If 0, the number of buffered batches is unbounded.
+
+    Yields:
+        pa.RecordBatch - The record batches of the streams.
+    """
+    if not stream_names:
+        return
+
+    buffer = queue.Queue(maxsize=buffer_size)
+    closed = threading.Event()
+
+    def put(item: Tuple[Any, Optional[Exception]]) -> None:
+        while not closed.is_set():
+            try:
+                buffer.put(item, timeout=_BUFFER_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def read(stream_name: str) -> None:
+        try:
+            if closed.is_set():
+                return
+            reader = bigquery_storage_read_client.read_rows(stream_name)
+            for page in reader.rows().pages:
+                put((page.to_arrow(), None))
+                if closed.is_set():
+                    return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            put((None, exc))
+        else:
+            put((None, None))
+
+    executor = futures.ThreadPoolExecutor(
+        max_workers=min(max_concurrency, len(stream_names))
+    )
+    try:
+        for stream_name in stream_names:
+            executor.submit(read, stream_name)
+        remaining_streams = len(stream_names)
+        while remaining_streams:
+            batch, exc = buffer.get()
+            if exc is not None:
+                raise exc
+            if batch is None:
+                remaining_streams -= 1
+            else:
+                yield batch
+    finally:
+        closed.set()
+        executor.shutdown(wait=True)
+
+
+class _BatchServeIterator:
+    """Iterator over the results of `Featurestore.batch_serve_to_df`.
+
+    The temporary BigQuery resources holding the results are deleted once the
+    iterator is exhausted or closed.
+    """
+
+    def __init__(
+        self,
+        batches: Iterator["pa.RecordBatch"],  # noqa: F821
+        clean_up: Callable[[], None],
+        return_arrow: bool,
+    ):
+        self._batches = batches
+        self._clean_up = clean_up
+        self._return_arrow = return_arrow
+        self._closed = False
+
+    def __iter__(self) -> "_BatchServeIterator":
+        return self
+
+    def __next__(
+        self,
+    ) -> Union[
+        "pd.DataFrame", "pa.RecordBatch"  # noqa: F821 - skip check for undefined names
+    ]:
+        try:
+            batch = next(self._batches)
+        except BaseException:
+            self.close()
+            raise
+        return batch if self._return_arrow else batch.to_pandas()
+
+    def close(self) -> None:
+        """Stops reading the results and deletes the temporary BigQuery resources."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._batches.close()
+        finally:
+            self._clean_up()
+
+    def __enter__(self) -> "_BatchServeIterator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        # Deletes the temporary BigQuery resources of an abandoned iterator.
+        self.close()
 
 
 class Featurestore(base.VertexAiResourceNounWithFutureManager):
@@ -1119,7 +1257,15 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
         request_metadata: Optional[Sequence[Tuple[str, str]]] = (),
         serve_request_timeout: Optional[float] = None,
         bq_dataset_id: Optional[str] = None,
-    ) -> "pd.DataFrame":  # noqa: F821 - skip check for undefined name 'pd'
+        return_arrow: bool = False,
+        return_iterator: bool = False,
+        max_concurrency: int = _DEFAULT_BATCH_SERVE_READ_MAX_CONCURRENCY,
+    ) -> Union[
+        "pd.DataFrame",  # noqa: F821 - skip check for undefined name 'pd'
+        "pa.Table",  # noqa: F821 - skip check for undefined name 'pa'
+        Iterator["pd.DataFrame"],  # noqa: F821 - skip check for undefined name 'pd'
+        Iterator["pa.RecordBatch"],  # noqa: F821 - skip check for undefined name 'pa'
+    ]:
         """Batch serves feature values to pandas DataFrame
 
         Note:
@@ -1128,6 +1274,20 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
             as the intermediary storage for batch serve feature values
             from featurestore to dataframe.
 
+            The served feature values are read with several concurrent
+            streams. With `return_iterator`, they are yielded batch by batch
+            as they are read, so results larger than memory can be consumed.
+            The temporary dataset is then deleted once the iterator is
+            exhausted or closed:
+
+                with my_featurestore.batch_serve_to_df(
+                    serving_feature_ids=serving_feature_ids,
+                    read_instances_df=read_instances_df,
+                    return_iterator=True,
+                ) as batches:
+                    for batch_df in batches:
+                        ...
+
         Args:
             serving_feature_ids (Dict[str, List[str]]):
                 Required. A user defined dictionary to define the entity_types and their features for batch serve/read.
@@ -1213,10 +1373,30 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
                 Optional. Excludes Feature values with feature generation timestamp before this timestamp. If not set, retrieve
                 oldest values kept in Feature Store. Timestamp, if present, must not have higher than millisecond precision.
 
+            return_arrow (bool):
+                Optional. If set to True, the feature values are returned as a
+                `pyarrow.Table`, or as `pyarrow.RecordBatch` objects with
+                `return_iterator`, instead of pandas DataFrames.
+            return_iterator (bool):
+                Optional. If set to True, returns an iterator over batches of
+                feature values instead of all of them at once. The iterator
+                can be closed, or used as a context manager, to stop reading
+                early.
+            max_concurrency (int):
+                Optional. The maximum number of BigQuery Storage read streams
+                read at the same time.
+
         Returns:
             pd.DataFrame: The pandas DataFrame containing feature values from batch serving.
+                A `pyarrow.Table` if `return_arrow` is set, or an iterator of
+                batches if `return_iterator` is set.
 
+        Raises:
+            ValueError: If `max_concurrency` is less than 1.
         """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+
         try:
             from google.cloud import bigquery_storage
         except ImportError:
@@ -1226,7 +1406,7 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
             )
 
         try:
-            import pyarrow  # noqa: F401 - skip check for 'pyarrow' which is required when using 'google.cloud.bigquery'
+            import pyarrow
         except ImportError:
             raise ImportError(
                 f"Pyarrow is not installed. Please install pyarrow to use "
@@ -1234,7 +1414,7 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
             )
 
         try:
-            import pandas as pd
+            import pandas as pd  # noqa: F401 - skip check for 'pandas' which is required when converting to DataFrames
         except ImportError:
             raise ImportError(
                 f"Pandas is not installed. Please install pandas to use "
@@ -1279,6 +1459,19 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
             f"{temp_bq_full_dataset_id}.{temp_bq_read_instances_table_name}"
         )
 
+        def delete_temp_bq_resources() -> None:
+            # if user didn't specify dataset, delete ephemeral dataset
+            if bq_dataset_id is None:
+                bigquery_client.delete_dataset(
+                    dataset=temp_bq_dataset.dataset_id,
+                    delete_contents=True,
+                )
+
+            # if user specified BigQuery dataset, delete ephemeral tables
+            else:
+                bigquery_client.delete_table(temp_bq_batch_serve_table_id)
+                bigquery_client.delete_table(temp_bq_read_instances_table_id)
+
         try:
 
             job = bigquery_client.load_table_from_dataframe(
@@ -1313,26 +1506,42 @@ class Featurestore(base.VertexAiResourceNounWithFutureManager):
                 ),
             )
 
-            frames = []
-            for stream in read_session_proto.streams:
-                reader = bigquery_storage_read_client.read_rows(stream.name)
-                for message in reader.rows().pages:
-                    frames.append(message.to_dataframe())
+            stream_names = [stream.name for stream in read_session_proto.streams]
 
-        finally:
-            # clean up: if user didn't specify dataset, delete ephemeral dataset
-            if bq_dataset_id is None:
-                bigquery_client.delete_dataset(
-                    dataset=temp_bq_dataset.dataset_id,
-                    delete_contents=True,
+            if return_iterator:
+                return _BatchServeIterator(
+                    batches=_read_record_batches(
+                        bigquery_storage_read_client,
+                        stream_names,
+                        max_concurrency=max_concurrency,
+                        buffer_size=_MAX_BUFFERED_RECORD_BATCHES,
+                    ),
+                    clean_up=delete_temp_bq_resources,
+                    return_arrow=return_arrow,
                 )
 
-            # clean up: if user specified BigQuery dataset, delete ephemeral tables
-            else:
-                bigquery_client.delete_table(temp_bq_batch_serve_table_id)
-                bigquery_client.delete_table(temp_bq_read_instances_table_id)
+            batches = list(
+                _read_record_batches(
+                    bigquery_storage_read_client,
+                    stream_names,
+                    max_concurrency=max_concurrency,
+                )
+            )
+
+        except BaseException:
+            delete_temp_bq_resources()
+            raise
+
+        delete_temp_bq_resources()
 
-        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(frames)
+        # Concatenating the batches into a table does not copy their data.
+        table = pyarrow.Table.from_batches(batches) if batches else pyarrow.table({})
+        del batches
+        if return_arrow:
+            return table
+        # Frees the memory of the table as it is converted, so only one copy of
+        # the feature values is kept at a time.
+        return table.to_pandas(split_blocks=True, self_destruct=True)
 
     def _get_ephemeral_bq_full_dataset_id(
         self, featurestore_id: str, project_number: str
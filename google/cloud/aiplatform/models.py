@@ -14,11 +14,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import asyncio
+from concurrent import futures
 import json
 import pathlib
+import queue
 import re
 import shutil
 import tempfile
+import threading
+import time
 import requests
 from typing import (
     Any,
@@ -34,6 +39,8 @@ from typing import (
 
 from google.api_core import operation
 from google.api_core import exceptions as api_exceptions
+from google.api_core import retry
+from google.api_core import retry_async
 from google.auth import credentials as auth_credentials
 from google.auth.transport import requests as google_auth_requests
 from google.protobuf import duration_pb2
@@ -48,8 +55,10 @@ from google.cloud.aiplatform import jobs
 from google.cloud.aiplatform import models
 from google.cloud.aiplatform import utils
 from google.cloud.aiplatform.utils import gcs_utils
+from google.cloud.aiplatform.utils import http_utils
 from google.cloud.aiplatform.utils import _explanation_utils
 from google.cloud.aiplatform.utils import _ipython_utils
+from google.cloud.aiplatform.utils import _value_utils
 from google.cloud.aiplatform import model_evaluation
 from google.cloud.aiplatform.compat.services import endpoint_service_client
 
@@ -62,6 +71,7 @@ from google.cloud.aiplatform.compat.types import (
     model as gca_model_compat,
     model_service as gca_model_service_compat,
     env_var as gca_env_var_compat,
+    prediction_service as gca_prediction_service_compat,
 )
 
 from google.cloud.aiplatform.constants import (
@@ -82,6 +92,21 @@ _SUCCESSFUL_HTTP_RESPONSE = 300
 _RAW_PREDICT_DEPLOYED_MODEL_ID_KEY = "X-Vertex-AI-Deployed-Model-Id"
 _RAW_PREDICT_MODEL_RESOURCE_KEY = "X-Vertex-AI-Model"
 _RAW_PREDICT_MODEL_VERSION_ID_KEY = "X-Vertex-AI-Model-Version-Id"
+_DEFAULT_PREDICT_MANY_SHARD_SIZE = 100
+_DEFAULT_PREDICT_MANY_MAX_CONCURRENCY = 8
+
+# Retries applied to each shard sent by `Endpoint.predict_many`.
+_PREDICT_MANY_RETRY_PREDICATE = retry.if_exception_type(
+    api_exceptions.Aborted,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.ServiceUnavailable,
+)
+_PREDICT_MANY_RETRY = retry.Retry(predicate=_PREDICT_MANY_RETRY_PREDICATE)
+_PREDICT_MANY_ASYNC_RETRY = retry_async.AsyncRetry(
+    predicate=_PREDICT_MANY_RETRY_PREDICATE
+)
 
 _LOGGER = base.Logger(__name__)
 
@@ -164,6 +189,279 @@ class Prediction(NamedTuple):
     explanations: Optional[Sequence[gca_explanation_compat.Explanation]] = None
 
 
+class PredictionBatcher:
+    """Collects instances from concurrent callers into batched predict requests.
+
+    Each call to `predict`, `submit` or `predict_async` adds the caller's
+    instances to a pending batch. A batch is sent as a single predict request
+    once it holds `max_batch_size` instances or `max_latency_ms` milliseconds
+    have passed since its first instance arrived, and the returned predictions
+    are split back out to each caller.
+
+    Example usage:
+        batcher = my_endpoint.batcher(max_batch_size=32, max_latency_ms=10)
+        # From many request threads:
+        prediction = batcher.predict(instances=[instance])
+        # Or from a coroutine:
+        prediction = await batcher.predict_async(instances=[instance])
+        ...
+        batcher.close()
+    """
+
+    def __init__(
+        self,
+        endpoint: "Endpoint",
+        max_batch_size: int,
+        max_latency_ms: float,
+        parameters: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Initializes a batcher for the given Endpoint.
+
+        Args:
+            endpoint (Endpoint):
+                Required. The Endpoint to send batched predict requests to.
+            max_batch_size (int):
+                Required. The maximum number of instances sent in one predict
+                request.
+            max_latency_ms (float):
+                Required. The maximum time in milliseconds an instance waits
+                for a batch to fill up before the batch is sent.
+            parameters (Dict):
+                Optional. The parameters that govern every prediction sent by
+                this batcher.
+            timeout (float): Optional. The timeout for each batched request in seconds.
+
+        Raises:
+            ValueError: If `max_batch_size` is less than 1 or `max_latency_ms` is negative.
+        """
+        if max_batch_size < 1:
+            raise ValueError("`max_batch_size` must be at least 1.")
+        if max_latency_ms < 0:
+            raise ValueError("`max_latency_ms` must not be negative.")
+
+        self._endpoint = endpoint
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency_ms / 1000
+        self._parameters = parameters
+        self._timeout = timeout
+
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._closed = False
+
+        self._async_batch = []
+        self._async_batch_size = 0
+        self._async_flush_handle = None
+        self._async_tasks = set()
+
+    def __enter__(self) -> "PredictionBatcher":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def submit(self, instances: List) -> futures.Future:
+        """Adds instances to the next batch without waiting for the result.
+
+        Args:
+            instances (List):
+                Required. The instances of this caller.
+
+        Returns:
+            A concurrent.futures.Future resolving to a Prediction that holds
+            the predictions for `instances`, in the same order.
+
+        Raises:
+            RuntimeError: If the batcher has been closed.
+        """
+        future = futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit instances to a closed batcher.")
+            if not self._worker:
+                self._worker = threading.Thread(
+                    target=self._run_worker,
+                    name="PredictionBatcher",
+                    daemon=True,
+                )
+                self._worker.start()
+            self._queue.put((list(instances), future))
+        return future
+
+    def predict(self, instances: List) -> Prediction:
+        """Adds instances to the next batch and waits for their predictions.
+
+        Args:
+            instances (List):
+                Required. The instances of this caller.
+
+        Returns:
+            prediction (aiplatform.Prediction):
+                Prediction with the predictions for `instances` and Model ID.
+        """
+        return self.submit(instances).result()
+
+    async def predict_async(self, instances: List) -> Prediction:
+        """Adds instances to the next batch sent with `Endpoint.predict_async`.
+
+        All coroutines sharing a batcher must run on the same event loop.
+
+        Args:
+            instances (List):
+                Required. The instances of this caller.
+
+        Returns:
+            prediction (aiplatform.Prediction):
+                Prediction with the predictions for `instances` and Model ID.
+
+        Raises:
+            RuntimeError: If the batcher has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit instances to a closed batcher.")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        instances = list(instances)
+        if (
+            self._async_batch
+            and self._async_batch_size + len(instances) > self._max_batch_size
+        ):
+            self._flush_async()
+        self._async_batch.append((instances, future))
+        self._async_batch_size += len(instances)
+
+        if self._async_batch_size >= self._max_batch_size:
+            self._flush_async()
+        elif not self._async_flush_handle:
+            self._async_flush_handle = loop.call_later(
+                self._max_latency, self._flush_async
+            )
+
+        return await future
+
+    def close(self) -> None:
+        """Sends any pending instances and stops accepting new ones."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+            if worker:
+                self._queue.put(None)
+        if worker:
+            worker.join()
+        if self._async_batch:
+            _, future = self._async_batch[0]
+            future.get_loop().call_soon_threadsafe(self._flush_async)
+
+    def _run_worker(self) -> None:
+        """Groups queued requests into batches until the batcher is closed."""
+        carry_over = None
+        closing = False
+        while not closing or carry_over:
+            item = carry_over or self._queue.get()
+            carry_over = None
+            if item is None:
+                break
+
+            batch = [item]
+            batch_size = len(item[0])
+            deadline = time.monotonic() + self._max_latency
+            while not closing and batch_size < self._max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                if batch_size + len(item[0]) > self._max_batch_size:
+                    carry_over = item
+                    break
+                batch.append(item)
+                batch_size += len(item[0])
+
+            initializer.global_pool.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch: List[Tuple[List, futures.Future]]) -> None:
+        """Sends one batched predict request and resolves the callers' futures."""
+        try:
+            prediction = self._endpoint.predict(
+                instances=[
+                    instance for instances, _ in batch for instance in instances
+                ],
+                parameters=self._parameters,
+                timeout=self._timeout,
+            )
+            results = self._split_prediction(prediction, batch)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _flush_async(self) -> None:
+        """Sends the pending asynchronous batch with `Endpoint.predict_async`."""
+        if self._async_flush_handle:
+            self._async_flush_handle.cancel()
+            self._async_flush_handle = None
+        batch = self._async_batch
+        self._async_batch = []
+        self._async_batch_size = 0
+        if batch:
+            task = asyncio.ensure_future(self._send_batch_async(batch))
+            self._async_tasks.add(task)
+            task.add_done_callback(self._async_tasks.discard)
+
+    async def _send_batch_async(self, batch: List[Tuple[List, asyncio.Future]]) -> None:
+        """Sends one batched async predict request and resolves the callers' futures."""
+        try:
+            prediction = await self._endpoint.predict_async(
+                instances=[
+                    instance for instances, _ in batch for instance in instances
+                ],
+                parameters=self._parameters,
+                timeout=self._timeout,
+            )
+            results = self._split_prediction(prediction, batch)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _split_prediction(prediction: Prediction, batch: List) -> List[Prediction]:
+        """Splits a batched Prediction into one Prediction per caller.
+
+        Raises:
+            RuntimeError: If the number of predictions does not match the
+                number of batched instances.
+        """
+        num_instances = sum(len(instances) for instances, _ in batch)
+        if len(prediction.predictions) != num_instances:
+            raise RuntimeError(
+                f"Expected {num_instances} predictions for the batched request, "
+                f"got {len(prediction.predictions)}."
+            )
+        results = []
+        start = 0
+        for instances, _ in batch:
+            end = start + len(instances)
+            results.append(
+                prediction._replace(predictions=prediction.predictions[start:end])
+            )
+            start = end
+        return results
+
+
 class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
     client_class = utils.EndpointClientWithOverride
     _resource_noun = "endpoints"
@@ -232,6 +530,7 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
 
         self.authorized_session = None
         self.raw_predict_request_url = None
+        self._http_transport = None
 
     @property
     def _prediction_client(self) -> utils.PredictionClientWithOverride:
@@ -263,6 +562,22 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
             )
         return self._prediction_async_client_value
 
+    @property
+    def http_transport(self) -> http_utils.HttpTransport:
+        """The connection-pooled transport used for HTTP prediction requests.
+
+        Defaults to the transport shared by all endpoints, see
+        `http_utils.set_default_transport`.
+        """
+        return (
+            getattr(self, "_http_transport", None) or http_utils.get_default_transport()
+        )
+
+    @http_transport.setter
+    def http_transport(self, transport: http_utils.HttpTransport) -> None:
+        self._http_transport = transport
+        self.authorized_session = None
+
     def _skipped_getter_call(self) -> bool:
         """Check if GAPIC resource was populated by call to get/list API methods
 
@@ -1541,6 +1856,7 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
         parameters: Optional[Dict] = None,
         timeout: Optional[float] = None,
         use_raw_predict: Optional[bool] = False,
+        return_numpy: bool = False,
     ) -> Prediction:
         """Make a prediction against this Endpoint.
 
@@ -1568,6 +1884,10 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
             use_raw_predict (bool):
                 Optional. Default value is False. If set to True, the underlying prediction call will be made
                 against Endpoint.raw_predict().
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
 
         Returns:
             prediction (aiplatform.Prediction):
@@ -1580,8 +1900,11 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
                 headers={"Content-Type": "application/json"},
             )
             json_response = raw_predict_response.json()
+            predictions = json_response["predictions"]
             return Prediction(
-                predictions=json_response["predictions"],
+                predictions=(
+                    _value_utils.to_numpy(predictions) if return_numpy else predictions
+                ),
                 metadata=json_response.get("metadata"),
                 deployed_model_id=raw_predict_response.headers[
                     _RAW_PREDICT_DEPLOYED_MODEL_ID_KEY
@@ -1600,20 +1923,8 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
                 parameters=parameters,
                 timeout=timeout,
             )
-            if prediction_response._pb.metadata:
-                metadata = json_format.MessageToDict(prediction_response._pb.metadata)
-            else:
-                metadata = None
-
-            return Prediction(
-                predictions=[
-                    json_format.MessageToDict(item)
-                    for item in prediction_response.predictions.pb
-                ],
-                metadata=metadata,
-                deployed_model_id=prediction_response.deployed_model_id,
-                model_version_id=prediction_response.model_version_id,
-                model_resource_name=prediction_response.model,
+            return self._prediction_from_predict_response(
+                prediction_response, return_numpy=return_numpy
             )
 
     async def predict_async(
@@ -1622,6 +1933,7 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
         *,
         parameters: Optional[Dict] = None,
         timeout: Optional[float] = None,
+        return_numpy: bool = False,
     ) -> Prediction:
         """Make an asynchronous prediction against this Endpoint.
         Example usage:
@@ -1651,6 +1963,10 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
                 [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
                 ``parameters_schema_uri``.
             timeout (float): Optional. The timeout for this request in seconds.
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
 
         Returns:
             prediction (aiplatform.Prediction):
@@ -1664,22 +1980,269 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
             parameters=parameters,
             timeout=timeout,
         )
+        return self._prediction_from_predict_response(
+            prediction_response, return_numpy=return_numpy
+        )
+
+    def predict_many(
+        self,
+        instances: List,
+        *,
+        shard_size: int = _DEFAULT_PREDICT_MANY_SHARD_SIZE,
+        max_concurrency: int = _DEFAULT_PREDICT_MANY_MAX_CONCURRENCY,
+        parameters: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        return_numpy: bool = False,
+    ) -> Prediction:
+        """Make predictions for a large list of instances against this Endpoint.
+
+        The instances are split into shards of at most `shard_size` instances,
+        which are sent as concurrent predict requests. Shards that fail with a
+        transient error are retried on their own.
+
+        Example usage:
+            response = my_endpoint.predict_many(
+                instances=[...], shard_size=100, max_concurrency=8
+            )
+            my_predictions = response.predictions
+
+        Args:
+            instances (List):
+                Required. The instances that are the input to the
+                prediction call. The schema of any single instance may be
+                specified via Endpoint's DeployedModels'
+                [Model's][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``instance_schema_uri``.
+            shard_size (int):
+                Optional. The maximum number of instances sent in one predict
+                request. It should keep each request under the DeployedModel's
+                instance limit and the 1.5 MB payload limit.
+            max_concurrency (int):
+                Optional. The maximum number of predict requests in flight.
+            parameters (Dict):
+                The parameters that govern the prediction. The schema of
+                the parameters may be specified via Endpoint's
+                DeployedModels' [Model's
+                ][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``parameters_schema_uri``.
+            timeout (float): Optional. The timeout for each request in seconds.
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
+
+        Returns:
+            prediction (aiplatform.Prediction):
+                Prediction with the returned predictions in the order of
+                `instances`. The Model ID and metadata are those of the first
+                shard.
+
+        Raises:
+            ValueError: If `shard_size` or `max_concurrency` is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+        self.wait()
+        shards = self._shard_instances(instances, shard_size)
+        if not shards:
+            return Prediction(predictions=[], deployed_model_id="")
+
+        def _predict_shard(shard: List) -> Prediction:
+            return self._prediction_from_predict_response(
+                self._prediction_client.predict(
+                    endpoint=self._gca_resource.name,
+                    instances=shard,
+                    parameters=parameters,
+                    timeout=timeout,
+                    retry=_PREDICT_MANY_RETRY,
+                )
+            )
+
+        with futures.ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(shards))
+        ) as executor:
+            shard_predictions = list(executor.map(_predict_shard, shards))
+
+        return self._merge_predictions(shard_predictions, return_numpy=return_numpy)
+
+    async def predict_many_async(
+        self,
+        instances: List,
+        *,
+        shard_size: int = _DEFAULT_PREDICT_MANY_SHARD_SIZE,
+        max_concurrency: int = _DEFAULT_PREDICT_MANY_MAX_CONCURRENCY,
+        parameters: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        return_numpy: bool = False,
+    ) -> Prediction:
+        """Make asynchronous predictions for a large list of instances.
+
+        The instances are split into shards of at most `shard_size` instances,
+        which are sent concurrently with the async prediction client. Shards
+        that fail with a transient error are retried on their own.
+
+        Example usage:
+            ```
+            response = await my_endpoint.predict_many_async(instances=[...])
+            my_predictions = response.predictions
+            ```
+
+        Args:
+            instances (List):
+                Required. The instances that are the input to the
+                prediction call. The schema of any single instance may be
+                specified via Endpoint's DeployedModels'
+                [Model's][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``instance_schema_uri``.
+            shard_size (int):
+                Optional. The maximum number of instances sent in one predict
+                request. It should keep each request under the DeployedModel's
+                instance limit and the 1.5 MB payload limit.
+            max_concurrency (int):
+                Optional. The maximum number of predict requests in flight.
+            parameters (Dict):
+                Optional. The parameters that govern the prediction. The schema of
+                the parameters may be specified via Endpoint's
+                DeployedModels' [Model's
+                ][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``parameters_schema_uri``.
+            timeout (float): Optional. The timeout for each request in seconds.
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
+
+        Returns:
+            prediction (aiplatform.Prediction):
+                Prediction with the returned predictions in the order of
+                `instances`. The Model ID and metadata are those of the first
+                shard.
+
+        Raises:
+            ValueError: If `shard_size` or `max_concurrency` is less than 1.
+        """
+        if max_concurrency < 1:
+            raise ValueError("`max_concurrency` must be at least 1.")
+        self.wait()
+        shards = self._shard_instances(instances, shard_size)
+        if not shards:
+            return Prediction(predictions=[], deployed_model_id="")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _predict_shard(shard: List) -> Prediction:
+            async with semaphore:
+                prediction_response = await self._prediction_async_client.predict(
+                    endpoint=self._gca_resource.name,
+                    instances=shard,
+                    parameters=parameters,
+                    timeout=timeout,
+                    retry=_PREDICT_MANY_ASYNC_RETRY,
+                )
+            return self._prediction_from_predict_response(prediction_response)
+
+        shard_predictions = await asyncio.gather(
+            *[_predict_shard(shard) for shard in shards]
+        )
+        return self._merge_predictions(shard_predictions, return_numpy=return_numpy)
+
+    @staticmethod
+    def _prediction_from_predict_response(
+        prediction_response: gca_prediction_service_compat.PredictResponse,
+        return_numpy: bool = False,
+    ) -> Prediction:
+        """Converts a PredictResponse into a Prediction."""
         if prediction_response._pb.metadata:
-            metadata = json_format.MessageToDict(prediction_response._pb.metadata)
+            metadata = _value_utils.value_to_python(prediction_response._pb.metadata)
         else:
             metadata = None
 
+        predictions = _value_utils.values_to_python(prediction_response.predictions.pb)
         return Prediction(
-            predictions=[
-                json_format.MessageToDict(item)
-                for item in prediction_response.predictions.pb
-            ],
+            predictions=(
+                _value_utils.to_numpy(predictions) if return_numpy else predictions
+            ),
             metadata=metadata,
             deployed_model_id=prediction_response.deployed_model_id,
             model_version_id=prediction_response.model_version_id,
             model_resource_name=prediction_response.model,
         )
 
+    @staticmethod
+    def _shard_instances(instances: List, shard_size: int) -> List[List]:
+        """Splits instances into consecutive shards of at most `shard_size` instances.
+
+        Raises:
+            ValueError: If `shard_size` is less than 1.
+        """
+        if shard_size < 1:
+            raise ValueError("`shard_size` must be at least 1.")
+        return [
+            instances[start : start + shard_size]
+            for start in range(0, len(instances), shard_size)
+        ]
+
+    @staticmethod
+    def _merge_predictions(
+        shard_predictions: List[Prediction], return_numpy: bool = False
+    ) -> Prediction:
+        """Concatenates the predictions of consecutive shards into one Prediction."""
+        predictions = [
+            prediction
+            for shard_prediction in shard_predictions
+            for prediction in shard_prediction.predictions
+        ]
+        return shard_predictions[0]._replace(
+            predictions=(
+                _value_utils.to_numpy(predictions) if return_numpy else predictions
+            )
+        )
+
+    def batcher(
+        self,
+        max_batch_size: int,
+        max_latency_ms: float,
+        parameters: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> PredictionBatcher:
+        """Returns a batcher that merges concurrent predictions into batched requests.
+
+        Instances submitted by concurrent callers are collected into a single
+        predict request, which turns per-request overhead into per-batch overhead.
+
+        Example usage:
+            batcher = my_endpoint.batcher(max_batch_size=32, max_latency_ms=10)
+            response = batcher.predict(instances=[...])
+            my_predictions = response.predictions
+
+        Args:
+            max_batch_size (int):
+                Required. The maximum number of instances sent in one predict
+                request. It should not exceed the limit of the DeployedModel.
+            max_latency_ms (float):
+                Required. The maximum time in milliseconds an instance waits
+                for a batch to fill up before the batch is sent.
+            parameters (Dict):
+                Optional. The parameters that govern every prediction sent by
+                the batcher.
+            timeout (float): Optional. The timeout for each batched request in seconds.
+
+        Returns:
+            batcher (aiplatform.models.PredictionBatcher):
+                A batcher that sends predictions to this Endpoint.
+        """
+        return PredictionBatcher(
+            endpoint=self,
+            max_batch_size=max_batch_size,
+            max_latency_ms=max_latency_ms,
+            parameters=parameters,
+            timeout=timeout,
+        )
+
     def raw_predict(
         self, body: bytes, headers: Dict[str, str]
     ) -> requests.models.Response:
@@ -1704,9 +2267,8 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
             A requests.models.Response object containing the status code and prediction results.
         """
         if not self.authorized_session:
-            self.credentials._scopes = constants.base.DEFAULT_AUTHED_SCOPES
-            self.raw_predict_request_url = f"https://{self.location}-{constants.base.API_BASE_PATH}/v1/projects/{self.project}/locations/{self.location}/endpoints/{self.name}:rawPredict"
-            self.authorized_session = google_auth_requests.AuthorizedSession(
+            self._init_raw_predict_request_url()
+            self.authorized_session = self.http_transport.authorized_session(
                 self.credentials
             )
 
@@ -1714,6 +2276,50 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
             url=self.raw_predict_request_url, data=body, headers=headers
         )
 
+    async def raw_predict_async(
+        self, body: bytes, headers: Dict[str, str]
+    ) -> "httpx.Response":  # type: ignore # noqa: F821
+        """Makes an asynchronous prediction request using arbitrary headers.
+
+        Example usage:
+            ```
+            response = await my_endpoint.raw_predict_async(
+                body = b'{"instances":[{"feat_1":val_1, "feat_2":val_2}]}'
+                headers = {'Content-Type':'application/json'}
+            )
+            status_code = response.status_code
+            results = json.dumps(response.text)
+            ```
+
+        Args:
+            body (bytes):
+                The body of the prediction request in bytes. This must not exceed 1.5 mb per request.
+            headers (Dict[str, str]):
+                The header of the request as a dictionary. There are no restrictions on the header.
+
+        Returns:
+            A httpx.Response object containing the status code and prediction results.
+        """
+        if not self.raw_predict_request_url:
+            self._init_raw_predict_request_url()
+
+        if not self.credentials.valid:
+            # Refreshing credentials is blocking, so keep it off the event loop.
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.credentials.refresh, google_auth_requests.Request()
+            )
+        request_headers = dict(headers)
+        self.credentials.apply(request_headers)
+
+        return await self.http_transport.async_client().post(
+            url=self.raw_predict_request_url, content=body, headers=request_headers
+        )
+
+    def _init_raw_predict_request_url(self) -> None:
+        """Sets the rawPredict URL and the scopes its credentials need."""
+        self.credentials._scopes = constants.base.DEFAULT_AUTHED_SCOPES
+        self.raw_predict_request_url = f"https://{self.location}-{constants.base.API_BASE_PATH}/v1/projects/{self.project}/locations/{self.location}/endpoints/{self.name}:rawPredict"
+
     def explain(
         self,
         instances: List[Dict],
@@ -1767,10 +2373,7 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
         )
 
         return Prediction(
-            predictions=[
-                json_format.MessageToDict(item)
-                for item in explain_response.predictions.pb
-            ],
+            predictions=_value_utils.values_to_python(explain_response.predictions.pb),
             deployed_model_id=explain_response.deployed_model_id,
             explanations=explain_response.explanations,
         )
@@ -1831,10 +2434,7 @@ class Endpoint(base.VertexAiResourceNounWithFutureManager, base.PreviewMixin):
         )
 
         return Prediction(
-            predictions=[
-                json_format.MessageToDict(item)
-                for item in explain_response.predictions.pb
-            ],
+            predictions=_value_utils.values_to_python(explain_response.predictions.pb),
             deployed_model_id=explain_response.deployed_model_id,
             explanations=explain_response.explanations,
         )
@@ -1999,7 +2599,7 @@ class PrivateEndpoint(Endpoint):
             ImportError: If there is an issue importing the `urllib3` package.
         """
         try:
-            import urllib3
+            import urllib3  # noqa: F401
         except ImportError:
             raise ImportError(
                 "Cannot import the urllib3 HTTP client. Please install google-cloud-aiplatform[private_endpoints]."
@@ -2017,8 +2617,6 @@ class PrivateEndpoint(Endpoint):
                 "Please ensure the Endpoint being retrieved is a PrivateEndpoint."
             )
 
-        self._http_client = urllib3.PoolManager()
-
     @property
     def predict_http_uri(self) -> Optional[str]:
         """HTTP path to send prediction requests to, used when calling `PrivateEndpoint.predict()`"""
@@ -2187,23 +2785,19 @@ class PrivateEndpoint(Endpoint):
             ImportError: If there is an issue importing the `urllib3` package.
         """
         try:
-            import urllib3
+            import urllib3  # noqa: F401
         except ImportError:
             raise ImportError(
                 "Cannot import the urllib3 HTTP client. Please install google-cloud-aiplatform[private_endpoints]."
             )
 
-        endpoint = super()._construct_sdk_resource_from_gapic(
+        return super()._construct_sdk_resource_from_gapic(
             gapic_resource=gapic_resource,
             project=project,
             location=location,
             credentials=credentials,
         )
 
-        endpoint._http_client = urllib3.PoolManager()
-
-        return endpoint
-
     def _http_request(
         self,
         method: str,
@@ -2242,7 +2836,7 @@ class PrivateEndpoint(Endpoint):
             )
 
         try:
-            response = self._http_client.request(
+            response = self.http_transport.request(
                 method=method, url=url, body=body, headers=headers
             )
 
@@ -2262,7 +2856,106 @@ class PrivateEndpoint(Endpoint):
                 f"and that {url} is a valid URL."
             ) from exc
 
-    def predict(self, instances: List, parameters: Optional[Dict] = None) -> Prediction:
+    async def _http_request_async(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Union[str, bytes]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> "httpx.Response":  # type: ignore # noqa: F821
+        """Helper function used to perform asynchronous HTTP requests for PrivateEndpoint.
+
+        Args:
+            method (str):
+                Required. The HTTP request method to use. Example: "POST" or "GET"
+            url (str):
+                Required. The url used to send requests and get responses from.
+            body (Union[str, bytes]):
+                Optional. Data sent to the url in the HTTP request. For a PrivateEndpoint,
+                an instance is sent and a prediction response is expected.
+            headers (Dict[str, str]):
+                Optional. Header in the HTTP request.
+
+        Returns:
+            httpx.Response:
+                A HTTP Response container.
+
+        Raises:
+            ImportError: If there is an issue importing the `httpx` package.
+            RuntimeError: If a HTTP request could not be made.
+            RuntimeError: A connection could not be established with the PrivateEndpoint and
+                a HTTP request could not be made.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "Cannot import the httpx HTTP client. Please install google-cloud-aiplatform[private_endpoints]."
+            )
+
+        try:
+            response = await self.http_transport.async_client().request(
+                method=method, url=url, content=body, headers=headers
+            )
+        except httpx.TransportError as exc:
+            raise RuntimeError(
+                f"Failed to make a {method} request to this URI, make sure: "
+                " this call is being made inside the network this PrivateEndpoint is peered to "
+                f"({self._gca_resource.network}), calling health_check() returns True, "
+                f"and that {url} is a valid URL."
+            ) from exc
+
+        if response.status_code < _SUCCESSFUL_HTTP_RESPONSE:
+            return response
+        raise RuntimeError(
+            f"{response.status_code} - Failed to make request, see response: "
+            + response.text
+        )
+
+    def _assert_model_deployed(self, request_type: str) -> None:
+        """Raises if no model is deployed on this PrivateEndpoint.
+
+        Raises:
+            RuntimeError: If a model has not been deployed a request cannot be made.
+        """
+        self._sync_gca_resource_if_skipped()
+
+        if not self._gca_resource.deployed_models:
+            raise RuntimeError(
+                f"Cannot make a {request_type} request because a model has not been deployed on this Private"
+                "Endpoint. Please ensure a model has been deployed."
+            )
+
+    def _prepare_request(self, request_type: str) -> None:
+        """Waits for this PrivateEndpoint and checks that a model is deployed.
+
+        Raises:
+            RuntimeError: If a model has not been deployed a request cannot be made.
+        """
+        self.wait()
+        self._assert_model_deployed(request_type)
+
+    def _prediction_from_http_response_data(
+        self, data: Union[str, bytes], return_numpy: bool = False
+    ) -> Prediction:
+        """Converts the JSON body of a PrivateEndpoint prediction into a Prediction."""
+        prediction_response = json.loads(data)
+        predictions = prediction_response.get("predictions")
+
+        return Prediction(
+            predictions=(
+                _value_utils.to_numpy(predictions) if return_numpy else predictions
+            ),
+            metadata=prediction_response.get("metadata"),
+            deployed_model_id=self._gca_resource.deployed_models[0].id,
+        )
+
+    def predict(
+        self,
+        instances: List,
+        parameters: Optional[Dict] = None,
+        return_numpy: bool = False,
+    ) -> Prediction:
         """Make a prediction against this PrivateEndpoint using a HTTP request.
         This method must be called within the network the PrivateEndpoint is peered to.
         Otherwise, the predict() call will fail with error code 404. To check, use `PrivateEndpoint.network`.
@@ -2292,6 +2985,10 @@ class PrivateEndpoint(Endpoint):
                 ][google.cloud.aiplatform.v1beta1.DeployedModel.model]
                 [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
                 ``parameters_schema_uri``.
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
 
         Returns:
             prediction (aiplatform.Prediction):
@@ -2301,13 +2998,7 @@ class PrivateEndpoint(Endpoint):
             RuntimeError: If a model has not been deployed a request cannot be made.
         """
         self.wait()
-        self._sync_gca_resource_if_skipped()
-
-        if not self._gca_resource.deployed_models:
-            raise RuntimeError(
-                "Cannot make a predict request because a model has not been deployed on this Private"
-                "Endpoint. Please ensure a model has been deployed."
-            )
+        self._assert_model_deployed("predict")
 
         response = self._http_request(
             method="POST",
@@ -2316,12 +3007,79 @@ class PrivateEndpoint(Endpoint):
             headers={"Content-Type": "application/json"},
         )
 
-        prediction_response = json.loads(response.data)
+        return self._prediction_from_http_response_data(
+            response.data, return_numpy=return_numpy
+        )
 
-        return Prediction(
-            predictions=prediction_response.get("predictions"),
-            metadata=prediction_response.get("metadata"),
-            deployed_model_id=self._gca_resource.deployed_models[0].id,
+    async def predict_async(
+        self,
+        instances: List,
+        *,
+        parameters: Optional[Dict] = None,
+        return_numpy: bool = False,
+    ) -> Prediction:
+        """Make an asynchronous prediction against this PrivateEndpoint using a HTTP request.
+        This method must be called within the network the PrivateEndpoint is peered to.
+        Otherwise, the predict_async() call will fail with error code 404. To check, use `PrivateEndpoint.network`.
+
+        Example usage:
+            ```
+            response = await my_private_endpoint.predict_async(instances=[...])
+            my_predictions = response.predictions
+            ```
+
+        Args:
+            instances (List):
+                Required. The instances that are the input to the
+                prediction call. Instance types mut be JSON serializable.
+                A DeployedModel may have an upper limit
+                on the number of instances it supports per request, and
+                when it is exceeded the prediction call errors in case
+                of AutoML Models, or, in case of customer created
+                Models, the behaviour is as documented by that Model.
+                The schema of any single instance may be specified via
+                Endpoint's DeployedModels'
+                [Model's][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``instance_schema_uri``.
+            parameters (Dict):
+                The parameters that govern the prediction. The schema of
+                the parameters may be specified via Endpoint's
+                DeployedModels' [Model's
+                ][google.cloud.aiplatform.v1beta1.DeployedModel.model]
+                [PredictSchemata's][google.cloud.aiplatform.v1beta1.Model.predict_schemata]
+                ``parameters_schema_uri``.
+            return_numpy (bool):
+                Optional. Default value is False. If set to True, dense numeric
+                predictions are returned as a single NumPy array whose first
+                dimension indexes the predictions.
+
+        Returns:
+            prediction (aiplatform.Prediction):
+                Prediction object with returned predictions and Model ID.
+
+        Raises:
+            RuntimeError: If a model has not been deployed a request cannot be made.
+        """
+        # Waiting on creation and syncing the resource are blocking, so keep
+        # them off the event loop.
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._prepare_request, "predict"
+        )
+
+        body = {"instances": instances}
+        if parameters is not None:
+            body["parameters"] = parameters
+
+        response = await self._http_request_async(
+            method="POST",
+            url=self.predict_http_uri,
+            body=json.dumps(body),
+            headers={"Content-Type": "application/json"},
+        )
+
+        return self._prediction_from_http_response_data(
+            response.content, return_numpy=return_numpy
         )
 
     def raw_predict(
@@ -2357,11 +3115,50 @@ class PrivateEndpoint(Endpoint):
             headers=headers,
         )
 
+    async def raw_predict_async(
+        self, body: bytes, headers: Dict[str, str]
+    ) -> "httpx.Response":  # type: ignore # noqa: F821
+        """Make an asynchronous prediction request using arbitrary headers.
+        This method must be called within the network the PrivateEndpoint is peered to.
+        Otherwise, the raw_predict_async() call will fail with error code 404. To check, use `PrivateEndpoint.network`.
+
+        Example usage:
+            ```
+            response = await my_endpoint.raw_predict_async(
+                body = b'{"instances":[{"feat_1":val_1, "feat_2":val_2}]}'
+                headers = {'Content-Type':'application/json'}
+            )
+            status_code = response.status_code
+            results = json.dumps(response.text)
+            ```
+
+        Args:
+            body (bytes):
+                The body of the prediction request in bytes. This must not exceed 1.5 mb per request.
+            headers (Dict[str, str]):
+                The header of the request as a dictionary. There are no restrictions on the header.
+
+        Returns:
+            A httpx.Response object containing the status code and prediction results.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.wait)
+        return await self._http_request_async(
+            method="POST",
+            url=self.predict_http_uri,
+            body=body,
+            headers=headers,
+        )
+
     def explain(self):
         raise NotImplementedError(
             f"{self.__class__.__name__} class does not support 'explain' as of now."
         )
 
+    async def explain_async(self):
+        raise NotImplementedError(
+            f"{self.__class__.__name__} class does not support 'explain' as of now."
+        )
+
     def health_check(self) -> bool:
         """
         Makes a request to this PrivateEndpoint's health check URI. Must be within network
@@ -2379,13 +3176,7 @@ class PrivateEndpoint(Endpoint):
             RuntimeError: If a model has not been deployed a request cannot be made.
         """
         self.wait()
-        self._sync_gca_resource_if_skipped()
-
-        if not self._gca_resource.deployed_models:
-            raise RuntimeError(
-                "Cannot make a health check request because a model has not been deployed on this Private"
-                "Endpoint. Please ensure a model has been deployed."
-            )
+        self._assert_model_deployed("health check")
 
         response = self._http_request(
             method="GET",
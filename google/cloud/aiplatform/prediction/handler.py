@@ -16,8 +16,13 @@
 #
 
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent import futures
+import json
 import logging
-from typing import Optional, Type
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
 import traceback
 
 try:
@@ -30,9 +35,12 @@ except ImportError:
         'Please install the SDK using `pip install "google-cloud-aiplatform[prediction]>=1.16.0"`.'
     )
 
+from google.cloud.aiplatform.constants import prediction
 from google.cloud.aiplatform.prediction import handler_utils
+from google.cloud.aiplatform.prediction import metrics
 from google.cloud.aiplatform.prediction.predictor import Predictor
 from google.cloud.aiplatform.prediction.serializer import DefaultSerializer
+from google.cloud.aiplatform.prediction.serializer import SUPPORTED_MEDIA_TYPES
 
 
 class Handler(ABC):
@@ -69,8 +77,166 @@ class Handler(ABC):
         pass
 
 
+_PREDICTOR_EXECUTOR_THREAD = "thread"
+_PREDICTOR_EXECUTOR_PROCESS = "process"
+_PREDICTOR_EXECUTOR_NONE = "none"
+_PREDICTOR_EXECUTORS = (
+    _PREDICTOR_EXECUTOR_THREAD,
+    _PREDICTOR_EXECUTOR_PROCESS,
+    _PREDICTOR_EXECUTOR_NONE,
+)
+
+_DEFAULT_MAX_BATCH_DELAY_MS = 5
+
+# The predictor instance of a worker process when predictors run in a process pool.
+_process_predictor = None
+
+
+def _load_process_predictor(predictor: Type[Predictor], artifacts_uri: str) -> None:
+    """Loads the predictor of the current worker process of the process pool."""
+    global _process_predictor
+    _process_predictor = predictor()
+    _process_predictor.load(artifacts_uri)
+
+
+def _run_predictor_stages(
+    predictor: Predictor, prediction_input: Any, submitted_at: float
+) -> Tuple[Any, Dict[str, float]]:
+    """Runs preprocess, predict and postprocess of the predictor.
+
+    Args:
+        predictor (Predictor):
+            Required. The predictor to run.
+        prediction_input (Any):
+            Required. The deserialized prediction input.
+        submitted_at (float):
+            Required. The `time.time()` the prediction was submitted at.
+
+    Returns:
+        The prediction results and the latency in seconds of each stage.
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    instances = predictor.preprocess(prediction_input)
+    preprocessed = time.perf_counter()
+    prediction_results = predictor.predict(instances)
+    predicted = time.perf_counter()
+    prediction_results = predictor.postprocess(prediction_results)
+    postprocessed = time.perf_counter()
+    return prediction_results, {
+        metrics.STAGE_QUEUE: max(started_at - submitted_at, 0.0),
+        metrics.STAGE_PREPROCESS: preprocessed - start,
+        metrics.STAGE_PREDICT: predicted - preprocessed,
+        metrics.STAGE_POSTPROCESS: postprocessed - predicted,
+    }
+
+
+def _run_process_predictor(
+    prediction_input: Any, submitted_at: float
+) -> Tuple[Any, Dict[str, float]]:
+    """Runs the predictor of the current worker process of the process pool."""
+    return _run_predictor_stages(_process_predictor, prediction_input, submitted_at)
+
+
+class _PendingBatch:
+    """Prediction inputs of concurrent requests waiting to be predicted together."""
+
+    def __init__(self, prediction_input: Dict[str, Any]):
+        # All inputs of a batch share the keys other than "instances".
+        self.template = {
+            key: value for key, value in prediction_input.items() if key != "instances"
+        }
+        self.instances = []
+        self.sizes = []
+        self.futures = []
+        # The `time.time()` each request arrived at.
+        self.submitted_at = []
+        self.timer = None
+
+    def add(self, instances: List[Any], submitted_at: float) -> asyncio.Future:
+        """Adds the instances of a request and returns the future of its results."""
+        future = asyncio.get_running_loop().create_future()
+        self.instances.extend(instances)
+        self.sizes.append(len(instances))
+        self.futures.append(future)
+        self.submitted_at.append(submitted_at)
+        return future
+
+    def requests(self) -> List[Dict[str, Any]]:
+        """Returns the prediction input of each request of the batch."""
+        inputs = []
+        start = 0
+        for size in self.sizes:
+            inputs.append(
+                dict(self.template, instances=self.instances[start : start + size])
+            )
+            start += size
+        return inputs
+
+    def split(self, prediction_results: Any) -> List[Dict[str, Any]]:
+        """Splits the results of the batch into the results of each request.
+
+        Raises:
+            ValueError: If the results do not hold one prediction per instance.
+        """
+        if (
+            not isinstance(prediction_results, dict)
+            or not isinstance(prediction_results.get("predictions"), list)
+            or len(prediction_results["predictions"]) != len(self.instances)
+        ):
+            raise ValueError(
+                "Batched prediction results must be a dict with one entry in "
+                f"`predictions` per instance, {len(self.instances)} expected."
+            )
+
+        results = []
+        start = 0
+        for size in self.sizes:
+            result = dict(prediction_results)
+            result["predictions"] = prediction_results["predictions"][
+                start : start + size
+            ]
+            results.append(result)
+            start += size
+        return results
+
+
 class PredictionHandler(Handler):
-    """Default prediction handler for the prediction requests sent to the application."""
+    """Default prediction handler for the prediction requests sent to the application.
+
+    The predictor runs on the event loop of the model server by default. It can
+    run outside of it instead, so that a CPU-heavy prediction does not stall
+    health checks and other requests. The predictor is then called from other
+    threads or processes, so only opt in if it supports that.
+    The following environment variables adjust how the predictor runs:
+        VERTEX_CPR_PREDICTOR_EXECUTOR:
+            "none" runs the predictor on the event loop, "thread" runs it in a
+            thread pool, and "process" runs it in a process pool where each
+            process loads its own predictor. The default is "none".
+        VERTEX_CPR_PREDICTOR_WORKERS:
+            The number of threads or processes running the predictor. The default
+            is 1, which keeps the calls to the predictor serialized.
+        VERTEX_CPR_MAX_INFLIGHT_REQUESTS:
+            The maximum number of prediction requests handled at the same time.
+            Further requests are rejected with status code 429. Unbounded if unset.
+        VERTEX_CPR_MAX_BATCH_SIZE:
+            The maximum number of instances of concurrent requests merged into a
+            single prediction. Requests are not batched if unset or 1.
+        VERTEX_CPR_MAX_BATCH_DELAY_MS:
+            The maximum time in milliseconds a request waits for other requests to
+            fill its batch. The default is 5.
+
+    The latency of each stage of a request is returned in the Server-Timing
+    header of the response and collected in `metrics`, which the model server
+    serves in Prometheus text format if VERTEX_CPR_METRICS_ROUTE is set.
+
+    Requests are only batched if their input is a dict with a list of
+    "instances", and only with requests whose other keys are the same. The
+    results of the predictor must then be a dict with one entry in its
+    "predictions" list per instance, for example the results of the sklearn
+    and xgboost predictors. If the prediction of a batch fails, its requests
+    are predicted one by one, so that a bad input only fails its own request.
+    """
 
     def __init__(
         self,
@@ -87,16 +253,208 @@ class PredictionHandler(Handler):
                 instance if given.
 
         Raises:
-            ValueError: If predictor is None.
+            ValueError: If predictor is None or the predictor environment variables
+                are invalid.
         """
         if predictor is None:
             raise ValueError(
                 "PredictionHandler must have a predictor class passed to the init function."
             )
 
+        executor_type = os.getenv(
+            "VERTEX_CPR_PREDICTOR_EXECUTOR", _PREDICTOR_EXECUTOR_NONE
+        ).lower()
+        if executor_type not in _PREDICTOR_EXECUTORS:
+            raise ValueError(
+                f"VERTEX_CPR_PREDICTOR_EXECUTOR must be one of {_PREDICTOR_EXECUTORS}, "
+                f"got {executor_type}."
+            )
+        workers = int(os.getenv("VERTEX_CPR_PREDICTOR_WORKERS", "1"))
+        if workers < 1:
+            raise ValueError("VERTEX_CPR_PREDICTOR_WORKERS must be at least 1.")
+        max_inflight_requests_str = os.getenv("VERTEX_CPR_MAX_INFLIGHT_REQUESTS")
+        self._max_inflight_requests = None
+        if max_inflight_requests_str:
+            self._max_inflight_requests = int(max_inflight_requests_str)
+            if self._max_inflight_requests < 1:
+                raise ValueError("VERTEX_CPR_MAX_INFLIGHT_REQUESTS must be at least 1.")
+        self.metrics = metrics.PredictionMetrics()
+
+        self._max_batch_size = int(os.getenv("VERTEX_CPR_MAX_BATCH_SIZE", "1"))
+        if self._max_batch_size < 1:
+            raise ValueError("VERTEX_CPR_MAX_BATCH_SIZE must be at least 1.")
+        self._max_batch_delay = (
+            float(
+                os.getenv(
+                    "VERTEX_CPR_MAX_BATCH_DELAY_MS", str(_DEFAULT_MAX_BATCH_DELAY_MS)
+                )
+            )
+            / 1000
+        )
+        if self._max_batch_delay < 0:
+            raise ValueError("VERTEX_CPR_MAX_BATCH_DELAY_MS must not be negative.")
+        # Pending batches keyed by the keys other than "instances" of their inputs.
+        self._pending_batches = {}
+        # Keeps references to the running batch predictions until they are done.
+        self._batch_tasks = set()
+
+        # The predictor of this process is also loaded in process mode, so that
+        # subclasses can keep using `_predictor`.
         self._predictor = predictor()
         self._predictor.load(artifacts_uri)
 
+        self._executor = None
+        self._runs_in_processes = executor_type == _PREDICTOR_EXECUTOR_PROCESS
+        if self._runs_in_processes:
+            # Each worker process loads its own predictor.
+            self._executor = futures.ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_load_process_predictor,
+                initargs=(predictor, artifacts_uri),
+            )
+        elif executor_type == _PREDICTOR_EXECUTOR_THREAD:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="cpr_predictor"
+            )
+
+    def _run_predictor(
+        self, prediction_input: Any, submitted_at: float
+    ) -> Tuple[Any, Dict[str, float]]:
+        """Runs preprocess, predict and postprocess of the predictor."""
+        return _run_predictor_stages(self._predictor, prediction_input, submitted_at)
+
+    async def _predict(
+        self, prediction_input: Any, submitted_at: float
+    ) -> Tuple[Any, Dict[str, float]]:
+        """Runs the predictor in the executor, or inline if there is none.
+
+        Args:
+            prediction_input (Any):
+                Required. The deserialized prediction input.
+            submitted_at (float):
+                Required. The `time.time()` the request arrived at, from which
+                the queue latency is measured.
+
+        Returns:
+            The prediction results and the latency in seconds of each stage.
+        """
+        if self._executor is None:
+            return self._run_predictor(prediction_input, submitted_at)
+
+        if self._runs_in_processes:
+            function = _run_process_predictor
+        else:
+            function = self._run_predictor
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, function, prediction_input, submitted_at
+        )
+
+    async def _predict_batched(
+        self, prediction_input: Any, submitted_at: float
+    ) -> Tuple[Any, Dict[str, float]]:
+        """Merges the prediction input with concurrent ones into a batch if possible.
+
+        The queue latency of a batched request includes the time it waited for
+        its batch to fill.
+        """
+        if (
+            self._max_batch_size <= 1
+            or not isinstance(prediction_input, dict)
+            or not isinstance(prediction_input.get("instances"), list)
+            or len(prediction_input["instances"]) >= self._max_batch_size
+        ):
+            return await self._predict(prediction_input, submitted_at)
+
+        instances = prediction_input["instances"]
+        try:
+            batch_key = json.dumps(
+                {
+                    key: value
+                    for key, value in prediction_input.items()
+                    if key != "instances"
+                },
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            return await self._predict(prediction_input, submitted_at)
+
+        batch = self._pending_batches.get(batch_key)
+        if (
+            batch is not None
+            and len(batch.instances) + len(instances) > self._max_batch_size
+        ):
+            self._flush_batch(batch_key)
+            batch = None
+        if batch is None:
+            batch = _PendingBatch(prediction_input)
+            batch.timer = asyncio.get_running_loop().call_later(
+                self._max_batch_delay, self._flush_batch, batch_key
+            )
+            self._pending_batches[batch_key] = batch
+
+        future = batch.add(instances, submitted_at)
+        if len(batch.instances) >= self._max_batch_size:
+            self._flush_batch(batch_key)
+        return await future
+
+    def _flush_batch(self, batch_key: str) -> None:
+        """Starts the prediction of a pending batch."""
+        batch = self._pending_batches.pop(batch_key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = asyncio.ensure_future(self._predict_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _predict_batch(self, batch: _PendingBatch) -> None:
+        """Predicts a batch and resolves the futures of its requests.
+
+        If the batch fails, its requests are predicted one by one instead.
+        """
+        first_submitted_at = min(batch.submitted_at)
+        try:
+            prediction_results, latencies = await self._predict(
+                dict(batch.template, instances=batch.instances), first_submitted_at
+            )
+            results = batch.split(prediction_results)
+        except Exception as exception:
+            if len(batch.futures) == 1:
+                if not batch.futures[0].done():
+                    batch.futures[0].set_exception(exception)
+                return
+            await self._predict_batch_requests(batch)
+            return
+
+        for future, submitted_at, result in zip(
+            batch.futures, batch.submitted_at, results
+        ):
+            if not future.done():
+                # The queue latency is measured from the first request of the
+                # batch, so later requests waited that much less.
+                request_latencies = dict(latencies)
+                request_latencies[metrics.STAGE_QUEUE] = max(
+                    latencies[metrics.STAGE_QUEUE]
+                    - (submitted_at - first_submitted_at),
+                    0.0,
+                )
+                future.set_result((result, request_latencies))
+
+    async def _predict_batch_requests(self, batch: _PendingBatch) -> None:
+        """Predicts the requests of a failed batch one by one."""
+        for future, submitted_at, prediction_input in zip(
+            batch.futures, batch.submitted_at, batch.requests()
+        ):
+            if future.done():
+                continue
+            try:
+                result = await self._predict(prediction_input, submitted_at)
+            except Exception as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
     async def handle(self, request: Request) -> Response:
         """Handles a prediction request.
 
@@ -108,16 +466,54 @@ class PredictionHandler(Handler):
             The response of the prediction request.
 
         Raises:
-            HTTPException: If any exception is thrown from predictor object.
+            HTTPException: If any exception is thrown from predictor object, or
+                if too many requests are in flight.
         """
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            if (
+                self._max_inflight_requests is not None
+                and self.metrics.inflight_requests >= self._max_inflight_requests
+            ):
+                raise HTTPException(
+                    status_code=429,
+                    detail=(
+                        "The model server is handling the maximum number of "
+                        f"{self._max_inflight_requests} requests, please retry later."
+                    ),
+                )
+
+            self.metrics.inflight_requests += 1
+            try:
+                response = await self._handle(request)
+            finally:
+                self.metrics.inflight_requests -= 1
+            status_code = response.status_code
+            return response
+        except HTTPException as exception:
+            status_code = exception.status_code
+            raise
+        finally:
+            self.metrics.observe_latency(
+                metrics.STAGE_TOTAL, time.perf_counter() - start
+            )
+            self.metrics.count_response(status_code)
+
+    async def _handle(self, request: Request) -> Response:
+        """Deserializes the request, runs the predictor and serializes the results."""
         request_body = await request.body()
+        start = time.perf_counter()
         content_type = handler_utils.get_content_type_from_headers(request.headers)
         prediction_input = DefaultSerializer.deserialize(request_body, content_type)
+        latencies = {metrics.STAGE_DESERIALIZE: time.perf_counter() - start}
 
+        self.metrics.queued_requests += 1
         try:
-            prediction_results = self._predictor.postprocess(
-                self._predictor.predict(self._predictor.preprocess(prediction_input))
+            prediction_results, predictor_latencies = await self._predict_batched(
+                prediction_input, time.time()
             )
+            latencies.update(predictor_latencies)
         except HTTPException:
             raise
         except Exception as exception:
@@ -132,7 +528,24 @@ class PredictionHandler(Handler):
 
             # Converts all other exceptions to HTTPException.
             raise HTTPException(status_code=500, detail=error_message)
+        finally:
+            self.metrics.queued_requests -= 1
 
+        start = time.perf_counter()
         accept = handler_utils.get_accept_from_headers(request.headers)
         data = DefaultSerializer.serialize(prediction_results, accept)
-        return Response(content=data, media_type=accept)
+        media_type = handler_utils.get_preferred_media_type(
+            accept, SUPPORTED_MEDIA_TYPES
+        )
+        latencies[metrics.STAGE_SERIALIZE] = time.perf_counter() - start
+
+        self.metrics.observe_latencies(latencies)
+        return Response(
+            content=data,
+            media_type=media_type or accept,
+            headers={
+                prediction.PREDICTION_TIMING_HEADER_KEY: handler_utils.format_server_timing(
+                    latencies
+                )
+            },
+        )
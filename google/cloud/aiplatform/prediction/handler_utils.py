@@ -15,7 +15,7 @@
 # limitations under the License.
 #
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence
 
 try:
     import starlette
@@ -117,3 +117,49 @@ def parse_accept_header(accept_header: Optional[str]) -> Dict[str, float]:
             results[media_type.split(";")[0].strip()] = float(q)
 
     return results
+
+
+def get_preferred_media_type(
+    accept_header: Optional[str], supported_media_types: Sequence[str]
+) -> Optional[str]:
+    """Selects the supported media type the accept header prefers.
+
+    Media types matched by "*/*" only are preferred in the order of
+    `supported_media_types`.
+
+    Args:
+        accept_header (str):
+            Optional. The accept header.
+        supported_media_types (Sequence[str]):
+            Required. The media types that can be produced.
+
+    Returns:
+        The media type with the highest quality factor or None if none is accepted.
+    """
+    accept_dict = parse_accept_header(accept_header)
+    any_quality = accept_dict.get(prediction.ANY_ACCEPT_TYPE, 0.0)
+
+    preferred_media_type = None
+    preferred_quality = 0.0
+    for media_type in supported_media_types:
+        quality = accept_dict.get(media_type, any_quality)
+        if quality > preferred_quality:
+            preferred_media_type = media_type
+            preferred_quality = quality
+
+    return preferred_media_type
+
+
+def format_server_timing(latencies: Dict[str, float]) -> str:
+    """Formats stage latencies as the value of a Server-Timing header.
+
+    Args:
+        latencies (Dict[str, float]):
+            Required. The latency in seconds of each stage.
+
+    Returns:
+        The header value, with durations in milliseconds.
+    """
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in latencies.items()
+    )
@@ -401,6 +401,25 @@ class LocalEndpoint:
                 _logger.warning(f"Exception during prediction: {exception}")
             raise
 
+    @staticmethod
+    def get_prediction_timing(response: requests.models.Response) -> Dict[str, float]:
+        """Gets the latency of each stage of a prediction from its response.
+
+        The default handler of custom prediction routines returns the latencies
+        in the Server-Timing header of prediction responses.
+
+        Args:
+            response (requests.models.Response):
+                Required. The response returned by ``predict``.
+
+        Returns:
+            The latency in milliseconds of each stage, e.g. "deserialize",
+            "predict" or "serialize". Empty if the response has no timing header.
+        """
+        return prediction_utils.parse_server_timing(
+            response.headers.get(prediction.PREDICTION_TIMING_HEADER_KEY)
+        )
+
     def run_health_check(self, verbose: bool = True) -> requests.models.Response:
         """Runs a health check.
 
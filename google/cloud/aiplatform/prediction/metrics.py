@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import bisect
+import collections
+from typing import Dict, Sequence
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_DESERIALIZE = "deserialize"
+STAGE_QUEUE = "queue"
+STAGE_PREPROCESS = "preprocess"
+STAGE_PREDICT = "predict"
+STAGE_POSTPROCESS = "postprocess"
+STAGE_SERIALIZE = "serialize"
+STAGE_TOTAL = "total"
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Histogram:
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class PredictionMetrics:
+    """Latency and load metrics of a prediction handler.
+
+    The metrics are collected per model server worker and are not thread-safe,
+    they must only be updated from the event loop of the worker.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """Initializes the metrics.
+
+        Args:
+            buckets (Sequence[float]):
+                Optional. The upper bounds in seconds of the latency histogram buckets.
+        """
+        self._buckets = tuple(sorted(buckets))
+        self._latencies = collections.OrderedDict()
+        self._responses = collections.Counter()
+        # Only modified on the event loop, so no lock is needed.
+        self.inflight_requests = 0
+        self.queued_requests = 0
+
+    def observe_latency(self, stage: str, seconds: float) -> None:
+        """Records the latency of a stage of a request.
+
+        Args:
+            stage (str):
+                Required. The stage, e.g. "deserialize" or "predict".
+            seconds (float):
+                Required. The time in seconds the stage took.
+        """
+        histogram = self._latencies.get(stage)
+        if histogram is None:
+            histogram = self._latencies[stage] = _Histogram(self._buckets)
+        histogram.observe(seconds)
+
+    def observe_latencies(self, latencies: Dict[str, float]) -> None:
+        """Records the latencies in seconds of several stages of a request."""
+        for stage, seconds in latencies.items():
+            self.observe_latency(stage, seconds)
+
+    def count_response(self, status_code: int) -> None:
+        """Records a response with the given status code."""
+        self._responses[status_code] += 1
+
+    def to_prometheus_text(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics as text.
+        """
+        lines = [
+            "# HELP vertex_cpr_request_stage_latency_seconds "
+            "Latency of the stages of prediction requests.",
+            "# TYPE vertex_cpr_request_stage_latency_seconds histogram",
+        ]
+        for stage, histogram in self._latencies.items():
+            cumulative_count = 0
+            for bucket, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative_count += bucket_count
+                lines.append(
+                    "vertex_cpr_request_stage_latency_seconds_bucket"
+                    f'{{stage="{stage}",le="{bucket}"}} {cumulative_count}'
+                )
+            lines.extend(
+                [
+                    "vertex_cpr_request_stage_latency_seconds_bucket"
+                    f'{{stage="{stage}",le="+Inf"}} {histogram.count}',
+                    "vertex_cpr_request_stage_latency_seconds_sum"
+                    f'{{stage="{stage}"}} {histogram.sum}',
+                    "vertex_cpr_request_stage_latency_seconds_count"
+                    f'{{stage="{stage}"}} {histogram.count}',
+                ]
+            )
+
+        lines.extend(
+            [
+                "# HELP vertex_cpr_responses_total Prediction responses by status code.",
+                "# TYPE vertex_cpr_responses_total counter",
+            ]
+        )
+        for status_code, count in sorted(self._responses.items()):
+            lines.append(f'vertex_cpr_responses_total{{code="{status_code}"}} {count}')
+
+        lines.extend(
+            [
+                "# HELP vertex_cpr_inflight_requests Prediction requests being handled.",
+                "# TYPE vertex_cpr_inflight_requests gauge",
+                f"vertex_cpr_inflight_requests {self.inflight_requests}",
+                "# HELP vertex_cpr_queued_requests "
+                "Prediction requests waiting for or running in the predictor.",
+                "# TYPE vertex_cpr_queued_requests gauge",
+                f"vertex_cpr_queued_requests {self.queued_requests}",
+            ]
+        )
+        return "\n".join(lines) + "\n"
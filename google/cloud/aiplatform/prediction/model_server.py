@@ -42,11 +42,17 @@ except ImportError:
     )
 
 from google.cloud.aiplatform.constants import prediction
+from google.cloud.aiplatform.prediction.metrics import PROMETHEUS_CONTENT_TYPE
 from google.cloud.aiplatform import version
 
 
 class CprModelServer:
-    """Model server to do custom prediction routines."""
+    """Model server to do custom prediction routines.
+
+    If the environment variable VERTEX_CPR_METRICS_ROUTE is set and the handler
+    collects metrics, the metrics of the handler are served on that route in
+    Prometheus text format. Each model server worker serves its own metrics.
+    """
 
     def __init__(self):
         """Initializes a fastapi application and sets the configs.
@@ -110,6 +116,20 @@ class CprModelServer:
             methods=["POST"],
         )
 
+        self.metrics_route = os.environ.get("VERTEX_CPR_METRICS_ROUTE")
+        if self.metrics_route:
+            if getattr(self.handler, "metrics", None) is None:
+                logging.warning(
+                    f"The handler {handler_class.__name__} does not collect metrics, "
+                    f"the metrics route {self.metrics_route} is not served."
+                )
+            else:
+                self.app.add_api_route(
+                    path=self.metrics_route,
+                    endpoint=self.metrics,
+                    methods=["GET"],
+                )
+
     async def __call__(self, scope, receive, send):
         await self.app(scope, receive, send)
 
@@ -126,6 +146,13 @@ class CprModelServer:
         """Executes a health check."""
         return {}
 
+    def metrics(self) -> Response:
+        """Returns the metrics of the handler in Prometheus text format."""
+        return Response(
+            content=self.handler.metrics.to_prometheus_text(),
+            media_type=PROMETHEUS_CONTENT_TYPE,
+        )
+
     async def predict(self, request: Request) -> Response:
         """Executes a prediction.
 
@@ -16,7 +16,9 @@
 #
 
 from abc import ABC, abstractmethod
+import io
 import json
+import os
 from typing import Any, Optional
 
 try:
@@ -27,11 +29,23 @@ except ImportError:
         'Please install the SDK using `pip install "google-cloud-aiplatform[prediction]>=1.16.0"`.'
     )
 
-from google.cloud.aiplatform.constants import prediction as prediction_constants
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from google.cloud.aiplatform.prediction import handler_utils
 
 
 APPLICATION_JSON = "application/json"
+APPLICATION_NPY = "application/x-npy"
+APPLICATION_MSGPACK = "application/x-msgpack"
+
+# Ordered by preference when the accept header does not prefer any of them.
+SUPPORTED_MEDIA_TYPES = (APPLICATION_JSON, APPLICATION_NPY, APPLICATION_MSGPACK)
+_SUPPORTED_MEDIA_TYPES_MESSAGE = ", ".join(
+    f'"{media_type}"' for media_type in SUPPORTED_MEDIA_TYPES
+)
 
 
 class Serializer(ABC):
@@ -65,7 +79,23 @@ class Serializer(ABC):
 
 
 class DefaultSerializer(Serializer):
-    """Default serializer for serialization and deserialization for prediction."""
+    """Default serializer for serialization and deserialization for prediction.
+
+    Supports the following media types for both requests and responses:
+        application/json:
+            Parsed with orjson if it is installed, else with the standard json
+            module. Encoded with the standard json module, or with orjson if it
+            is installed and the VERTEX_CPR_ORJSON_RESPONSES environment
+            variable is set to "true". orjson writes compact JSON and encodes
+            NaN and infinite numbers as null.
+        application/x-npy:
+            A single array in NumPy `.npy` format. Requests deserialize to
+            `{"instances": array}` and the "predictions" of the results, or the
+            results themselves if they are an array, are serialized.
+        application/x-msgpack:
+            Any MessagePack document, NumPy arrays in the results are encoded as
+            lists. Requires the msgpack package.
+    """
 
     @staticmethod
     def deserialize(data: Any, content_type: Optional[str]) -> Any:
@@ -78,28 +108,21 @@ class DefaultSerializer(Serializer):
                 Optional. The specified content type of the request.
 
         Raises:
-            HTTPException: If Json deserialization failed or the specified content type is not
+            HTTPException: If deserialization failed or the specified content type is not
                 supported.
         """
         if content_type == APPLICATION_JSON:
-            try:
-                return json.loads(data)
-            except json.JSONDecodeError:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"JSON deserialization failed for the request data: {data}.\n"
-                        'To specify a different type, please set the "content-type" header '
-                        "in the request.\nCurrently supported content-type in DefaultSerializer: "
-                        f'"{APPLICATION_JSON}".'
-                    ),
-                )
+            return _deserialize_json(data)
+        elif content_type == APPLICATION_NPY:
+            return _deserialize_npy(data)
+        elif content_type == APPLICATION_MSGPACK:
+            return _deserialize_msgpack(data)
         else:
             raise HTTPException(
                 status_code=400,
                 detail=(
                     f"Unsupported content type of the request: {content_type}.\n"
-                    f'Currently supported content-type in DefaultSerializer: "{APPLICATION_JSON}".'
+                    f"Currently supported content-type in DefaultSerializer: {_SUPPORTED_MEDIA_TYPES_MESSAGE}."
                 ),
             )
 
@@ -114,31 +137,191 @@ class DefaultSerializer(Serializer):
                 Optional. The specified content type of the response.
 
         Raises:
-            HTTPException: If Json serialization failed or the specified accept is not supported.
+            HTTPException: If serialization failed or the specified accept is not supported.
         """
-        accept_dict = handler_utils.parse_accept_header(accept)
-
-        if (
-            APPLICATION_JSON in accept_dict
-            or prediction_constants.ANY_ACCEPT_TYPE in accept_dict
-        ):
-            try:
-                return json.dumps(prediction)
-            except TypeError:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"JSON serialization failed for the prediction result: {prediction}.\n"
-                        'To specify a different type, please set the "accept" header '
-                        "in the request.\nCurrently supported accept in DefaultSerializer: "
-                        f'"{APPLICATION_JSON}".'
-                    ),
-                )
+        media_type = handler_utils.get_preferred_media_type(
+            accept, SUPPORTED_MEDIA_TYPES
+        )
+
+        if media_type == APPLICATION_JSON:
+            return _serialize_json(prediction)
+        elif media_type == APPLICATION_NPY:
+            return _serialize_npy(prediction)
+        elif media_type == APPLICATION_MSGPACK:
+            return _serialize_msgpack(prediction)
         else:
             raise HTTPException(
                 status_code=400,
                 detail=(
                     f"Unsupported accept of the response: {accept}.\n"
-                    f'Currently supported accept in DefaultSerializer: "{APPLICATION_JSON}".'
+                    f"Currently supported accept in DefaultSerializer: {_SUPPORTED_MEDIA_TYPES_MESSAGE}."
                 ),
             )
+
+
+def _deserialize_json(data: Any) -> Any:
+    """Deserializes JSON request data."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json, e.g. for NaN and big integers, so
+            # only json decides whether the data is invalid.
+            pass
+
+    try:
+        return json.loads(data)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"JSON deserialization failed for the request data: {data}.\n"
+                'To specify a different type, please set the "content-type" header '
+                "in the request.\nCurrently supported content-type in DefaultSerializer: "
+                f"{_SUPPORTED_MEDIA_TYPES_MESSAGE}."
+            ),
+        )
+
+
+def _use_orjson_responses() -> bool:
+    """Returns whether JSON responses are encoded with orjson."""
+    return (
+        orjson is not None
+        and os.getenv("VERTEX_CPR_ORJSON_RESPONSES", "").lower() == "true"
+    )
+
+
+def _serialize_json(prediction: Any) -> str:
+    """Serializes prediction results to JSON."""
+    if _use_orjson_responses():
+        try:
+            return orjson.dumps(
+                prediction,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode("utf-8")
+        except TypeError:
+            pass
+
+    try:
+        return json.dumps(prediction, default=_numpy_default)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"JSON serialization failed for the prediction result: {prediction}.\n"
+                'To specify a different type, please set the "accept" header '
+                "in the request.\nCurrently supported accept in DefaultSerializer: "
+                f"{_SUPPORTED_MEDIA_TYPES_MESSAGE}."
+            ),
+        )
+
+
+def _import_numpy():
+    """Imports NumPy for the application/x-npy media type.
+
+    Raises:
+        HTTPException: If NumPy is not installed.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f'NumPy is not installed and is required for "{APPLICATION_NPY}". '
+                "Please install numpy in the model server."
+            ),
+        )
+    return np
+
+
+def _deserialize_npy(data: Any) -> Any:
+    """Deserializes an array in NumPy .npy format."""
+    np = _import_numpy()
+    try:
+        return {"instances": np.load(io.BytesIO(data), allow_pickle=False)}
+    except (TypeError, ValueError, OSError):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "NumPy deserialization failed for the request data. The request must "
+                f'be a single array in .npy format for "{APPLICATION_NPY}".'
+            ),
+        )
+
+
+def _serialize_npy(prediction: Any) -> bytes:
+    """Serializes the predictions of the results to NumPy .npy format."""
+    np = _import_numpy()
+    if isinstance(prediction, dict) and "predictions" in prediction:
+        prediction = prediction["predictions"]
+    try:
+        array = np.asarray(prediction)
+        if array.dtype.hasobject:
+            raise ValueError("Object arrays cannot be serialized without pickle.")
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "NumPy serialization failed for the prediction result. The predictions "
+                f'must be a dense numeric array for "{APPLICATION_NPY}".'
+            ),
+        )
+    return buffer.getvalue()
+
+
+def _import_msgpack():
+    """Imports msgpack for the application/x-msgpack media type.
+
+    Raises:
+        HTTPException: If msgpack is not installed.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f'msgpack is not installed and is required for "{APPLICATION_MSGPACK}". '
+                "Please install msgpack in the model server."
+            ),
+        )
+    return msgpack
+
+
+def _deserialize_msgpack(data: Any) -> Any:
+    """Deserializes MessagePack request data."""
+    msgpack = _import_msgpack()
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "MessagePack deserialization failed for the request data. The request "
+                f'must be a single MessagePack document for "{APPLICATION_MSGPACK}".'
+            ),
+        )
+
+
+def _numpy_default(value: Any) -> Any:
+    """Encodes NumPy arrays and scalars, which json and msgpack do not support."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable.")
+
+
+def _serialize_msgpack(prediction: Any) -> bytes:
+    """Serializes prediction results to MessagePack."""
+    msgpack = _import_msgpack()
+    try:
+        return msgpack.packb(prediction, default=_numpy_default, use_bin_type=True)
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"MessagePack serialization failed for the prediction result: {prediction}."
+            ),
+        )
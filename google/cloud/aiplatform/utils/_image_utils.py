@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Detection of image formats from file headers."""
+
+from typing import Optional
+
+# The number of leading bytes needed to detect the supported formats.
+HEADER_SIZE = 16
+
+_ISO_BASE_MEDIA_BRANDS = {
+    b"heic": "image/heic",
+    b"heix": "image/heic",
+    b"heif": "image/heif",
+    b"mif1": "image/heif",
+}
+
+
+def sniff_mime_type(header: bytes) -> Optional[str]:
+    """Detects the MIME type of an image from its leading bytes.
+
+    Only the file signature is read, so this is much cheaper than opening the
+    image with PIL.
+
+    Args:
+        header (bytes):
+            Required. At least the first `HEADER_SIZE` bytes of the image.
+
+    Returns:
+        The MIME type, or None if the format is not recognized.
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if header.startswith(b"RIFF") and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"BM"):
+        return "image/bmp"
+    if header.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff"
+    if header[4:8] == b"ftyp":
+        return _ISO_BASE_MEDIA_BRANDS.get(header[8:12])
+    return None
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Fast conversion of `google.protobuf.Value` messages to Python objects."""
+
+import functools
+import math
+import struct
+from typing import Any, Iterable, List, Optional, TYPE_CHECKING
+
+from google.protobuf import struct_pb2
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Wire encoding of a `Value` holding a number inside a `ListValue`: the tag and
+# length of the `values` entry, the tag of `number_value`, then a double.
+_NUMBER_VALUE_PREFIX = (b"\x0a", b"\x09", b"\x11")
+_NUMBER_VALUE_SIZE = 11
+# Shorter lists are decoded faster element by element.
+_MIN_NUMBER_LIST_LENGTH = 16
+
+
+@functools.lru_cache(maxsize=64)
+def _number_list_struct(length: int) -> struct.Struct:
+    """Returns a Struct unpacking `length` number Values of a serialized ListValue."""
+    return struct.Struct("<" + "3xd" * length)
+
+
+def _number_list_to_python(
+    list_value_pb: struct_pb2.ListValue,
+) -> Optional[List[float]]:
+    """Decodes a ListValue holding only finite numbers in a single pass.
+
+    Returns:
+        The numbers, or None if the list holds anything but finite numbers.
+    """
+    length = len(list_value_pb.values)
+    serialized = list_value_pb.SerializeToString()
+    if len(serialized) != length * _NUMBER_VALUE_SIZE:
+        return None
+    for offset, prefix in enumerate(_NUMBER_VALUE_PREFIX):
+        if serialized[offset::_NUMBER_VALUE_SIZE] != prefix * length:
+            return None
+    numbers = list(_number_list_struct(length).unpack(serialized))
+    # A non-finite sum means an element (or the sum) is non-finite, so defer
+    # to the per-element path which raises for the offending element.
+    total = sum(numbers)
+    if total - total:
+        return None
+    return numbers
+
+
+def value_to_python(value_pb: struct_pb2.Value) -> Any:
+    """Converts a `google.protobuf.Value` message to a Python object.
+
+    Produces the same result as `json_format.MessageToDict(value_pb)`, without
+    the per-call overhead of the generic JSON printer.
+
+    Args:
+        value_pb (struct_pb2.Value):
+            Required. The raw protobuf Value to convert.
+
+    Returns:
+        The corresponding Python object.
+
+    Raises:
+        ValueError: If a number value is NaN or infinite, which cannot be
+            represented in JSON.
+    """
+    kind = value_pb.WhichOneof("kind")
+    if kind == "number_value":
+        number = value_pb.number_value
+        # Only NaN and infinite numbers yield a non-zero difference.
+        if number - number:
+            _raise_for_non_finite(number)
+        return number
+    if kind == "list_value":
+        items = value_pb.list_value.values
+        if (
+            len(items) >= _MIN_NUMBER_LIST_LENGTH
+            and items[0].WhichOneof("kind") == "number_value"
+        ):
+            numbers = _number_list_to_python(value_pb.list_value)
+            if numbers is not None:
+                return numbers
+        return [value_to_python(item) for item in items]
+    if kind == "struct_value":
+        return {
+            key: value_to_python(item)
+            for key, item in value_pb.struct_value.fields.items()
+        }
+    if kind == "string_value":
+        return value_pb.string_value
+    if kind == "bool_value":
+        return value_pb.bool_value
+    return None
+
+
+def _raise_for_non_finite(number: float) -> None:
+    """Raises the same error as `json_format.MessageToDict` for a non-finite number."""
+    if math.isinf(number):
+        raise ValueError(
+            "Fail to serialize Infinity for Value.number_value, "
+            "which would parse as string_value"
+        )
+    raise ValueError(
+        "Fail to serialize NaN for Value.number_value, "
+        "which would parse as string_value"
+    )
+
+
+def values_to_python(values_pb: Iterable[struct_pb2.Value]) -> List[Any]:
+    """Converts a sequence of `google.protobuf.Value` messages to Python objects.
+
+    Args:
+        values_pb (Iterable[struct_pb2.Value]):
+            Required. The raw protobuf Values to convert, for example
+            `PredictResponse.predictions.pb`.
+
+    Returns:
+        A list with one Python object per Value.
+    """
+    return [value_to_python(value_pb) for value_pb in values_pb]
+
+
+def to_numpy(values: List[Any]) -> "np.ndarray":
+    """Converts dense numeric predictions to a single NumPy array.
+
+    Args:
+        values (List[Any]):
+            Required. Predictions as numbers or equally shaped nested lists of
+            numbers.
+
+    Returns:
+        A NumPy array whose first dimension indexes the predictions.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If the predictions are not dense and numeric.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "NumPy is not installed. Please install numpy to return predictions "
+            "as NumPy arrays."
+        )
+
+    try:
+        array = np.asarray(values)
+    except ValueError as exc:
+        raise ValueError(
+            "Predictions must be equally shaped to be returned as a NumPy array."
+        ) from exc
+    if array.dtype.kind not in "biuf":
+        raise ValueError(
+            "Predictions must be numeric to be returned as a NumPy array, "
+            f"got values of type {array.dtype}."
+        )
+    return array
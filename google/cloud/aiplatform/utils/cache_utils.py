@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Client-side caches of results of deterministic service calls."""
+
+import base64
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import threading
+from typing import Any, Dict, Hashable, Iterable, Mapping, Optional, Sequence, Union
+
+# Lists of at least this many floats are stored as packed doubles on disk.
+_MIN_PACKED_FLOATS_LENGTH = 8
+_PACKED_FLOATS_KEY = "__float64__"
+# SQLite limits the number of parameters of a statement.
+_SQLITE_MAX_KEYS_PER_QUERY = 500
+# Marks keys missing from a cache, whose values can be None.
+_MISSING = object()
+
+
+def hash_key(*parts: Union[bytes, str]) -> str:
+    """Returns a stable hash of the given parts, usable as a cache key.
+
+    Args:
+        *parts (Union[bytes, str]):
+            Required. The parts identifying the cached value, e.g. the model
+            name and the serialized request.
+
+    Returns:
+        The hex digest of the SHA-256 hash of the length-prefixed parts.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class LruCache:
+    """Thread-safe in-memory cache evicting the least recently used entries."""
+
+    def __init__(self, max_size: int = 1024):
+        """Initializes the cache.
+
+        Args:
+            max_size (int):
+                Optional. The maximum number of entries kept in the cache.
+        """
+        if max_size < 1:
+            raise ValueError("`max_size` must be at least 1.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Returns the cached value of a key and marks it as recently used.
+
+        Args:
+            key (Hashable):
+                Required. The key of the value.
+            default (Any):
+                Optional. The value returned if the key is not cached.
+
+        Returns:
+            The cached value, or `default` if the key is not cached.
+        """
+        with self._lock:
+            value = self._get(key)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def _get(self, key: Hashable) -> Any:
+        """Returns the cached value of a key without counting the lookup.
+
+        Must be called with the lock held.
+        """
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return _MISSING
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Caches a value, evicting the least recently used entry if full.
+
+        Args:
+            key (Hashable):
+                Required. The key of the value.
+            value (Any):
+                Required. The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all entries and resets the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def embedding_cache_key(
+    model_name: str,
+    instance: Mapping[str, Any],
+    parameters: Optional[Mapping[str, Any]] = None,
+) -> str:
+    """Returns the cache key of the embedding of a prediction instance.
+
+    Args:
+        model_name (str):
+            Required. The resource name of the model or endpoint.
+        instance (Mapping[str, Any]):
+            Required. The instance sent to the model, holding the content and
+            options such as the task type and title.
+        parameters (Mapping[str, Any]):
+            Optional. The prediction parameters, such as the output
+            dimensionality.
+
+    Returns:
+        The cache key.
+    """
+    return hash_key(
+        model_name,
+        json.dumps(instance, sort_keys=True),
+        json.dumps(parameters or {}, sort_keys=True),
+    )
+
+
+def _pack_floats(value: Any) -> Any:
+    """Replaces long lists of floats of a JSON value with packed doubles."""
+    if isinstance(value, list):
+        if len(value) >= _MIN_PACKED_FLOATS_LENGTH and all(
+            type(item) is float for item in value
+        ):
+            return {
+                _PACKED_FLOATS_KEY: base64.b64encode(
+                    struct.pack(f"<{len(value)}d", *value)
+                ).decode("ascii")
+            }
+        return [_pack_floats(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _pack_floats(item) for key, item in value.items()}
+    return value
+
+
+def _unpack_floats(value: Dict[str, Any]) -> Any:
+    packed = value.get(_PACKED_FLOATS_KEY)
+    if packed is None or len(value) != 1:
+        return value
+    data = base64.b64decode(packed)
+    return list(struct.unpack(f"<{len(data) // 8}d", data))
+
+
+class SqliteCache:
+    """Persistent cache of JSON-serializable values in a SQLite database file.
+
+    The file can be shared by several processes. Long lists of floats, such as
+    embedding vectors, are stored as packed doubles.
+    """
+
+    def __init__(self, path: str):
+        """Opens or creates the cache.
+
+        Args:
+            path (str):
+                Required. The path of the SQLite database file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Returns the cached values of several keys.
+
+        Args:
+            keys (Sequence[str]):
+                Required. The keys of the values.
+
+        Returns:
+            The cached values by key. Keys that are not cached are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            values = self._get_many(keys)
+            self.hits += len(values)
+            self.misses += len(keys) - len(values)
+        return values
+
+    def _get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Returns the cached values of several keys without counting the lookups.
+
+        Must be called with the lock held.
+        """
+        values = {}
+        for start in range(0, len(keys), _SQLITE_MAX_KEYS_PER_QUERY):
+            chunk = keys[start : start + _SQLITE_MAX_KEYS_PER_QUERY]
+            rows = self._connection.execute(
+                "SELECT key, value FROM cache WHERE key IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for key, value in rows:
+                values[key] = json.loads(value, object_hook=_unpack_floats)
+        return values
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Returns the cached value of a key, or `default` if it is not cached."""
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, items: Iterable[Any]) -> None:
+        """Caches several values in a single transaction.
+
+        Args:
+            items (Iterable[Tuple[str, Any]]):
+                Required. The keys and JSON-serializable values to cache.
+        """
+        rows = [
+            (key, json.dumps(_pack_floats(value), separators=(",", ":")))
+            for key, value in items
+        ]
+        with self._lock:
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", rows
+                )
+
+    def put(self, key: str, value: Any) -> None:
+        """Caches a JSON-serializable value."""
+        self.put_many([(key, value)])
+
+    def clear(self) -> None:
+        """Removes all entries and resets the hit and miss counters."""
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+def _copy_json_value(value: Any) -> Any:
+    """Returns a copy of a JSON-serializable value, faster than `copy.deepcopy`."""
+    if isinstance(value, dict):
+        return {key: _copy_json_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_json_value(item) for item in value]
+    return value
+
+
+class EmbeddingCache:
+    """Cache of embeddings with an in-memory tier and an optional on-disk tier.
+
+    Embeddings are keyed by the model, the content and the options affecting
+    the embedding, so only inputs missing from the cache are sent to the model.
+    Lookups check the in-memory LRU tier first, then the SQLite tier, which
+    keeps embeddings across runs. Each lookup counts once in `hits` or
+    `misses`, whichever tier answers it. Callers get their own copies of the
+    cached embeddings.
+
+    Example usage:
+        cache = EmbeddingCache(path="embeddings.sqlite")
+        embeddings = model.get_embeddings(texts, cache=cache)
+        print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 10000):
+        """Initializes the cache.
+
+        Args:
+            path (str):
+                Optional. The path of the SQLite database file keeping the
+                embeddings across runs. If not set, embeddings are only kept in
+                memory.
+            max_memory_entries (int):
+                Optional. The maximum number of embeddings kept in memory.
+        """
+        self.hits = 0
+        self.misses = 0
+        self._memory_cache = LruCache(max_size=max_memory_entries)
+        self._disk_cache = SqliteCache(path) if path else None
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Returns the cached embeddings of several keys.
+
+        Args:
+            keys (Sequence[str]):
+                Required. The keys of the embeddings, see `embedding_cache_key`.
+
+        Returns:
+            The cached embeddings by key. Keys that are not cached are left out.
+        """
+        values = {}
+        missing_keys = []
+        # The tiers are read without counting, so that a lookup falling
+        # through to disk is not counted by both of them.
+        with self._memory_cache._lock:
+            for key in keys:
+                value = self._memory_cache._get(key)
+                if value is _MISSING:
+                    missing_keys.append(key)
+                else:
+                    values[key] = _copy_json_value(value)
+        if missing_keys and self._disk_cache is not None:
+            with self._disk_cache._lock:
+                disk_values = self._disk_cache._get_many(
+                    list(dict.fromkeys(missing_keys))
+                )
+            for key, value in disk_values.items():
+                self._memory_cache.put(key, _copy_json_value(value))
+            values.update(disk_values)
+        with self._lock:
+            self.hits += sum(1 for key in keys if key in values)
+            self.misses += sum(1 for key in keys if key not in values)
+        return values
+
+    def put_many(self, items: Mapping[str, Any]) -> None:
+        """Caches several embeddings.
+
+        Args:
+            items (Mapping[str, Any]):
+                Required. The JSON-serializable embeddings by key.
+        """
+        for key, value in items.items():
+            self._memory_cache.put(key, _copy_json_value(value))
+        if self._disk_cache is not None and items:
+            self._disk_cache.put_many(items.items())
+
+    def clear(self) -> None:
+        """Removes all embeddings and resets the hit and miss counters."""
+        self._memory_cache.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """Closes the on-disk tier."""
+        if self._disk_cache is not None:
+            self._disk_cache.close()
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Connection-pooled HTTP transport shared by Endpoint HTTP prediction calls."""
+
+import asyncio
+import threading
+from typing import Any, Optional, TYPE_CHECKING
+import weakref
+
+from google.auth import credentials as auth_credentials
+
+if TYPE_CHECKING:
+    import httpx
+    import urllib3
+    from google.auth.transport import requests as google_auth_requests
+
+_DEFAULT_NUM_POOLS = 10
+_DEFAULT_POOL_MAXSIZE = 10
+_DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+
+class HttpTransport:
+    """Pools HTTP connections for PrivateEndpoint and raw_predict requests.
+
+    Connections are kept alive and reused across requests, so concurrent
+    predictions stop paying for TCP and TLS setup on every call. A single
+    transport is shared by all endpoints unless one is set explicitly.
+
+    Example usage:
+        from google.cloud.aiplatform.utils import http_utils
+
+        http_utils.set_default_transport(
+            http_utils.HttpTransport(pool_maxsize=64, block=True)
+        )
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = _DEFAULT_POOL_MAXSIZE,
+        num_pools: int = _DEFAULT_NUM_POOLS,
+        block: bool = False,
+        keepalive_expiry: Optional[float] = _DEFAULT_KEEPALIVE_EXPIRY,
+    ):
+        """Initializes the transport.
+
+        Args:
+            pool_maxsize (int):
+                Optional. The maximum number of connections kept alive per host.
+            num_pools (int):
+                Optional. The maximum number of hosts connections are pooled for.
+            block (bool):
+                Optional. If set to True, requests wait for a pooled connection
+                to become free instead of opening a new one, which limits the
+                concurrent requests per host to `pool_maxsize`.
+            keepalive_expiry (float):
+                Optional. The time in seconds an idle connection of the async
+                client is kept alive. If None, idle connections never expire.
+        """
+        if pool_maxsize < 1:
+            raise ValueError("`pool_maxsize` must be at least 1.")
+        if num_pools < 1:
+            raise ValueError("`num_pools` must be at least 1.")
+
+        self.pool_maxsize = pool_maxsize
+        self.num_pools = num_pools
+        self.block = block
+        self.keepalive_expiry = keepalive_expiry
+
+        self._lock = threading.Lock()
+        self._pool_manager = None
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def pool_manager(self) -> "urllib3.PoolManager":
+        """The urllib3 pool manager used for synchronous requests.
+
+        Raises:
+            ImportError: If there is an issue importing the `urllib3` package.
+        """
+        if not self._pool_manager:
+            try:
+                import urllib3
+            except ImportError:
+                raise ImportError(
+                    "Cannot import the urllib3 HTTP client. Please install google-cloud-aiplatform[private_endpoints]."
+                )
+
+            with self._lock:
+                if not self._pool_manager:
+                    self._pool_manager = urllib3.PoolManager(
+                        num_pools=self.num_pools,
+                        maxsize=self.pool_maxsize,
+                        block=self.block,
+                    )
+        return self._pool_manager
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Any] = None,
+        headers: Optional[Any] = None,
+    ) -> "urllib3.response.HTTPResponse":
+        """Makes a synchronous HTTP request over a pooled connection.
+
+        Args:
+            method (str):
+                Required. The HTTP request method to use. Example: "POST" or "GET"
+            url (str):
+                Required. The url to send the request to.
+            body (Any):
+                Optional. Data sent in the HTTP request.
+            headers (Dict[str, str]):
+                Optional. Header in the HTTP request.
+
+        Returns:
+            urllib3.response.HTTPResponse:
+                A HTTP Response container.
+        """
+        return self.pool_manager.request(
+            method=method, url=url, body=body, headers=headers
+        )
+
+    def authorized_session(
+        self, credentials: auth_credentials.Credentials
+    ) -> "google_auth_requests.AuthorizedSession":
+        """Creates an authorized session whose connection pool follows this transport.
+
+        Args:
+            credentials (auth_credentials.Credentials):
+                Required. The credentials used to authorize requests.
+
+        Returns:
+            An AuthorizedSession with a connection pool sized by this transport.
+        """
+        from google.auth.transport import requests as google_auth_requests
+        from requests import adapters
+
+        session = google_auth_requests.AuthorizedSession(credentials)
+        adapter = adapters.HTTPAdapter(
+            pool_connections=self.num_pools,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def async_client(self) -> "httpx.AsyncClient":
+        """Returns the async HTTP client of the running event loop.
+
+        Async connections are bound to the event loop that opened them, so
+        one client is kept per loop.
+
+        Returns:
+            An httpx.AsyncClient with connection limits following this transport.
+
+        Raises:
+            ImportError: If there is an issue importing the `httpx` package.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "Cannot import the httpx HTTP client. Please install google-cloud-aiplatform[private_endpoints]."
+            )
+
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=(
+                        self.pool_maxsize * self.num_pools if self.block else None
+                    ),
+                    max_keepalive_connections=self.pool_maxsize * self.num_pools,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=None,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        """Closes the pooled synchronous connections."""
+        with self._lock:
+            if self._pool_manager:
+                self._pool_manager.clear()
+                self._pool_manager = None
+
+    async def aclose(self) -> None:
+        """Closes the async client of the running event loop."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+_default_transport = HttpTransport()
+
+
+def get_default_transport() -> HttpTransport:
+    """Returns the HTTP transport shared by endpoints without their own transport."""
+    return _default_transport
+
+
+def set_default_transport(transport: HttpTransport) -> None:
+    """Sets the HTTP transport shared by endpoints without their own transport.
+
+    Args:
+        transport (HttpTransport):
+            Required. The transport to share.
+    """
+    global _default_transport
+    _default_transport = transport
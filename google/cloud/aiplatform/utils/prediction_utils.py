@@ -15,24 +15,39 @@
 # limitations under the License.
 #
 
+import base64
+from concurrent import futures
+import contextlib
+import hashlib
 import shutil
 import inspect
 import logging
 import os
 from pathlib import Path
 import re
-from typing import Any, Optional, Sequence, Tuple, Type
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
 
 from google.cloud import storage
 from google.cloud.aiplatform.constants import prediction
 from google.cloud.aiplatform.utils import path_utils
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 _logger = logging.getLogger(__name__)
 
 
 REGISTRY_REGEX = re.compile(r"^([\w\-]+\-docker\.pkg\.dev|([\w]+\.|)gcr\.io)")
 GCS_URI_PREFIX = "gs://"
 
+_DEFAULT_DOWNLOAD_MAX_WORKERS = 8
+# Files of at least this size are downloaded in concurrent chunks.
+_CHUNKED_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+_DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+
 
 def inspect_source_from_class(
     custom_class: Type[Any],
@@ -118,24 +133,223 @@ def get_prediction_aip_http_port(
     )
 
 
-def download_model_artifacts(artifact_uri: str) -> None:
+def parse_server_timing(header_value: Optional[str]) -> Dict[str, float]:
+    """Parses the value of a Server-Timing header.
+
+    Args:
+        header_value (str):
+            Optional. The header value, e.g. "predict;dur=1.5, serialize;dur=0.1".
+
+    Returns:
+        The duration in milliseconds of each metric with a duration.
+    """
+    timings = {}
+    if not header_value:
+        return timings
+
+    for metric in header_value.split(","):
+        name, *params = [part.strip() for part in metric.split(";")]
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    timings[name] = float(value.strip().strip('"'))
+                except ValueError:
+                    pass
+    return timings
+
+
+def _cache_key(bucket_name: str, blob: storage.Blob) -> Optional[str]:
+    """Returns the content address of a blob, or None if its version is unknown."""
+    version = blob.generation or blob.etag
+    if not version:
+        return None
+    return hashlib.sha256(
+        f"{bucket_name}/{blob.name}#{version}".encode("utf-8")
+    ).hexdigest()
+
+
+def _temp_filename(filename: str) -> str:
+    """Returns a temporary file name next to a file, unique to this thread."""
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _download_blob_to_filename(
+    blob: storage.Blob, filename: str, executor: futures.Executor
+) -> None:
+    """Downloads a blob, in concurrent ranged chunks if it is large.
+
+    The chunks run on the executor shared by all downloads, so the number of
+    concurrent requests is bounded by its workers.
+    """
+    size = blob.size
+    if not isinstance(size, int) or size < _CHUNKED_DOWNLOAD_THRESHOLD:
+        blob.download_to_filename(filename)
+        return
+
+    with open(filename, "wb") as f:
+        f.truncate(size)
+
+    def _download_chunk(start: int) -> None:
+        end = min(start + _DOWNLOAD_CHUNK_SIZE, size) - 1
+        # Blobs are not thread-safe, so each chunk uses its own handle. The
+        # generation is pinned so that all chunks come from the same object.
+        chunk_blob = blob.bucket.blob(blob.name, generation=blob.generation)
+        with open(filename, "r+b") as f:
+            f.seek(start)
+            chunk_blob.download_to_file(
+                f, start=start, end=end, if_generation_match=blob.generation
+            )
+
+    starts = range(0, size, _DOWNLOAD_CHUNK_SIZE)
+    chunk_futures = [executor.submit(_download_chunk, start) for start in starts]
+    try:
+        for start, chunk_future in zip(starts, chunk_futures):
+            # Runs the chunks no worker has started yet, so that this download
+            # never waits for chunks queued behind itself.
+            if chunk_future.cancel():
+                _download_chunk(start)
+        for chunk_future in chunk_futures:
+            if not chunk_future.cancelled():
+                chunk_future.result()
+    except BaseException:
+        for chunk_future in chunk_futures:
+            chunk_future.cancel()
+        raise
+    _verify_checksum(blob, filename)
+
+
+def _verify_checksum(blob: storage.Blob, filename: str) -> None:
+    """Verifies a file downloaded in ranged chunks against the blob checksum.
+
+    Ranged downloads are not validated by the storage client, so the whole file
+    is checked once all chunks are written. The file is removed on mismatch.
+
+    Raises:
+        RuntimeError: If the checksum of the file does not match the blob.
+    """
+    # MD5 is preferred because hashlib is always native, composite objects
+    # only have a CRC32C checksum.
+    if blob.md5_hash:
+        checksum = hashlib.md5()
+        expected = blob.md5_hash
+    elif blob.crc32c:
+        import google_crc32c
+
+        checksum = google_crc32c.Checksum()
+        expected = blob.crc32c
+    else:
+        return
+
+    with open(filename, "rb") as f:
+        for data in iter(lambda: f.read(_DOWNLOAD_CHUNK_SIZE), b""):
+            checksum.update(data)
+    actual = base64.b64encode(checksum.digest()).decode("utf-8")
+    if actual != expected:
+        os.remove(filename)
+        raise RuntimeError(
+            f"Checksum mismatch while downloading gs://{blob.bucket.name}/{blob.name}: "
+            f"expected {expected}, got {actual}."
+        )
+
+
+@contextlib.contextmanager
+def _cache_lock(path: str):
+    """Holds an exclusive lock on a cache entry across processes, where supported."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _download_blob_with_cache(
+    blob: storage.Blob,
+    filename: str,
+    bucket_name: str,
+    cache_dir: Optional[str],
+    executor: futures.Executor,
+) -> None:
+    """Downloads a blob to a file, through the artifact cache if one is set."""
+    cache_key = _cache_key(bucket_name, blob) if cache_dir else None
+    if cache_key is None:
+        _download_blob_to_filename(blob, filename, executor)
+        return
+
+    cache_path = os.path.join(cache_dir, cache_key)
+    with _cache_lock(cache_path):
+        if not os.path.exists(cache_path):
+            # The file is created with open(), so its mode follows the umask
+            # like the files downloaded without a cache.
+            temp_path = _temp_filename(os.path.join(cache_dir, f".{cache_key}"))
+            try:
+                _download_blob_to_filename(blob, temp_path, executor)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        else:
+            _logger.info(
+                f"Using the cached artifact of gs://{bucket_name}/{blob.name}."
+            )
+
+    if os.path.exists(filename) and os.path.samefile(cache_path, filename):
+        return
+    # Other workers may place the same file concurrently, so the file is
+    # replaced atomically.
+    temp_filename = _temp_filename(filename)
+    try:
+        # Cache entries are never modified, so linking is safe and avoids a copy.
+        os.link(cache_path, temp_filename)
+    except OSError:
+        shutil.copyfile(cache_path, temp_filename)
+    os.replace(temp_filename, filename)
+
+
+def download_model_artifacts(
+    artifact_uri: str,
+    cache_dir: Optional[str] = None,
+    max_workers: int = _DEFAULT_DOWNLOAD_MAX_WORKERS,
+) -> None:
     """Prepares model artifacts in the current working directory.
 
     If artifact_uri is a GCS uri, the model artifacts will be downloaded to the current
-    working directory.
+    working directory. Files are downloaded concurrently, and large files in
+    concurrent chunks.
     If artifact_uri is a local directory, the model artifacts will be copied to the current
     working directory.
 
+    Downloaded files can be kept in a local cache shared by all model server
+    workers, keyed by the GCS object generation. A worker then reuses the files
+    downloaded by another worker or by a previous run of the container.
+
     Args:
         artifact_uri (str):
             Required. The artifact uri that includes model artifacts.
+        cache_dir (str):
+            Optional. The directory of the artifact cache. Defaults to the
+            environment variable VERTEX_CPR_ARTIFACTS_CACHE_DIR. Artifacts are
+            not cached if neither is set.
+        max_workers (int):
+            Optional. The maximum number of concurrent downloads, counting each
+            chunk of a large file as a download.
     """
     if artifact_uri.startswith(GCS_URI_PREFIX):
         matches = re.match(f"{GCS_URI_PREFIX}(.*?)/(.*)", artifact_uri)
         bucket_name, prefix = matches.groups()
 
+        cache_dir = cache_dir or os.getenv("VERTEX_CPR_ARTIFACTS_CACHE_DIR")
+        if cache_dir:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
         gcs_client = storage.Client()
         blobs = gcs_client.list_blobs(bucket_name, prefix=prefix)
+        downloads = []
         for blob in blobs:
             name_without_prefix = blob.name[len(prefix) :]
             name_without_prefix = (
@@ -147,7 +361,22 @@ def download_model_artifacts(artifact_uri: str) -> None:
             directory = "/".join(file_split[0:-1])
             Path(directory).mkdir(parents=True, exist_ok=True)
             if name_without_prefix and not name_without_prefix.endswith("/"):
-                blob.download_to_filename(name_without_prefix)
+                downloads.append((blob, name_without_prefix))
+
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            download_futures = [
+                executor.submit(
+                    _download_blob_with_cache,
+                    blob,
+                    filename,
+                    bucket_name,
+                    cache_dir,
+                    executor,
+                )
+                for blob, filename in downloads
+            ]
+            for download_future in download_futures:
+                download_future.result()
     else:
         # Copy files to the current working directory.
         shutil.copytree(artifact_uri, ".", dirs_exist_ok=True)
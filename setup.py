@@ -82,15 +82,20 @@ prediction_extra_require = [
     "docker >= 5.0.3",
     "fastapi >= 0.71.0, <=0.109.1",
     "httpx >=0.23.0, <0.25.0",  # Optional dependency of fastapi
+    "orjson >= 3.6.0",
     "starlette >= 0.17.1",
     "uvicorn[standard] >= 0.16.0",
 ]
 
-endpoint_extra_require = ["requests >= 2.28.1"]
+endpoint_extra_require = [
+    "requests >= 2.28.1",
+    "httpx >=0.23.0, <0.25.0",
+]
 
 private_endpoints_extra_require = [
     "urllib3 >=1.21.1, <1.27",
     "requests >= 2.28.1",
+    "httpx >=0.23.0, <0.25.0",
 ]
 
 autologging_extra_require = ["mlflow>=1.27.0,<=2.1.1"]
@@ -191,6 +196,7 @@ testing_extra_require = (
         "grpcio-testing",
         "ipython",
         "kfp >= 2.6.0, < 3.0.0",
+        "msgpack",
         "pyfakefs",
         "pytest-asyncio",
         "pytest-xdist",
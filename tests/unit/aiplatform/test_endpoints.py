@@ -15,7 +15,9 @@
 # limitations under the License.
 #
 
+import asyncio
 import copy
+import httpx
 import pytest
 import urllib3
 import json
@@ -35,6 +37,7 @@ from google.cloud.aiplatform import initializer
 from google.cloud.aiplatform import explain
 from google.cloud.aiplatform import models
 from google.cloud.aiplatform import utils
+from google.cloud.aiplatform.utils import http_utils
 
 from google.cloud.aiplatform.preview import models as preview_models
 
@@ -686,6 +689,22 @@ def predict_private_endpoint_mock():
         yield predict_mock
 
 
+@pytest.fixture
+def predict_async_private_endpoint_mock():
+    with mock.patch.object(
+        httpx.AsyncClient,
+        "request",
+        return_value=httpx.Response(
+            status_code=200,
+            json={
+                "predictions": _TEST_PREDICTION,
+                "metadata": _TEST_METADATA,
+            },
+        ),
+    ) as predict_mock:
+        yield predict_mock
+
+
 @pytest.fixture
 def health_check_private_endpoint_mock():
     with mock.patch.object(urllib3.PoolManager, "request") as health_check_mock:
@@ -1977,6 +1996,21 @@ class TestEndpoint:
             timeout=None,
         )
 
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_predict_return_numpy(self, predict_client_predict_mock):
+        import numpy as np
+
+        test_endpoint = models.Endpoint(_TEST_ID)
+        test_prediction = test_endpoint.predict(
+            instances=_TEST_INSTANCES, return_numpy=True
+        )
+
+        assert isinstance(test_prediction.predictions, np.ndarray)
+        np.testing.assert_array_equal(
+            test_prediction.predictions, np.array(_TEST_PREDICTION)
+        )
+        assert test_prediction.deployed_model_id == _TEST_ID
+
     @pytest.mark.asyncio
     @pytest.mark.usefixtures("get_endpoint_mock")
     async def test_predict_async(self, predict_async_client_predict_mock):
@@ -2002,6 +2036,207 @@ class TestEndpoint:
             timeout=None,
         )
 
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_predict_many(self, predict_client_predict_mock):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        test_prediction = test_endpoint.predict_many(
+            instances=_TEST_INSTANCES,
+            shard_size=1,
+            max_concurrency=2,
+            parameters={"param": 3.0},
+        )
+
+        # The mocked response returns every test prediction for each shard.
+        assert test_prediction == models.Prediction(
+            predictions=_TEST_PREDICTION * len(_TEST_INSTANCES),
+            deployed_model_id=_TEST_ID,
+            metadata=_TEST_METADATA,
+            model_version_id=_TEST_VERSION_ID,
+            model_resource_name=_TEST_MODEL_NAME,
+        )
+        assert predict_client_predict_mock.call_count == len(_TEST_INSTANCES)
+        for instance in _TEST_INSTANCES:
+            predict_client_predict_mock.assert_any_call(
+                endpoint=_TEST_ENDPOINT_NAME,
+                instances=[instance],
+                parameters={"param": 3.0},
+                timeout=None,
+                retry=models._PREDICT_MANY_RETRY,
+            )
+
+    @pytest.mark.parametrize("options", [{"shard_size": 0}, {"max_concurrency": 0}])
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_predict_many_with_invalid_options_raises(
+        self, predict_client_predict_mock, options
+    ):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        with pytest.raises(ValueError):
+            test_endpoint.predict_many(instances=_TEST_INSTANCES, **options)
+        predict_client_predict_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("options", [{"shard_size": 0}, {"max_concurrency": 0}])
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    async def test_predict_many_async_with_invalid_options_raises(
+        self, predict_async_client_predict_mock, options
+    ):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        with pytest.raises(ValueError):
+            await test_endpoint.predict_many_async(instances=_TEST_INSTANCES, **options)
+        predict_async_client_predict_mock.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    async def test_predict_many_async(self, predict_async_client_predict_mock):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        test_prediction = await test_endpoint.predict_many_async(
+            instances=_TEST_INSTANCES, shard_size=1, max_concurrency=1
+        )
+
+        assert test_prediction.predictions == _TEST_PREDICTION * len(_TEST_INSTANCES)
+        assert test_prediction.deployed_model_id == _TEST_ID
+        assert [
+            call.kwargs["instances"]
+            for call in predict_async_client_predict_mock.call_args_list
+        ] == [[instance] for instance in _TEST_INSTANCES]
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    async def test_raw_predict_async(self):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        test_endpoint.credentials = mock.Mock(valid=False)
+        with mock.patch.object(
+            httpx.AsyncClient,
+            "post",
+            return_value=httpx.Response(status_code=200, json={"predictions": []}),
+        ) as post_mock:
+            test_response = await test_endpoint.raw_predict_async(
+                body=b'{"instances": []}',
+                headers={"Content-Type": "application/json"},
+            )
+
+        assert test_response.status_code == 200
+        test_endpoint.credentials.refresh.assert_called_once()
+        test_endpoint.credentials.apply.assert_called_once_with(
+            {"Content-Type": "application/json"}
+        )
+        post_mock.assert_called_once_with(
+            url=(
+                f"https://{_TEST_LOCATION}-aiplatform.googleapis.com/v1/projects/"
+                f"{_TEST_PROJECT}/locations/{_TEST_LOCATION}/endpoints/{_TEST_ID}"
+                ":rawPredict"
+            ),
+            content=b'{"instances": []}',
+            headers={"Content-Type": "application/json"},
+        )
+
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_batcher_predict(self, predict_client_predict_mock):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        with test_endpoint.batcher(
+            max_batch_size=len(_TEST_INSTANCES), max_latency_ms=60_000
+        ) as batcher:
+            test_futures = [
+                batcher.submit(instances=[instance]) for instance in _TEST_INSTANCES
+            ]
+            test_predictions = [future.result() for future in test_futures]
+
+        assert [prediction.predictions for prediction in test_predictions] == [
+            [prediction] for prediction in _TEST_PREDICTION
+        ]
+        assert all(
+            prediction.deployed_model_id == _TEST_ID
+            and prediction.model_resource_name == _TEST_MODEL_NAME
+            for prediction in test_predictions
+        )
+        predict_client_predict_mock.assert_called_once_with(
+            endpoint=_TEST_ENDPOINT_NAME,
+            instances=_TEST_INSTANCES,
+            parameters=None,
+            timeout=None,
+        )
+
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_batcher_close_flushes_pending_instances(self, predict_client_predict_mock):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        batcher = test_endpoint.batcher(max_batch_size=100, max_latency_ms=60_000)
+        test_futures = [
+            batcher.submit(instances=[instance]) for instance in _TEST_INSTANCES
+        ]
+        batcher.close()
+
+        assert [future.result().predictions for future in test_futures] == [
+            [prediction] for prediction in _TEST_PREDICTION
+        ]
+        with pytest.raises(RuntimeError):
+            batcher.submit(instances=_TEST_INSTANCES)
+
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    def test_batcher_predict_propagates_mismatched_prediction_count(
+        self, predict_client_predict_mock
+    ):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        with test_endpoint.batcher(max_batch_size=1, max_latency_ms=0) as batcher:
+            with pytest.raises(RuntimeError, match="Expected 1 predictions"):
+                batcher.predict(instances=[_TEST_INSTANCES[0]])
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    async def test_batcher_predict_async(self, predict_async_client_predict_mock):
+        test_endpoint = models.Endpoint(_TEST_ID)
+        batcher = test_endpoint.batcher(
+            max_batch_size=len(_TEST_INSTANCES), max_latency_ms=60_000
+        )
+        test_predictions = await asyncio.gather(
+            *[
+                batcher.predict_async(instances=[instance])
+                for instance in _TEST_INSTANCES
+            ]
+        )
+
+        assert [prediction.predictions for prediction in test_predictions] == [
+            [prediction] for prediction in _TEST_PREDICTION
+        ]
+        predict_async_client_predict_mock.assert_called_once_with(
+            endpoint=_TEST_ENDPOINT_NAME,
+            instances=_TEST_INSTANCES,
+            parameters=None,
+            timeout=None,
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_endpoint_mock")
+    async def test_batcher_predict_async_does_not_exceed_max_batch_size(
+        self, predict_async_client_predict_mock
+    ):
+        def predict(endpoint, instances, parameters, timeout):
+            response = gca_prediction_service.PredictResponse(
+                deployed_model_id=_TEST_MODEL_ID
+            )
+            response.predictions.extend([float(i) for i in range(len(instances))])
+            return response
+
+        predict_async_client_predict_mock.side_effect = predict
+        test_endpoint = models.Endpoint(_TEST_ID)
+        batcher = test_endpoint.batcher(
+            max_batch_size=len(_TEST_INSTANCES) + 1, max_latency_ms=60_000
+        )
+        test_predictions = await asyncio.gather(
+            batcher.predict_async(instances=_TEST_INSTANCES),
+            batcher.predict_async(instances=_TEST_INSTANCES),
+            batcher.predict_async(instances=_TEST_INSTANCES[:1]),
+        )
+
+        assert [len(prediction.predictions) for prediction in test_predictions] == [
+            len(_TEST_INSTANCES),
+            len(_TEST_INSTANCES),
+            1,
+        ]
+        assert [
+            call.kwargs["instances"]
+            for call in predict_async_client_predict_mock.call_args_list
+        ] == [_TEST_INSTANCES, _TEST_INSTANCES + _TEST_INSTANCES[:1]]
+
     @pytest.mark.usefixtures("get_endpoint_mock")
     def test_explain(self, predict_client_explain_mock):
         test_endpoint = models.Endpoint(_TEST_ID)
@@ -2366,6 +2601,77 @@ class TestPrivateEndpoint:
             headers={"Content-Type": "application/json"},
         )
 
+    @pytest.mark.usefixtures("get_private_endpoint_with_model_mock")
+    def test_predict_with_custom_http_transport(self, predict_private_endpoint_mock):
+        test_endpoint = models.PrivateEndpoint(_TEST_ID)
+        test_transport = http_utils.HttpTransport(pool_maxsize=32)
+        test_endpoint.http_transport = test_transport
+
+        test_endpoint.predict(instances=_TEST_INSTANCES)
+
+        assert test_endpoint.http_transport is test_transport
+        assert test_transport.pool_manager.connection_pool_kw["maxsize"] == 32
+        predict_private_endpoint_mock.assert_called_once()
+
+    def test_endpoints_share_default_http_transport(self):
+        test_endpoint = models.Endpoint._construct_sdk_resource_from_gapic(
+            models.gca_endpoint_compat.Endpoint(name=_TEST_ENDPOINT_NAME)
+        )
+        assert test_endpoint.http_transport is http_utils.get_default_transport()
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_private_endpoint_with_model_mock")
+    async def test_predict_async(self, predict_async_private_endpoint_mock):
+        test_endpoint = models.PrivateEndpoint(_TEST_ID)
+        test_prediction = await test_endpoint.predict_async(
+            instances=_TEST_INSTANCES, parameters={"param": 3.0}
+        )
+
+        true_prediction = models.Prediction(
+            predictions=_TEST_PREDICTION,
+            deployed_model_id=_TEST_ID,
+            metadata=_TEST_METADATA,
+        )
+
+        assert true_prediction == test_prediction
+        predict_async_private_endpoint_mock.assert_called_once_with(
+            method="POST",
+            url="",
+            content=(
+                '{"instances": [[1.0, 2.0, 3.0], [1.0, 3.0, 4.0]], '
+                '"parameters": {"param": 3.0}}'
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_private_endpoint_with_model_mock")
+    async def test_raw_predict_async(self, predict_async_private_endpoint_mock):
+        test_endpoint = models.PrivateEndpoint(_TEST_ID)
+        test_response = await test_endpoint.raw_predict_async(
+            body=b'{"instances": []}', headers={"Content-Type": "application/json"}
+        )
+
+        assert test_response.json()["predictions"] == _TEST_PREDICTION
+        predict_async_private_endpoint_mock.assert_called_once_with(
+            method="POST",
+            url="",
+            content=b'{"instances": []}',
+            headers={"Content-Type": "application/json"},
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.usefixtures("get_private_endpoint_with_model_mock")
+    async def test_predict_async_raises_on_error_status(self):
+        with mock.patch.object(
+            httpx.AsyncClient,
+            "request",
+            return_value=httpx.Response(status_code=500, text="internal error"),
+        ):
+            test_endpoint = models.PrivateEndpoint(_TEST_ID)
+            with pytest.raises(RuntimeError, match="500 - Failed to make request"):
+                await test_endpoint.predict_async(instances=_TEST_INSTANCES)
+
     @pytest.mark.usefixtures("get_private_endpoint_with_model_mock")
     def test_health_check(self, health_check_private_endpoint_mock):
         test_endpoint = models.PrivateEndpoint(_TEST_ID)
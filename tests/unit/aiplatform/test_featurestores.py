@@ -18,7 +18,9 @@
 import copy
 import pytest
 import datetime
+import gc
 import pandas as pd
+import pyarrow
 import uuid
 
 from unittest import mock
@@ -36,6 +38,8 @@ from google.cloud.aiplatform.utils import resource_manager_utils
 
 from google.cloud.aiplatform.utils import featurestore_utils
 from google.cloud.aiplatform.featurestore.feature import Feature
+from google.cloud.aiplatform.featurestore import _entity_type
+from google.cloud.aiplatform.featurestore import featurestore as featurestore_module
 from google.cloud.aiplatform.compat.services import (
     featurestore_service_client,
 )
@@ -76,6 +80,7 @@ from google.cloud.aiplatform.compat.types import (
 
 from google.cloud import bigquery
 from google.cloud import bigquery_storage
+from google.cloud import storage
 from google.cloud.bigquery_storage_v1.types import stream as gcbqs_stream
 
 from google.cloud import resourcemanager
@@ -265,6 +270,12 @@ _TEST_IMPORTING_FEATURE_ID = "my_feature_id_1"
 _TEST_IMPORTING_FEATURE_SOURCE_FIELD = "my_feature_id_1_source_field"
 
 _TEST_IMPORTING_FEATURE_IDS = ["my_feature_id_1"]
+_TEST_IMPORTING_FEATURE_LIST = [
+    gca_feature.Feature(
+        name=f"{_TEST_ENTITY_TYPE_NAME}/features/my_feature_id_1",
+        value_type=_TEST_FEATURE_VALUE_TYPE,
+    ),
+]
 
 _TEST_IMPORTING_FEATURE_SOURCE_FIELDS = {
     "my_feature_id_1": "my_feature_id_1_source_field",
@@ -491,6 +502,20 @@ def bq_init_schema_field_mock(bq_schema_field_mock):
         yield bq_init_schema_field_mock
 
 
+def _get_read_rows_mock(batches_by_stream):
+    def read_rows(stream_name):
+        pages = []
+        for batch in batches_by_stream[stream_name]:
+            page = mock.Mock()
+            page.to_arrow.return_value = batch
+            pages.append(page)
+        reader = mock.Mock()
+        reader.rows.return_value.pages = pages
+        return reader
+
+    return read_rows
+
+
 # All Featurestore Mocks
 @pytest.fixture
 def get_featurestore_mock():
@@ -738,6 +763,26 @@ def list_features_mock():
         yield list_features_mock
 
 
+@pytest.fixture
+def list_importing_features_mock():
+    with patch.object(
+        featurestore_service_client.FeaturestoreServiceClient, "list_features"
+    ) as list_importing_features_mock:
+        list_importing_features_mock.return_value = _TEST_IMPORTING_FEATURE_LIST
+        yield list_importing_features_mock
+
+
+@pytest.fixture
+def storage_blob_mock():
+    with patch.object(storage, "Client"), patch.object(
+        storage.Blob, "from_string"
+    ) as from_string_mock:
+        blob_mock = mock.Mock(storage.Blob)
+        blob_mock.bucket = mock.Mock(storage.Bucket)
+        from_string_mock.return_value = blob_mock
+        yield blob_mock
+
+
 @pytest.fixture
 def delete_feature_mock():
     with mock.patch.object(
@@ -2034,6 +2079,220 @@ class TestFeaturestore:
             timeout=None,
         )
 
+    @pytest.mark.usefixtures(
+        "get_featurestore_mock",
+        "bq_init_client_mock",
+        "bq_init_dataset_mock",
+        "bq_create_dataset_mock",
+        "bq_load_table_from_dataframe_mock",
+        "bqs_init_client_mock",
+        "get_project_mock",
+        "batch_read_feature_values_mock",
+    )
+    @pytest.mark.parametrize("return_arrow", [False, True])
+    def test_batch_serve_to_df_reads_streams_concurrently(
+        self,
+        bq_delete_dataset_mock,
+        bqs_client_mock,
+        bqs_create_read_session,
+        return_arrow,
+    ):
+        aiplatform.init(project=_TEST_PROJECT_DIFF)
+        bqs_create_read_session.return_value = gcbqs_stream.ReadSession(
+            streams=[
+                gcbqs_stream.ReadStream(name="stream_1"),
+                gcbqs_stream.ReadStream(name="stream_2"),
+            ]
+        )
+        bqs_client_mock.read_rows.side_effect = _get_read_rows_mock(
+            {
+                "stream_1": [
+                    pyarrow.record_batch({"entity_id": ["a", "b"], "f": [1, 2]}),
+                    pyarrow.record_batch({"entity_id": ["c"], "f": [3]}),
+                ],
+                "stream_2": [pyarrow.record_batch({"entity_id": ["d"], "f": [4]})],
+            }
+        )
+
+        my_featurestore = aiplatform.Featurestore(
+            featurestore_name=_TEST_FEATURESTORE_NAME
+        )
+        result = my_featurestore.batch_serve_to_df(
+            serving_feature_ids=_TEST_SERVING_FEATURE_IDS,
+            read_instances_df=pd.DataFrame(),
+            return_arrow=return_arrow,
+        )
+
+        if return_arrow:
+            assert isinstance(result, pyarrow.Table)
+            result = result.to_pandas()
+        assert sorted(result["entity_id"]) == ["a", "b", "c", "d"]
+        assert result.set_index("entity_id")["f"].to_dict() == {
+            "a": 1,
+            "b": 2,
+            "c": 3,
+            "d": 4,
+        }
+        assert bqs_client_mock.read_rows.call_count == 2
+        bq_delete_dataset_mock.assert_called_once()
+
+    @pytest.mark.usefixtures(
+        "get_featurestore_mock",
+        "bq_init_client_mock",
+        "bq_init_dataset_mock",
+        "bq_create_dataset_mock",
+        "bq_load_table_from_dataframe_mock",
+        "bqs_init_client_mock",
+        "get_project_mock",
+        "batch_read_feature_values_mock",
+    )
+    @pytest.mark.parametrize("return_arrow", [False, True])
+    def test_batch_serve_to_df_as_iterator(
+        self,
+        bq_delete_dataset_mock,
+        bqs_client_mock,
+        bqs_create_read_session,
+        return_arrow,
+    ):
+        aiplatform.init(project=_TEST_PROJECT_DIFF)
+        bqs_create_read_session.return_value = gcbqs_stream.ReadSession(
+            streams=[gcbqs_stream.ReadStream(name="stream_1")]
+        )
+        bqs_client_mock.read_rows.side_effect = _get_read_rows_mock(
+            {
+                "stream_1": [
+                    pyarrow.record_batch({"entity_id": ["a"], "f": [1]}),
+                    pyarrow.record_batch({"entity_id": ["b"], "f": [2]}),
+                ],
+            }
+        )
+
+        my_featurestore = aiplatform.Featurestore(
+            featurestore_name=_TEST_FEATURESTORE_NAME
+        )
+        batches = my_featurestore.batch_serve_to_df(
+            serving_feature_ids=_TEST_SERVING_FEATURE_IDS,
+            read_instances_df=pd.DataFrame(),
+            return_arrow=return_arrow,
+            return_iterator=True,
+        )
+        bq_delete_dataset_mock.assert_not_called()
+
+        results = list(batches)
+
+        assert len(results) == 2
+        expected_type = pyarrow.RecordBatch if return_arrow else pd.DataFrame
+        assert all(isinstance(result, expected_type) for result in results)
+        assert [str(result["entity_id"][0]) for result in results] == ["a", "b"]
+        bq_delete_dataset_mock.assert_called_once()
+
+    @pytest.mark.usefixtures(
+        "get_featurestore_mock",
+        "bq_init_client_mock",
+        "bq_init_dataset_mock",
+        "bq_create_dataset_mock",
+        "bq_load_table_from_dataframe_mock",
+        "bqs_init_client_mock",
+        "get_project_mock",
+        "batch_read_feature_values_mock",
+    )
+    def test_batch_serve_to_df_as_iterator_closed_early(
+        self, bq_delete_dataset_mock, bqs_client_mock, bqs_create_read_session
+    ):
+        aiplatform.init(project=_TEST_PROJECT_DIFF)
+        bqs_create_read_session.return_value = gcbqs_stream.ReadSession(
+            streams=[gcbqs_stream.ReadStream(name="stream_1")]
+        )
+        bqs_client_mock.read_rows.side_effect = _get_read_rows_mock(
+            {
+                "stream_1": [
+                    pyarrow.record_batch({"f": [value]}) for value in range(100)
+                ],
+            }
+        )
+
+        my_featurestore = aiplatform.Featurestore(
+            featurestore_name=_TEST_FEATURESTORE_NAME
+        )
+        with my_featurestore.batch_serve_to_df(
+            serving_feature_ids=_TEST_SERVING_FEATURE_IDS,
+            read_instances_df=pd.DataFrame(),
+            return_arrow=True,
+            return_iterator=True,
+        ) as batches:
+            assert next(batches)["f"][0].as_py() == 0
+
+        bq_delete_dataset_mock.assert_called_once()
+        with pytest.raises(StopIteration):
+            next(batches)
+
+    @pytest.mark.usefixtures(
+        "get_featurestore_mock",
+        "bq_init_client_mock",
+        "bq_init_dataset_mock",
+        "bq_create_dataset_mock",
+        "bq_load_table_from_dataframe_mock",
+        "bqs_init_client_mock",
+        "get_project_mock",
+        "batch_read_feature_values_mock",
+    )
+    def test_batch_serve_to_df_as_iterator_abandoned(
+        self, bq_delete_dataset_mock, bqs_client_mock, bqs_create_read_session
+    ):
+        aiplatform.init(project=_TEST_PROJECT_DIFF)
+        bqs_create_read_session.return_value = gcbqs_stream.ReadSession(
+            streams=[gcbqs_stream.ReadStream(name="stream_1")]
+        )
+        bqs_client_mock.read_rows.side_effect = _get_read_rows_mock(
+            {
+                "stream_1": [
+                    pyarrow.record_batch({"f": [value]}) for value in range(100)
+                ],
+            }
+        )
+
+        my_featurestore = aiplatform.Featurestore(
+            featurestore_name=_TEST_FEATURESTORE_NAME
+        )
+        batches = my_featurestore.batch_serve_to_df(
+            serving_feature_ids=_TEST_SERVING_FEATURE_IDS,
+            read_instances_df=pd.DataFrame(),
+            return_arrow=True,
+            return_iterator=True,
+        )
+        next(batches)
+        del batches
+        gc.collect()
+
+        bq_delete_dataset_mock.assert_called_once()
+
+    @pytest.mark.usefixtures("get_featurestore_mock")
+    def test_batch_serve_to_df_invalid_max_concurrency_raises(self):
+        aiplatform.init(project=_TEST_PROJECT_DIFF)
+        my_featurestore = aiplatform.Featurestore(
+            featurestore_name=_TEST_FEATURESTORE_NAME
+        )
+
+        with pytest.raises(ValueError, match="max_concurrency"):
+            my_featurestore.batch_serve_to_df(
+                serving_feature_ids=_TEST_SERVING_FEATURE_IDS,
+                read_instances_df=pd.DataFrame(),
+                max_concurrency=0,
+            )
+
+    def test_read_record_batches_propagates_stream_errors(self):
+        read_client = mock.Mock()
+        read_client.read_rows.side_effect = _get_read_rows_mock(
+            {"stream_1": [pyarrow.record_batch({"f": [1]})]}
+        )
+
+        with pytest.raises(KeyError):
+            list(
+                featurestore_module._read_record_batches(
+                    read_client, ["stream_1", "stream_2"], max_concurrency=2
+                )
+            )
+
 
 @pytest.mark.usefixtures("google_auth_mock")
 class TestEntityType:
@@ -2467,7 +2726,7 @@ class TestEntityType:
 
     @pytest.mark.usefixtures(
         "get_entity_type_mock",
-        "get_feature_mock",
+        "list_importing_features_mock",
         "bq_init_client_mock",
         "bq_init_dataset_mock",
         "bq_create_dataset_mock",
@@ -2533,7 +2792,7 @@ class TestEntityType:
 
     @pytest.mark.usefixtures(
         "get_entity_type_mock",
-        "get_feature_mock",
+        "list_importing_features_mock",
         "bq_init_client_mock",
         "bq_init_dataset_mock",
         "bq_create_dataset_mock",
@@ -2601,6 +2860,115 @@ class TestEntityType:
             timeout=None,
         )
 
+    @pytest.mark.usefixtures("get_entity_type_mock", "list_importing_features_mock")
+    @patch("uuid.uuid4", uuid_mock)
+    def test_ingest_from_df_using_gcs_staging_dir(
+        self, import_feature_values_mock, storage_blob_mock
+    ):
+        aiplatform.init(project=_TEST_PROJECT)
+
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        df_source = pd.DataFrame(
+            {
+                "entity_id": ["entity_1", "entity_2"],
+                "my_feature_id_1_source_field": [1, 2],
+                _TEST_FEATURE_TIME_FIELD: pd.to_datetime(
+                    ["2022-01-01 11:59:59.123", "2022-01-02 00:00:00.000"]
+                ),
+                "unused_column": ["a", "b"],
+            }
+        )
+        my_entity_type.ingest_from_df(
+            feature_ids=_TEST_IMPORTING_FEATURE_IDS,
+            feature_time=_TEST_FEATURE_TIME_FIELD,
+            df_source=df_source,
+            feature_source_fields=_TEST_IMPORTING_FEATURE_SOURCE_FIELDS,
+            gcs_staging_dir="gs://my_bucket/staging/",
+        )
+
+        expected_uri = (
+            f"gs://my_bucket/staging/temp_{_TEST_ENTITY_TYPE_ID}_{uuid.uuid4()}"
+            "/00000.csv"
+        )
+        storage_blob_mock.upload_from_string.assert_called_once_with(
+            b'"entity_id","my_feature_id_1_source_field","feature_time_field"\n'
+            b'"entity_1",1,"2022-01-01T11:59:59.123Z"\n'
+            b'"entity_2",2,"2022-01-02T00:00:00.000Z"\n',
+            content_type="text/csv",
+        )
+        expected_import_feature_values_request = (
+            gca_featurestore_service.ImportFeatureValuesRequest(
+                entity_type=_TEST_ENTITY_TYPE_NAME,
+                feature_specs=[
+                    gca_featurestore_service.ImportFeatureValuesRequest.FeatureSpec(
+                        id="my_feature_id_1",
+                        source_field="my_feature_id_1_source_field",
+                    ),
+                ],
+                csv_source=gca_io.CsvSource(
+                    gcs_source=gca_io.GcsSource(uris=[expected_uri])
+                ),
+                feature_time_field=_TEST_FEATURE_TIME_FIELD,
+            )
+        )
+        import_feature_values_mock.assert_called_once_with(
+            request=expected_import_feature_values_request,
+            metadata=_TEST_REQUEST_METADATA,
+            timeout=None,
+        )
+        storage_blob_mock.bucket.delete_blobs.assert_called_once()
+
+    @pytest.mark.usefixtures("get_entity_type_mock", "list_importing_features_mock")
+    @pytest.mark.parametrize(
+        "feature_ids, gcs_staging_dir, max_concurrency",
+        [
+            (["my_feature_id_1", "missing_feature_id"], None, 1),
+            (["my_feature_id_1"], "my_bucket/staging", 1),
+            (["my_feature_id_1"], "gs://my_bucket/staging", 0),
+        ],
+    )
+    def test_ingest_from_df_raises_value_error(
+        self,
+        import_feature_values_mock,
+        feature_ids,
+        gcs_staging_dir,
+        max_concurrency,
+    ):
+        aiplatform.init(project=_TEST_PROJECT)
+
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        with pytest.raises(ValueError):
+            my_entity_type.ingest_from_df(
+                feature_ids=feature_ids,
+                feature_time=_TEST_FEATURE_TIME_FIELD,
+                df_source=pd.DataFrame(),
+                gcs_staging_dir=gcs_staging_dir,
+                max_concurrency=max_concurrency,
+            )
+        import_feature_values_mock.assert_not_called()
+
+    @pytest.mark.usefixtures("get_entity_type_mock")
+    def test_ingest_from_df_using_gcs_staging_dir_with_array_feature(
+        self, import_feature_values_mock, list_importing_features_mock
+    ):
+        list_importing_features_mock.return_value = [
+            gca_feature.Feature(
+                name=f"{_TEST_ENTITY_TYPE_NAME}/features/my_feature_id_1",
+                value_type=_TEST_INT_ARR_TYPE,
+            ),
+        ]
+        aiplatform.init(project=_TEST_PROJECT)
+
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        with pytest.raises(ValueError):
+            my_entity_type.ingest_from_df(
+                feature_ids=_TEST_IMPORTING_FEATURE_IDS,
+                feature_time=_TEST_FEATURE_TIME_FIELD,
+                df_source=pd.DataFrame(),
+                gcs_staging_dir="gs://my_bucket/staging",
+            )
+        import_feature_values_mock.assert_not_called()
+
     @pytest.mark.parametrize(
         "feature_value_type, expected_field_type, expected_mode",
         [
@@ -2705,6 +3073,71 @@ class TestEntityType:
         assert result.entity_id[0] == _TEST_READ_ENTITY_ID
         assert result.get(_TEST_FEATURE_ID)[0] == _TEST_FEATURE_VALUE
 
+    @pytest.mark.usefixtures("get_entity_type_mock", "get_feature_mock")
+    def test_read_multiple_entities_as_arrow(self, streaming_read_feature_values_mock):
+        aiplatform.init(project=_TEST_PROJECT)
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        result = my_entity_type.read(
+            entity_ids=_TEST_READ_ENTITY_IDS,
+            feature_ids=_TEST_FEATURE_ID,
+            return_arrow=True,
+        )
+        assert isinstance(result, pyarrow.Table)
+        assert result.schema.field(_TEST_FEATURE_ID).type == pyarrow.int64()
+        assert result.to_pydict() == {
+            "entity_id": [_TEST_READ_ENTITY_ID],
+            _TEST_FEATURE_ID: [_TEST_FEATURE_VALUE],
+        }
+
+    @pytest.mark.usefixtures("get_entity_type_mock", "get_feature_mock")
+    def test_read_multiple_entities_in_chunks(self):
+        aiplatform.init(project=_TEST_PROJECT)
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        entity_ids = [f"entity_{i}" for i in range(250)]
+
+        def streaming_read_feature_values(request, metadata, timeout):
+            yield gca_featurestore_online_service.ReadFeatureValuesResponse(
+                header=_get_header_proto(feature_ids=[_TEST_FEATURE_ID])
+            )
+            for entity_id in request.entity_ids:
+                yield gca_featurestore_online_service.ReadFeatureValuesResponse(
+                    entity_view=_get_entity_view_proto(
+                        entity_id=entity_id,
+                        feature_value_types=[_TEST_FEATURE_VALUE_TYPE],
+                        feature_values=[int(entity_id.split("_")[1])],
+                    ),
+                )
+
+        with patch.object(
+            featurestore_online_serving_service_client.FeaturestoreOnlineServingServiceClient,
+            "streaming_read_feature_values",
+            side_effect=streaming_read_feature_values,
+        ) as streaming_read_feature_values_mock:
+            result = my_entity_type.read(
+                entity_ids=entity_ids,
+                feature_ids=_TEST_FEATURE_ID,
+                max_concurrency=2,
+            )
+
+        assert sorted(
+            len(call.kwargs["request"].entity_ids)
+            for call in streaming_read_feature_values_mock.call_args_list
+        ) == [50, 100, 100]
+        assert result.entity_id.tolist() == entity_ids
+        assert result.get(_TEST_FEATURE_ID).tolist() == list(range(250))
+
+    @pytest.mark.usefixtures("get_entity_type_mock")
+    def test_read_invalid_max_concurrency_raises(self):
+        aiplatform.init(project=_TEST_PROJECT)
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+
+        with pytest.raises(ValueError, match="max_concurrency"):
+            my_entity_type.read(
+                entity_ids=_TEST_READ_ENTITY_IDS,
+                feature_ids=_TEST_FEATURE_ID,
+                max_concurrency=0,
+            )
+
     @pytest.mark.usefixtures("get_entity_type_mock")
     @pytest.mark.parametrize(
         "instance, entity_id, expected_feature_values",
@@ -3118,8 +3551,97 @@ class TestEntityType:
                     entity_id=entity_id, feature_values=expected_feature_values
                 )
             ],
+            retry=_entity_type._WRITE_FEATURE_VALUES_RETRY,
+        )
+
+    @pytest.mark.usefixtures("get_entity_type_mock")
+    def test_write_feature_values_invalid_max_concurrency_raises(
+        self, write_feature_values_mock
+    ):
+        aiplatform.init(project=_TEST_PROJECT)
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+
+        with pytest.raises(ValueError, match="max_concurrency"):
+            my_entity_type.write_feature_values(
+                instances={"entity": {"int_feature": 1}}, max_concurrency=0
+            )
+
+        write_feature_values_mock.assert_not_called()
+
+    @pytest.mark.usefixtures("get_entity_type_mock")
+    def test_write_feature_values_in_batches(self, write_feature_values_mock):
+        aiplatform.init(project=_TEST_PROJECT)
+        my_entity_type = aiplatform.EntityType(entity_type_name=_TEST_ENTITY_TYPE_NAME)
+        df = pd.DataFrame(
+            data={
+                "double_feature": [i / 2 for i in range(250)],
+                "int_feature": list(range(250)),
+                "string_feature": [f"value_{i}" for i in range(250)],
+            },
+            index=[f"entity_{i}" for i in range(250)],
+        )
+
+        my_entity_type.write_feature_values(
+            instances=df,
+            feature_time=_TEST_FEATURE_TIME_DATETIME_UTC,
+            max_payloads_per_request=100,
+            max_concurrency=2,
+        )
+
+        payloads = sorted(
+            (
+                payload
+                for call in write_feature_values_mock.call_args_list
+                for payload in call.kwargs["payloads"]
+            ),
+            key=lambda payload: int(payload.entity_id.split("_")[1]),
+        )
+        assert sorted(
+            len(call.kwargs["payloads"])
+            for call in write_feature_values_mock.call_args_list
+        ) == [50, 100, 100]
+        metadata = gca_featurestore_online_service.FeatureValue.Metadata(
+            generate_time=_TEST_FEATURE_TIME_DATETIME_UTC
+        )
+        assert payloads[7] == gca_featurestore_online_service.WriteFeatureValuesPayload(
+            entity_id="entity_7",
+            feature_values={
+                "double_feature": gca_featurestore_online_service.FeatureValue(
+                    double_value=3.5, metadata=metadata
+                ),
+                "int_feature": gca_featurestore_online_service.FeatureValue(
+                    int64_value=7, metadata=metadata
+                ),
+                "string_feature": gca_featurestore_online_service.FeatureValue(
+                    string_value="value_7", metadata=metadata
+                ),
+            },
         )
 
+    def test_batch_payloads_by_size(self):
+        payloads = [
+            gca_featurestore_online_service.WriteFeatureValuesPayload(
+                entity_id=f"entity_{i}",
+                feature_values={
+                    "bytes_feature": gca_featurestore_online_service.FeatureValue(
+                        bytes_value=b"x" * 100
+                    )
+                },
+            )
+            for i in range(10)
+        ]
+        batches = aiplatform.EntityType._batch_payloads(
+            payloads=payloads, max_request_bytes=450
+        )
+        assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+        assert [payload for batch in batches for payload in batch] == payloads
+
+        # A payload larger than the limit is sent on its own.
+        batches = aiplatform.EntityType._batch_payloads(
+            payloads=payloads[:2], max_request_bytes=10
+        )
+        assert [len(batch) for batch in batches] == [1, 1]
+
     @pytest.mark.usefixtures("get_entity_type_mock")
     @pytest.mark.parametrize(
         "feature_id, test_value, expected_feature_value",
@@ -3620,6 +4142,42 @@ class TestEntityType:
         )
         assert df.equals(expected_df)
 
+    def test_construct_arrow_table(self):
+        feature_ids = ["int_feature", "double_array_feature", "string_feature"]
+        feature_value_types = [_TEST_INT_TYPE, _TEST_DOUBLE_ARR_TYPE, _TEST_STR_TYPE]
+        entity_views = [
+            _get_entity_view_proto(
+                entity_id="entity_01",
+                feature_value_types=feature_value_types,
+                feature_values=[1, [1.5, 2.5], None],
+            ),
+            _get_entity_view_proto(
+                entity_id="entity_02",
+                feature_value_types=feature_value_types,
+                feature_values=[None, [], "test"],
+            ),
+        ]
+        table = aiplatform.EntityType._columns_to_arrow_table(
+            aiplatform.EntityType._entity_views_to_columns(
+                feature_ids=feature_ids,
+                entity_views_pb=[entity_view._pb for entity_view in entity_views],
+            )
+        )
+        assert table.schema == pyarrow.schema(
+            [
+                ("entity_id", pyarrow.string()),
+                ("int_feature", pyarrow.int64()),
+                ("double_array_feature", pyarrow.list_(pyarrow.float64())),
+                ("string_feature", pyarrow.string()),
+            ]
+        )
+        assert table.to_pydict() == {
+            "entity_id": ["entity_01", "entity_02"],
+            "int_feature": [1, None],
+            "double_array_feature": [[1.5, 2.5], []],
+            "string_feature": [None, "test"],
+        }
+
 
 class TestFeature:
     def setup_method(self):
@@ -24,6 +24,7 @@ from unittest import mock
 from urllib import request as urllib_request
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 from google.cloud import storage
 
@@ -1875,6 +1876,55 @@ class TestLanguageModels:
                 == _TEST_COUNT_TOKENS_RESPONSE["total_billable_characters"]
             )
 
+    def test_text_generation_preview_count_tokens_many(self):
+        """Tests counting tokens of several prompts with the client-side cache."""
+        aiplatform.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_BISON_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = preview_language_models.TextGenerationModel.from_pretrained(
+                "text-bison@001"
+            )
+
+        def count_tokens(endpoint, instances):
+            return gca_prediction_service_v1beta1.CountTokensResponse(
+                total_tokens=sum(
+                    len(instance["content"].split()) for instance in instances
+                ),
+            )
+
+        _language_models._count_tokens_cache.clear()
+        with mock.patch.object(
+            target=prediction_service_client_v1beta1.PredictionServiceClient,
+            attribute="count_tokens",
+            side_effect=count_tokens,
+        ) as count_tokens_mock:
+            responses = model.count_tokens_many(
+                [["How are you?"], ["How are you?", "Fine"], ["How are you?"]]
+            )
+            cached_response = model.count_tokens(["How are you?", "Fine"])
+            uncached_response = model.count_tokens(
+                ["How are you?", "Fine"], use_cache=False
+            )
+
+        assert [response.total_tokens for response in responses] == [3, 4, 3]
+        assert responses[0]._count_tokens_response is not (
+            responses[2]._count_tokens_response
+        )
+        assert cached_response.total_tokens == 4
+        cached_response._count_tokens_response.total_tokens = 0
+        assert model.count_tokens(["How are you?", "Fine"]).total_tokens == 4
+        assert uncached_response.total_tokens == 4
+        assert count_tokens_mock.call_count == 3
+        _language_models._count_tokens_cache.clear()
+
     def test_text_generation_ga(self):
         """Tests the text generation model."""
         aiplatform.init(
@@ -2268,6 +2318,188 @@ class TestLanguageModels:
             ):
                 assert len(response.text) > 10
 
+    @pytest.mark.parametrize("buffer_size", [None, 0, 1])
+    def test_text_generation_model_predict_streaming_cancel(self, buffer_size):
+        """Tests that closing the response stream cancels the streaming call."""
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_BISON_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextGenerationModel.from_pretrained(
+                "text-bison@001"
+            )
+
+        class _Call:
+            def __init__(self):
+                self.cancelled = False
+                self._responses = iter(
+                    gca_prediction_service.StreamingPredictResponse(
+                        outputs=[_streaming_prediction.value_to_tensor(response_dict)]
+                    )
+                    for response_dict in _TEST_TEXT_GENERATION_PREDICTION_STREAMING * 10
+                )
+
+            def __iter__(self):
+                return self
+
+            def __next__(self):
+                if self.cancelled:
+                    raise StopIteration
+                return next(self._responses)
+
+            def cancel(self):
+                self.cancelled = True
+
+        call = _Call()
+        with mock.patch.object(
+            target=prediction_service_client.PredictionServiceClient,
+            attribute="server_streaming_predict",
+            return_value=call,
+        ):
+            responses = model.predict_streaming("Count to 50", buffer_size=buffer_size)
+            response = next(responses)
+            assert response.text
+            assert not call.cancelled
+            responses.close()
+
+        assert call.cancelled
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("buffer_size", [None, 1])
+    async def test_text_generation_model_predict_streaming_async_cancel(
+        self, buffer_size
+    ):
+        """Tests that closing the async response stream cancels the call."""
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_BISON_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextGenerationModel.from_pretrained(
+                "text-bison@001"
+            )
+
+        class _Call:
+            def __init__(self):
+                self.cancelled = False
+
+            async def __aiter__(self):
+                for response_dict in _TEST_TEXT_GENERATION_PREDICTION_STREAMING * 10:
+                    yield gca_prediction_service.StreamingPredictResponse(
+                        outputs=[_streaming_prediction.value_to_tensor(response_dict)]
+                    )
+
+            def cancel(self):
+                self.cancelled = True
+
+        call = _Call()
+
+        async def mock_server_streaming_predict_async(*args, **kwargs):
+            return call
+
+        with mock.patch.object(
+            target=prediction_service_async_client.PredictionServiceAsyncClient,
+            attribute="server_streaming_predict",
+            new=mock_server_streaming_predict_async,
+        ):
+            responses = model.predict_streaming_async(
+                "Count to 50", buffer_size=buffer_size
+            )
+            async for response in responses:
+                assert response.text
+                break
+            assert not call.cancelled
+            await responses.aclose()
+
+        assert call.cancelled
+
+    def test_text_generation_model_predict_streaming_buffered(self):
+        """Tests that buffered streams yield all responses and raise errors."""
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_BISON_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextGenerationModel.from_pretrained(
+                "text-bison@001"
+            )
+
+        def response_generator():
+            for response_dict in _TEST_TEXT_GENERATION_PREDICTION_STREAMING:
+                yield gca_prediction_service.StreamingPredictResponse(
+                    outputs=[_streaming_prediction.value_to_tensor(response_dict)]
+                )
+            raise ValueError("Stream broken")
+
+        with mock.patch.object(
+            target=prediction_service_client.PredictionServiceClient,
+            attribute="server_streaming_predict",
+            return_value=response_generator(),
+        ):
+            texts = []
+            with pytest.raises(ValueError, match="Stream broken"):
+                for response in model.predict_streaming("Count to 50", buffer_size=2):
+                    texts.append(response.text)
+
+        assert texts == [
+            response_dict["content"]
+            for response_dict in _TEST_TEXT_GENERATION_PREDICTION_STREAMING
+        ]
+
+    def test_text_generation_model_predict_streaming_negative_buffer_size(self):
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_BISON_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextGenerationModel.from_pretrained(
+                "text-bison@001"
+            )
+
+        with pytest.raises(ValueError, match="buffer_size"):
+            next(model.predict_streaming("Count to 50", buffer_size=-1))
+
+    def test_buffered_response_stream_close_stops_reader(self):
+        def response_generator():
+            while True:
+                yield gca_prediction_service.StreamingPredictResponse()
+
+        stream = _streaming_prediction._BufferedResponseStream(
+            response_generator(), buffer_size=1
+        )
+        next(iter(stream))
+        stream.close()
+        stream._reader.join(timeout=5)
+
+        assert not stream._reader.is_alive()
+
+    def test_buffered_response_stream_invalid_buffer_size(self):
+        with pytest.raises(ValueError, match="buffer_size"):
+            _streaming_prediction._BufferedResponseStream(iter([]), buffer_size=0)
+
+    def test_tensor_to_value(self):
+        value = {
+            "content": "text",
+            "scores": [0.5, 1.5],
+            "blocked": False,
+            "nested": {"items": [{"a": "b"}, "c", None]},
+        }
+        assert (
+            _streaming_prediction.tensor_to_value(
+                _streaming_prediction.value_to_tensor(value)._pb
+            )
+            == value
+        )
+
     def test_text_generation_response_repr(self):
         response = language_models.TextGenerationResponse(
             text="",
@@ -4529,6 +4761,123 @@ class TestLanguageModels:
                     == expected_embedding["statistics"]["truncated"]
                 )
 
+    @pytest.mark.parametrize("return_numpy", [False, True])
+    def test_text_embedding_batches(self, return_numpy):
+        """Tests splitting text embedding requests into concurrent batches."""
+        aiplatform.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_EMBEDDING_GECKO_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextEmbeddingModel.from_pretrained(
+                "textembedding-gecko@001"
+            )
+
+        def predict(endpoint, instances, parameters, **kwargs):
+            gca_predict_response = gca_prediction_service.PredictResponse(
+                deployed_model_id="123"
+            )
+            for instance in instances:
+                gca_predict_response.predictions.append(
+                    {
+                        "embeddings": {
+                            "values": [float(len(instance["content"]))] * 3,
+                            "statistics": {"truncated": False, "token_count": 1.0},
+                        }
+                    }
+                )
+            return gca_predict_response
+
+        texts = ["a" * length for length in range(1, 8)]
+        with mock.patch.object(
+            target=prediction_service_client.PredictionServiceClient,
+            attribute="predict",
+            side_effect=predict,
+        ) as mock_predict:
+            embeddings = model.get_embeddings(
+                texts, batch_size=3, max_concurrency=2, return_numpy=return_numpy
+            )
+
+        assert mock_predict.call_count == 3
+        assert sorted(
+            len(call.kwargs["instances"]) for call in mock_predict.call_args_list
+        ) == [1, 3, 3]
+        if return_numpy:
+            assert embeddings.dtype == np.float32
+            assert embeddings.shape == (7, 3)
+            assert embeddings[:, 0].tolist() == list(range(1, 8))
+        else:
+            assert [embedding.values[0] for embedding in embeddings] == list(
+                range(1, 8)
+            )
+
+    def test_text_embedding_with_cache(self):
+        """Tests that only texts missing from the cache are embedded."""
+        aiplatform.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _TEXT_EMBEDDING_GECKO_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = language_models.TextEmbeddingModel.from_pretrained(
+                "textembedding-gecko@001"
+            )
+
+        def predict(endpoint, instances, parameters, **kwargs):
+            gca_predict_response = gca_prediction_service.PredictResponse(
+                deployed_model_id="123"
+            )
+            for instance in instances:
+                gca_predict_response.predictions.append(
+                    {
+                        "embeddings": {
+                            "values": [float(len(instance["content"]))] * 3,
+                            "statistics": {"truncated": False, "token_count": 1.0},
+                        }
+                    }
+                )
+            return gca_predict_response
+
+        cache = language_models.EmbeddingCache()
+        with mock.patch.object(
+            target=prediction_service_client.PredictionServiceClient,
+            attribute="predict",
+            side_effect=predict,
+        ) as mock_predict:
+            model.get_embeddings(["a", "bb"], cache=cache)
+            embeddings = model.get_embeddings(
+                [
+                    "bb",
+                    "ccc",
+                    language_models.TextEmbeddingInput(
+                        text="a", task_type="RETRIEVAL_QUERY"
+                    ),
+                    "a",
+                ],
+                cache=cache,
+            )
+            model.get_embeddings(["a"], output_dimensionality=2, cache=cache)
+
+        assert [call.kwargs["instances"] for call in mock_predict.call_args_list] == [
+            [{"content": "a"}, {"content": "bb"}],
+            [{"content": "ccc"}, {"content": "a", "task_type": "RETRIEVAL_QUERY"}],
+            [{"content": "a"}],
+        ]
+        assert [embedding.values[0] for embedding in embeddings] == [2, 3, 1, 1]
+        assert embeddings[0].statistics.token_count == 1
+        assert (cache.hits, cache.misses) == (2, 5)
+
     def test_text_embedding_preview_count_tokens(self):
         """Tests the text embedding model."""
         aiplatform.init(
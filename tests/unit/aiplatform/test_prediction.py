@@ -16,13 +16,17 @@
 #
 
 import asyncio
+from concurrent import futures
 import importlib
+import io
 import json
 import multiprocessing
+import numpy as np
 import os
 import pytest
 import requests
 import textwrap
+import threading
 import time
 from unittest import mock
 
@@ -57,6 +61,8 @@ from google.cloud.aiplatform.prediction import LocalModel
 from google.cloud.aiplatform.prediction import LocalEndpoint
 from google.cloud.aiplatform.prediction import handler_utils
 from google.cloud.aiplatform.prediction import local_endpoint
+from google.cloud.aiplatform.prediction import metrics
+from google.cloud.aiplatform.prediction import serializer
 from google.cloud.aiplatform.prediction import (
     model_server as model_server_module,
 )
@@ -696,7 +702,8 @@ class TestDefaultSerializer:
         content_type = "unsupported_type"
         expected_message = (
             f"Unsupported content type of the request: {content_type}.\n"
-            f'Currently supported content-type in DefaultSerializer: "application/json".'
+            "Currently supported content-type in DefaultSerializer: "
+            '"application/json", "application/x-npy", "application/x-msgpack".'
         )
         data = b'{"instances": [1, 2, 3]}'
 
@@ -754,7 +761,8 @@ class TestDefaultSerializer:
         accept = "unsupported_type"
         expected_message = (
             f"Unsupported accept of the response: {accept}.\n"
-            f'Currently supported accept in DefaultSerializer: "application/json".'
+            "Currently supported accept in DefaultSerializer: "
+            '"application/json", "application/x-npy", "application/x-msgpack".'
         )
         prediction = {}
 
@@ -774,6 +782,123 @@ class TestDefaultSerializer:
         assert exception.value.status_code == 400
         assert expected_message in exception.value.detail
 
+    def test_deserialize_application_json_without_orjson(self):
+        data = b'{"instances": [1, 2, 3]}'
+
+        with mock.patch.object(serializer, "orjson", None):
+            deserialized_data = DefaultSerializer.deserialize(
+                data, content_type="application/json"
+            )
+
+        assert deserialized_data == {"instances": [1, 2, 3]}
+
+    def test_serialize_application_json_numpy(self):
+        prediction = {"predictions": np.array([[1.5, 2.0]])}
+
+        serialized_prediction = DefaultSerializer.serialize(
+            prediction, accept="application/json"
+        )
+
+        assert json.loads(serialized_prediction) == {"predictions": [[1.5, 2.0]]}
+
+    def test_serialize_application_json_non_finite(self):
+        prediction = {"predictions": [float("nan"), float("inf"), 1.5]}
+
+        serialized_prediction = DefaultSerializer.serialize(
+            prediction, accept="application/json"
+        )
+
+        assert serialized_prediction == json.dumps(prediction)
+        assert serialized_prediction == '{"predictions": [NaN, Infinity, 1.5]}'
+
+    def test_serialize_application_json_with_orjson_responses(self, monkeypatch):
+        monkeypatch.setenv("VERTEX_CPR_ORJSON_RESPONSES", "true")
+        prediction = {"predictions": np.array([[1.5, 2.0]])}
+
+        serialized_prediction = DefaultSerializer.serialize(
+            prediction, accept="application/json"
+        )
+
+        assert serialized_prediction == '{"predictions":[[1.5,2.0]]}'
+
+    def test_deserialize_application_npy(self):
+        buffer = io.BytesIO()
+        np.save(buffer, np.arange(6, dtype=np.float32).reshape(2, 3))
+
+        deserialized_data = DefaultSerializer.deserialize(
+            buffer.getvalue(), content_type="application/x-npy"
+        )
+
+        np.testing.assert_array_equal(
+            deserialized_data["instances"],
+            np.arange(6, dtype=np.float32).reshape(2, 3),
+        )
+
+    def test_deserialize_invalid_npy(self):
+        expected_message = "NumPy deserialization failed for the request data"
+
+        with pytest.raises(HTTPException) as exception:
+            DefaultSerializer.deserialize(
+                b"instances", content_type="application/x-npy"
+            )
+
+        assert exception.value.status_code == 400
+        assert expected_message in exception.value.detail
+
+    def test_serialize_application_npy(self):
+        prediction = {"predictions": [[1, 2], [3, 4]]}
+
+        serialized_prediction = DefaultSerializer.serialize(
+            prediction, accept="application/x-npy"
+        )
+
+        np.testing.assert_array_equal(
+            np.load(io.BytesIO(serialized_prediction)), np.array([[1, 2], [3, 4]])
+        )
+
+    def test_serialize_invalid_npy(self):
+        prediction = {"predictions": [{"label": "cat"}]}
+        expected_message = "NumPy serialization failed for the prediction result"
+
+        with pytest.raises(HTTPException) as exception:
+            DefaultSerializer.serialize(prediction, accept="application/x-npy")
+
+        assert exception.value.status_code == 400
+        assert expected_message in exception.value.detail
+
+    def test_deserialize_and_serialize_application_msgpack(self):
+        msgpack = pytest.importorskip("msgpack")
+        data = msgpack.packb({"instances": [[1, 2], ["a", None]]})
+
+        deserialized_data = DefaultSerializer.deserialize(
+            data, content_type="application/x-msgpack"
+        )
+        serialized_prediction = DefaultSerializer.serialize(
+            {"predictions": np.array([1.5, 2.5])}, accept="application/x-msgpack"
+        )
+
+        assert deserialized_data == {"instances": [[1, 2], ["a", None]]}
+        assert msgpack.unpackb(serialized_prediction) == {"predictions": [1.5, 2.5]}
+
+    @pytest.mark.parametrize(
+        "accept, expected_media_type",
+        [
+            ("application/x-npy", "application/x-npy"),
+            ("application/json;q=0.5, application/x-npy", "application/x-npy"),
+            ("application/x-npy;q=0.5, */*", "application/json"),
+            ("text/html, application/x-msgpack;q=0.9", "application/x-msgpack"),
+            ("text/html", None),
+            (None, None),
+        ],
+    )
+    def test_get_preferred_media_type(self, accept, expected_media_type):
+        assert (
+            handler_utils.get_preferred_media_type(
+                accept, serializer.SUPPORTED_MEDIA_TYPES
+            )
+            == expected_media_type
+        )
+
 
 class TestPredictionHandler:
     def test_init(self, predictor_mock):
@@ -818,6 +943,39 @@ class TestPredictionHandler:
             _TEST_SERIALIZED_OUTPUT, _APPLICATION_JSON
         )
 
+    @pytest.mark.asyncio
+    async def test_handle_records_metrics_and_timing_header(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        predictor_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        handler = PredictionHandler(_TEST_GCS_ARTIFACTS_URI, predictor=predictor_mock)
+
+        response = await handler.handle(get_test_request())
+        metrics_text = handler.metrics.to_prometheus_text()
+
+        assert set(
+            prediction_utils.parse_server_timing(response.headers["Server-Timing"])
+        ) == {
+            "deserialize",
+            "queue",
+            "preprocess",
+            "predict",
+            "postprocess",
+            "serialize",
+        }
+        for stage in ("deserialize", "predict", "serialize", "total"):
+            assert (
+                f'vertex_cpr_request_stage_latency_seconds_count{{stage="{stage}"}} 1'
+                in metrics_text
+            )
+        assert 'vertex_cpr_responses_total{code="200"} 1' in metrics_text
+        assert "vertex_cpr_inflight_requests 0" in metrics_text
+        assert "vertex_cpr_queued_requests 0" in metrics_text
+
     @pytest.mark.asyncio
     async def test_handle_deserialize_raises_exception(
         self,
@@ -879,6 +1037,30 @@ class TestPredictionHandler:
         assert not get_accept_from_headers_mock.called
         assert not serialize_mock.called
 
+    @pytest.mark.asyncio
+    async def test_handle_predictor_raises_exception_counts_response(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        handler = PredictionHandler(
+            _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+        )
+
+        with mock.patch.object(handler._predictor, "predict", side_effect=Exception()):
+            with pytest.raises(HTTPException):
+                await handler.handle(get_test_request())
+
+        metrics_text = handler.metrics.to_prometheus_text()
+        assert 'vertex_cpr_responses_total{code="500"} 1' in metrics_text
+        assert (
+            'vertex_cpr_request_stage_latency_seconds_count{stage="total"} 1'
+            in metrics_text
+        )
+        assert "vertex_cpr_queued_requests 0" in metrics_text
+
     @pytest.mark.asyncio
     async def test_handle_predictor_raises_http_exception(
         self,
@@ -941,6 +1123,309 @@ class TestPredictionHandler:
             _TEST_SERIALIZED_OUTPUT, _APPLICATION_JSON
         )
 
+    @pytest.mark.asyncio
+    async def test_handle_runs_predictor_in_thread_pool(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        predict_threads = []
+
+        def _predict(instances):
+            predict_threads.append(threading.current_thread().name)
+            return _TEST_PREDICTION_OUTPUT
+
+        with mock.patch.dict(os.environ, {"VERTEX_CPR_PREDICTOR_EXECUTOR": "thread"}):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", side_effect=_predict):
+            response = await handler.handle(get_test_request())
+
+        assert response.status_code == 200
+        assert predict_threads[0].startswith("cpr_predictor")
+
+    @pytest.mark.asyncio
+    async def test_handle_runs_predictor_inline_by_default(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        predict_threads = []
+
+        def _predict(instances):
+            predict_threads.append(threading.current_thread())
+            return _TEST_PREDICTION_OUTPUT
+
+        handler = PredictionHandler(
+            _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+        )
+
+        with mock.patch.object(handler._predictor, "predict", side_effect=_predict):
+            response = await handler.handle(get_test_request())
+
+        assert response.status_code == 200
+        assert predict_threads == [threading.current_thread()]
+
+    @pytest.mark.asyncio
+    async def test_handle_rejects_requests_over_max_inflight_requests(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        predict_started = threading.Event()
+        release_predict = threading.Event()
+
+        def _predict(instances):
+            predict_started.set()
+            release_predict.wait()
+            return _TEST_PREDICTION_OUTPUT
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_PREDICTOR_EXECUTOR": "thread",
+                "VERTEX_CPR_MAX_INFLIGHT_REQUESTS": "1",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", side_effect=_predict):
+            first_request = asyncio.ensure_future(handler.handle(get_test_request()))
+            await asyncio.get_running_loop().run_in_executor(None, predict_started.wait)
+
+            with pytest.raises(HTTPException) as exception:
+                await handler.handle(get_test_request())
+
+            release_predict.set()
+            response = await first_request
+
+        assert exception.value.status_code == 429
+        assert response.status_code == 200
+        assert handler.metrics.inflight_requests == 0
+
+    @pytest.mark.asyncio
+    async def test_handle_batches_concurrent_requests(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        deserialize_mock.side_effect = [
+            {"instances": [[1, 2]]},
+            {"instances": [[3, 4], [5, 6]]},
+        ]
+        predict_mock = mock.MagicMock(
+            side_effect=lambda prediction_input: {
+                "predictions": [
+                    sum(instance) for instance in prediction_input["instances"]
+                ]
+            }
+        )
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_MAX_BATCH_SIZE": "3",
+                "VERTEX_CPR_MAX_BATCH_DELAY_MS": "10000",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", predict_mock):
+            responses = await asyncio.gather(
+                handler.handle(get_test_request()),
+                handler.handle(get_test_request()),
+            )
+
+        assert [response.status_code for response in responses] == [200, 200]
+        predict_mock.assert_called_once_with({"instances": [[1, 2], [3, 4], [5, 6]]})
+        assert serialize_mock.call_args_list == [
+            mock.call({"predictions": [3]}, _APPLICATION_JSON),
+            mock.call({"predictions": [7, 11]}, _APPLICATION_JSON),
+        ]
+        assert not handler._pending_batches
+
+    @pytest.mark.asyncio
+    async def test_handle_batch_flushed_after_max_batch_delay(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        predict_mock = mock.MagicMock(return_value=_TEST_PREDICTION_OUTPUT)
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_MAX_BATCH_SIZE": "8",
+                "VERTEX_CPR_MAX_BATCH_DELAY_MS": "1",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", predict_mock):
+            response = await handler.handle(get_test_request())
+
+        assert response.status_code == 200
+        predict_mock.assert_called_once_with(_TEST_DESERIALIZED_INPUT)
+        serialize_mock.assert_called_once_with(
+            _TEST_PREDICTION_OUTPUT, _APPLICATION_JSON
+        )
+
+    @pytest.mark.asyncio
+    async def test_handle_batch_queue_latency_includes_batch_delay(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_MAX_BATCH_SIZE": "8",
+                "VERTEX_CPR_MAX_BATCH_DELAY_MS": "50",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(
+            handler._predictor, "predict", return_value=_TEST_PREDICTION_OUTPUT
+        ):
+            response = await handler.handle(get_test_request())
+
+        timing = prediction_utils.parse_server_timing(response.headers["Server-Timing"])
+        assert timing["queue"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_handle_batch_prediction_mismatch_predicts_requests_one_by_one(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        predict_mock = mock.MagicMock(return_value={"predictions": [[1]]})
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_MAX_BATCH_SIZE": "2",
+                "VERTEX_CPR_MAX_BATCH_DELAY_MS": "10000",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", predict_mock):
+            responses = await asyncio.gather(
+                handler.handle(get_test_request()),
+                handler.handle(get_test_request()),
+            )
+
+        assert [response.status_code for response in responses] == [200, 200]
+        assert predict_mock.call_count == 3
+        assert serialize_mock.call_args_list == [
+            mock.call({"predictions": [[1]]}, _APPLICATION_JSON),
+            mock.call({"predictions": [[1]]}, _APPLICATION_JSON),
+        ]
+        assert not handler._batch_tasks
+
+    @pytest.mark.asyncio
+    async def test_handle_batch_failure_only_fails_bad_request(
+        self,
+        deserialize_mock,
+        get_content_type_from_headers_mock,
+        get_accept_from_headers_mock,
+        serialize_mock,
+    ):
+        deserialize_mock.side_effect = [
+            {"instances": [[1, 2]]},
+            {"instances": [["bad"]]},
+        ]
+
+        def _predict(prediction_input):
+            if ["bad"] in prediction_input["instances"]:
+                raise ValueError("Bad instance.")
+            return {
+                "predictions": [
+                    sum(instance) for instance in prediction_input["instances"]
+                ]
+            }
+
+        with mock.patch.dict(
+            os.environ,
+            {
+                "VERTEX_CPR_MAX_BATCH_SIZE": "2",
+                "VERTEX_CPR_MAX_BATCH_DELAY_MS": "10000",
+            },
+        ):
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+            )
+
+        with mock.patch.object(handler._predictor, "predict", side_effect=_predict):
+            results = await asyncio.gather(
+                handler.handle(get_test_request()),
+                handler.handle(get_test_request()),
+                return_exceptions=True,
+            )
+
+        assert results[0].status_code == 200
+        assert isinstance(results[1], HTTPException)
+        assert results[1].status_code == 500
+        serialize_mock.assert_called_once_with({"predictions": [3]}, _APPLICATION_JSON)
+
+    def test_init_process_executor_loads_predictor(self):
+        predictor_mock = mock.MagicMock()
+        with mock.patch.dict(
+            os.environ, {"VERTEX_CPR_PREDICTOR_EXECUTOR": "process"}
+        ), mock.patch.object(
+            futures, "ProcessPoolExecutor"
+        ) as process_pool_executor_mock:
+            handler = PredictionHandler(
+                _TEST_GCS_ARTIFACTS_URI, predictor=predictor_mock
+            )
+
+        assert handler._predictor is predictor_mock()
+        predictor_mock().load.assert_called_once_with(_TEST_GCS_ARTIFACTS_URI)
+        assert handler._executor is process_pool_executor_mock()
+
+    @pytest.mark.parametrize(
+        "env_key, env_value",
+        [
+            ("VERTEX_CPR_PREDICTOR_EXECUTOR", "fork"),
+            ("VERTEX_CPR_PREDICTOR_WORKERS", "0"),
+            ("VERTEX_CPR_MAX_INFLIGHT_REQUESTS", "0"),
+            ("VERTEX_CPR_MAX_BATCH_SIZE", "0"),
+            ("VERTEX_CPR_MAX_BATCH_DELAY_MS", "-1"),
+        ],
+    )
+    def test_init_invalid_predictor_env_raises_exception(self, env_key, env_value):
+        with mock.patch.dict(os.environ, {env_key: env_value}):
+            with pytest.raises(ValueError) as exception:
+                PredictionHandler(
+                    _TEST_GCS_ARTIFACTS_URI, predictor=get_test_predictor()
+                )
+
+        assert env_key in str(exception.value)
+
 
 class TestHandlerUtils:
     @pytest.mark.parametrize(
@@ -1091,6 +1576,53 @@ class TestHandlerUtils:
         assert result == expected
 
 
+class TestPredictionMetrics:
+    def test_to_prometheus_text(self):
+        prediction_metrics = metrics.PredictionMetrics(buckets=(0.1, 1.0))
+        prediction_metrics.observe_latency("predict", 0.05)
+        prediction_metrics.observe_latency("predict", 0.5)
+        prediction_metrics.observe_latency("predict", 2.0)
+        prediction_metrics.count_response(200)
+        prediction_metrics.inflight_requests = 2
+
+        metrics_text = prediction_metrics.to_prometheus_text()
+
+        for line in [
+            'vertex_cpr_request_stage_latency_seconds_bucket{stage="predict",le="0.1"} 1',
+            'vertex_cpr_request_stage_latency_seconds_bucket{stage="predict",le="1.0"} 2',
+            'vertex_cpr_request_stage_latency_seconds_bucket{stage="predict",le="+Inf"} 3',
+            'vertex_cpr_request_stage_latency_seconds_sum{stage="predict"} 2.55',
+            'vertex_cpr_request_stage_latency_seconds_count{stage="predict"} 3',
+            'vertex_cpr_responses_total{code="200"} 1',
+            "vertex_cpr_inflight_requests 2",
+            "vertex_cpr_queued_requests 0",
+        ]:
+            assert line in metrics_text.splitlines()
+
+    def test_format_and_parse_server_timing(self):
+        header_value = handler_utils.format_server_timing(
+            {"deserialize": 0.0015, "predict": 0.25}
+        )
+
+        assert header_value == "deserialize;dur=1.500, predict;dur=250.000"
+        assert prediction_utils.parse_server_timing(header_value) == {
+            "deserialize": 1.5,
+            "predict": 250.0,
+        }
+
+    @pytest.mark.parametrize(
+        "header_value, expected_timing",
+        [
+            (None, {}),
+            ("", {}),
+            ('cache;desc="Cache Read";dur=23.2', {"cache": 23.2}),
+            ("miss, db;dur=53", {"db": 53.0}),
+        ],
+    )
+    def test_parse_server_timing(self, header_value, expected_timing):
+        assert prediction_utils.parse_server_timing(header_value) == expected_timing
+
+
 class TestLocalModel:
     def setup_method(self):
         importlib.reload(initializer)
@@ -1997,6 +2529,14 @@ class TestLocalModel:
 
 
 class TestLocalEndpoint:
+    def test_get_prediction_timing(self):
+        response = requests.models.Response()
+        response.headers["Server-Timing"] = "deserialize;dur=0.5, predict;dur=12.25"
+
+        timing = LocalEndpoint.get_prediction_timing(response)
+
+        assert timing == {"deserialize": 0.5, "predict": 12.25}
+
     def test_init(
         self,
         initializer_project_none_mock,
@@ -3249,6 +3789,30 @@ class TestModelServer:
         assert response.status_code == 400
         assert json.loads(response.content)["detail"] == expected_message
 
+    def test_metrics(self, model_server_env_mock, importlib_import_module_mock_twice):
+        with mock.patch.dict(os.environ, {"VERTEX_CPR_METRICS_ROUTE": "/metrics"}):
+            model_server = CprModelServer()
+        model_server.handler.metrics.to_prometheus_text.return_value = (
+            "vertex_cpr_inflight_requests 0\n"
+        )
+        client = TestClient(model_server.app)
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.text == "vertex_cpr_inflight_requests 0\n"
+        assert response.headers["content-type"].startswith("text/plain")
+
+    def test_metrics_route_not_served_by_default(
+        self, model_server_env_mock, importlib_import_module_mock_twice
+    ):
+        model_server = CprModelServer()
+        client = TestClient(model_server.app)
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 404
+
     def test_predict_thorws_exceptions_not_http_exception_default_handler(
         self, model_server_env_mock, importlib_import_module_mock_twice
     ):
@@ -16,7 +16,9 @@
 #
 
 
+import base64
 import datetime
+import hashlib
 import importlib
 import json
 import os
@@ -38,8 +40,12 @@ from google.cloud.aiplatform import compat, utils
 from google.cloud.aiplatform.compat.types import pipeline_failure_policy
 from google.cloud.aiplatform import datasets
 from google.cloud.aiplatform.utils import (
+    _image_utils,
+    _value_utils,
+    cache_utils,
     column_transformations_utils,
     gcs_utils,
+    http_utils,
     pipeline_utils,
     prediction_utils,
     tensorboard_utils,
@@ -51,6 +57,8 @@ from google.cloud.aiplatform_v1.services.model_service import (
 from google.cloud.aiplatform_v1beta1.services.model_service import (
     client as model_service_client_v1beta1,
 )
+from google.protobuf import json_format
+from google.protobuf import struct_pb2
 from google.protobuf import timestamp_pb2
 
 model_service_client_default = model_service_client_v1
@@ -967,6 +975,135 @@ class TestPredictionUtils:
         assert not mock_storage_client.called
         copy_tree_mock.assert_called_once_with(model_dir_name, ".", dirs_exist_ok=True)
 
+    @staticmethod
+    def _fake_blob(name, content, generation=1):
+        blob = mock.MagicMock()
+        blob.name = name
+        blob.generation = generation
+        blob.size = len(content)
+        blob.md5_hash = base64.b64encode(hashlib.md5(content).digest()).decode()
+        blob.crc32c = None
+
+        def download_to_filename(filename):
+            with open(filename, "wb") as f:
+                f.write(content)
+
+        def download_to_file(file_obj, start, end, if_generation_match):
+            file_obj.write(content[start : end + 1])
+
+        blob.download_to_filename.side_effect = download_to_filename
+        blob.download_to_file.side_effect = download_to_file
+        blob.bucket.blob.return_value = blob
+        return blob
+
+    def test_download_model_artifacts_with_cache(self, tmp_path, monkeypatch):
+        cache_dir = tmp_path / "cache"
+        blob = self._fake_blob(f"{GCS_PREFIX}/model/{FAKE_FILENAME}", b"model")
+
+        with patch.object(storage, "Client") as mock_storage_client:
+            mock_storage_client.return_value.list_blobs.return_value = [blob]
+            for worker_dir in ("worker1", "worker2"):
+                (tmp_path / worker_dir).mkdir()
+                monkeypatch.chdir(tmp_path / worker_dir)
+                prediction_utils.download_model_artifacts(
+                    f"gs://{GCS_BUCKET}/{GCS_PREFIX}", cache_dir=str(cache_dir)
+                )
+
+        assert blob.download_to_filename.call_count == 1
+        for worker_dir in ("worker1", "worker2"):
+            assert (
+                tmp_path / worker_dir / "model" / FAKE_FILENAME
+            ).read_bytes() == b"model"
+        umask = os.umask(0)
+        os.umask(umask)
+        (cache_path,) = [path for path in cache_dir.iterdir() if path.suffix != ".lock"]
+        assert cache_path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    def test_download_model_artifacts_cache_keyed_by_generation(
+        self, tmp_path, monkeypatch
+    ):
+        cache_dir = tmp_path / "cache"
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setenv("VERTEX_CPR_ARTIFACTS_CACHE_DIR", str(cache_dir))
+        blobs = [
+            self._fake_blob(f"{GCS_PREFIX}/{FAKE_FILENAME}", b"v1", generation=1),
+            self._fake_blob(f"{GCS_PREFIX}/{FAKE_FILENAME}", b"v2", generation=2),
+        ]
+
+        with patch.object(storage, "Client") as mock_storage_client:
+            for blob in blobs:
+                mock_storage_client.return_value.list_blobs.return_value = [blob]
+                prediction_utils.download_model_artifacts(
+                    f"gs://{GCS_BUCKET}/{GCS_PREFIX}"
+                )
+
+        assert all(blob.download_to_filename.call_count == 1 for blob in blobs)
+        assert (tmp_path / FAKE_FILENAME).read_bytes() == b"v2"
+
+    def test_download_model_artifacts_in_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(prediction_utils, "_CHUNKED_DOWNLOAD_THRESHOLD", 8)
+        monkeypatch.setattr(prediction_utils, "_DOWNLOAD_CHUNK_SIZE", 3)
+        content = b"0123456789abcdef"
+        blob = self._fake_blob(f"{GCS_PREFIX}/{FAKE_FILENAME}", content)
+
+        with patch.object(storage, "Client") as mock_storage_client:
+            mock_storage_client.return_value.list_blobs.return_value = [blob]
+            prediction_utils.download_model_artifacts(f"gs://{GCS_BUCKET}/{GCS_PREFIX}")
+
+        assert not blob.download_to_filename.called
+        assert blob.download_to_file.call_count == 6
+        assert (
+            blob.bucket.blob.call_args_list
+            == [mock.call(blob.name, generation=blob.generation)] * 6
+        )
+        assert (tmp_path / FAKE_FILENAME).read_bytes() == content
+
+    def test_download_model_artifacts_in_chunks_with_one_worker(
+        self, tmp_path, monkeypatch
+    ):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(prediction_utils, "_CHUNKED_DOWNLOAD_THRESHOLD", 8)
+        monkeypatch.setattr(prediction_utils, "_DOWNLOAD_CHUNK_SIZE", 3)
+        contents = [b"0123456789abcdef", b"fedcba9876543210"]
+        blobs = [
+            self._fake_blob(f"{GCS_PREFIX}/{index}", content)
+            for index, content in enumerate(contents)
+        ]
+
+        with patch.object(storage, "Client") as mock_storage_client:
+            mock_storage_client.return_value.list_blobs.return_value = blobs
+            prediction_utils.download_model_artifacts(
+                f"gs://{GCS_BUCKET}/{GCS_PREFIX}", max_workers=1
+            )
+
+        for index, content in enumerate(contents):
+            assert (tmp_path / str(index)).read_bytes() == content
+
+    def test_download_model_artifacts_in_chunks_with_checksum_mismatch(
+        self, tmp_path, monkeypatch
+    ):
+        cache_dir = tmp_path / "cache"
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(prediction_utils, "_CHUNKED_DOWNLOAD_THRESHOLD", 8)
+        monkeypatch.setattr(prediction_utils, "_DOWNLOAD_CHUNK_SIZE", 3)
+        blob = self._fake_blob(f"{GCS_PREFIX}/{FAKE_FILENAME}", b"0123456789abcdef")
+        blob.md5_hash = None
+        # The CRC32C checksum of other content.
+        blob.crc32c = "yZRlqg=="
+
+        with patch.object(storage, "Client") as mock_storage_client:
+            mock_storage_client.return_value.list_blobs.return_value = [blob]
+            with pytest.raises(RuntimeError, match="Checksum mismatch"):
+                prediction_utils.download_model_artifacts(
+                    f"gs://{GCS_BUCKET}/{GCS_PREFIX}", cache_dir=str(cache_dir)
+                )
+
+        assert not (tmp_path / FAKE_FILENAME).exists()
+        assert [
+            path.name for path in cache_dir.iterdir() if path.suffix != ".lock"
+        ] == []
+
 
 @pytest.fixture(scope="function")
 def yaml_file(tmp_path):
@@ -1060,3 +1197,212 @@ class TestYamlUtils:
         )
         with pytest.raises(ValueError, match=message):
             yaml_utils.load_yaml(uri)
+
+
+def _to_value_pb(python_value) -> struct_pb2.Value:
+    value_pb = struct_pb2.Value()
+    json_format.ParseDict(python_value, value_pb)
+    return value_pb
+
+
+class TestValueUtils:
+    @pytest.mark.parametrize(
+        "python_value",
+        [
+            None,
+            1.5,
+            "text",
+            True,
+            [1.0, "a", None, [2.0, 3.0]],
+            {"label": "cat", "scores": [0.1, 0.9], "nested": {"ok": False}},
+            [float(i) for i in range(100)],
+            [[float(i * j) for j in range(32)] for i in range(4)],
+            [float(i) for i in range(20)] + ["not a number"],
+        ],
+    )
+    def test_value_to_python_matches_message_to_dict(self, python_value):
+        value_pb = _to_value_pb(python_value)
+        assert _value_utils.value_to_python(value_pb) == json_format.MessageToDict(
+            value_pb
+        )
+
+    @pytest.mark.parametrize("number", [float("nan"), float("inf"), -float("inf")])
+    @pytest.mark.parametrize("length", [1, 100])
+    def test_value_to_python_raises_for_non_finite_numbers(self, number, length):
+        value_pb = struct_pb2.Value()
+        value_pb.list_value.extend([1.0] * (length - 1) + [number])
+        with pytest.raises(ValueError):
+            json_format.MessageToDict(value_pb)
+        with pytest.raises(ValueError):
+            _value_utils.value_to_python(value_pb)
+
+    def test_values_to_python(self):
+        values_pb = [_to_value_pb([1.0, 2.0]), _to_value_pb({"a": "b"})]
+        assert _value_utils.values_to_python(values_pb) == [[1.0, 2.0], {"a": "b"}]
+
+    def test_to_numpy(self):
+        import numpy as np
+
+        array = _value_utils.to_numpy([[1.0, 2.0], [3.0, 4.0]])
+        assert array.dtype == np.float64
+        np.testing.assert_array_equal(array, np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+    @pytest.mark.parametrize("values", [[[1.0, 2.0], [3.0]], [{"a": 1.0}], ["text"]])
+    def test_to_numpy_raises_for_non_dense_numeric_values(self, values):
+        with pytest.raises(ValueError):
+            _value_utils.to_numpy(values)
+
+
+class TestHttpUtils:
+    def test_pool_manager_follows_transport_settings(self):
+        transport = http_utils.HttpTransport(pool_maxsize=32, num_pools=4, block=True)
+
+        pool_manager = transport.pool_manager
+
+        assert pool_manager is transport.pool_manager
+        assert pool_manager.connection_pool_kw["maxsize"] == 32
+        assert pool_manager.connection_pool_kw["block"] is True
+        assert pool_manager.pools._maxsize == 4
+
+    def test_request_uses_pool_manager(self):
+        import urllib3
+
+        transport = http_utils.HttpTransport()
+        with mock.patch.object(urllib3.PoolManager, "request") as request_mock:
+            transport.request(method="GET", url="http://10.0.0.1/health")
+
+        request_mock.assert_called_once_with(
+            method="GET", url="http://10.0.0.1/health", body=None, headers=None
+        )
+
+    def test_authorized_session_mounts_pooled_adapter(self):
+        transport = http_utils.HttpTransport(pool_maxsize=16, block=True)
+
+        session = transport.authorized_session(
+            mock.create_autospec(credentials.Credentials, instance=True)
+        )
+
+        adapter = session.get_adapter("https://us-central1-aiplatform.googleapis.com")
+        assert adapter._pool_maxsize == 16
+        assert adapter._pool_block is True
+
+    @pytest.mark.asyncio
+    async def test_async_client_is_reused_within_event_loop(self):
+        transport = http_utils.HttpTransport()
+
+        client = transport.async_client()
+
+        assert client is transport.async_client()
+        await transport.aclose()
+        assert client.is_closed
+
+    def test_default_transport(self):
+        default_transport = http_utils.get_default_transport()
+        transport = http_utils.HttpTransport()
+        try:
+            http_utils.set_default_transport(transport)
+            assert http_utils.get_default_transport() is transport
+        finally:
+            http_utils.set_default_transport(default_transport)
+
+    def test_invalid_pool_maxsize_raises(self):
+        with pytest.raises(ValueError):
+            http_utils.HttpTransport(pool_maxsize=0)
+
+
+class TestCacheUtils:
+    def test_lru_cache_evicts_least_recently_used(self):
+        cache = cache_utils.LruCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_lru_cache_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            cache_utils.LruCache(max_size=0)
+
+    def test_hash_key(self):
+        assert cache_utils.hash_key("model", b"request") == cache_utils.hash_key(
+            b"model", "request"
+        )
+        assert cache_utils.hash_key("ab", "c") != cache_utils.hash_key("a", "bc")
+
+    def test_sqlite_cache_persists_values(self, tmp_path):
+        path = str(tmp_path / "cache" / "values.sqlite")
+        value = {"values": [0.1 * i for i in range(10)], "statistics": {"count": 2}}
+        cache = cache_utils.SqliteCache(path)
+        cache.put_many([("a", value), ("b", [1, 2])])
+        cache.close()
+
+        cache = cache_utils.SqliteCache(path)
+        assert cache.get_many(["a", "b", "c"]) == {"a": value, "b": [1, 2]}
+        assert cache.get("c", "default") == "default"
+        assert len(cache) == 2
+        assert (cache.hits, cache.misses) == (2, 2)
+        cache.close()
+
+    def test_embedding_cache_tiers(self, tmp_path):
+        path = str(tmp_path / "embeddings.sqlite")
+        cache = cache_utils.EmbeddingCache(path=path, max_memory_entries=1)
+        cache.put_many({"a": [1.0], "b": [2.0]})
+
+        # "a" was evicted from memory and is read from disk.
+        assert cache.get_many(["a", "b", "c"]) == {"a": [1.0], "b": [2.0]}
+        assert (cache.hits, cache.misses) == (2, 1)
+        # Each lookup is only counted by the embedding cache.
+        assert (cache._memory_cache.hits, cache._memory_cache.misses) == (0, 0)
+        assert (cache._disk_cache.hits, cache._disk_cache.misses) == (0, 0)
+        cache.close()
+
+    def test_embedding_cache_returns_copies(self):
+        cache = cache_utils.EmbeddingCache()
+        embedding = {"values": [1.0, 2.0]}
+        cache.put_many({"a": embedding})
+        embedding["values"].append(3.0)
+
+        cached_embedding = cache.get_many(["a"])["a"]
+        cached_embedding["values"].append(4.0)
+
+        assert cache.get_many(["a"]) == {"a": {"values": [1.0, 2.0]}}
+
+    def test_embedding_cache_key(self):
+        key = cache_utils.embedding_cache_key(
+            "model", {"content": "a", "task_type": "CLUSTERING"}, {"autoTruncate": True}
+        )
+        assert key == cache_utils.embedding_cache_key(
+            "model", {"task_type": "CLUSTERING", "content": "a"}, {"autoTruncate": True}
+        )
+        assert key != cache_utils.embedding_cache_key(
+            "model", {"content": "a"}, {"autoTruncate": True}
+        )
+        assert key != cache_utils.embedding_cache_key(
+            "model",
+            {"content": "a", "task_type": "CLUSTERING"},
+            {"autoTruncate": True, "outputDimensionality": 2},
+        )
+
+
+class TestImageUtils:
+    @pytest.mark.parametrize(
+        "header, mime_type",
+        [
+            (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image/png"),
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00", "image/jpeg"),
+            (b"GIF89a\x01\x00\x01\x00", "image/gif"),
+            (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+            (b"BM\x36\x00\x00\x00\x00\x00", "image/bmp"),
+            (b"II*\x00\x08\x00\x00\x00", "image/tiff"),
+            (b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00", "image/heic"),
+            (b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00", None),
+            (b"not an image", None),
+        ],
+    )
+    def test_sniff_mime_type(self, header, mime_type):
+        assert _image_utils.sniff_mime_type(header) == mime_type
@@ -185,6 +185,25 @@ def generate_video_from_gcs_uri(
 
 
 @pytest.mark.usefixtures("google_auth_mock")
+class TestImage:
+    def test_image_caches_encodings(self):
+        image = generate_image_from_file()
+        with mock.patch.object(PIL_Image, "open") as mock_open:
+            assert image._mime_type == "image/png"
+        # The MIME type is read from the file header without decoding the image.
+        mock_open.assert_not_called()
+
+        base64_string = image._as_base64_string()
+        assert image._as_base64_string() is base64_string
+
+        jpeg_bytes = io.BytesIO()
+        PIL_Image.new(mode="RGB", size=(10, 10)).save(jpeg_bytes, format="JPEG")
+        image._image_bytes = jpeg_bytes.getvalue()
+        assert image._mime_type == "image/jpeg"
+        assert image._as_base64_string() != base64_string
+        assert image._size == (10, 10)
+
+
 class TestImageGenerationModels:
     """Unit tests for the image generation models."""
 
@@ -1032,6 +1051,56 @@ class TestMultiModalEmbeddingModels:
         assert embedding_response.image_embedding == test_embeddings
         assert embedding_response.text_embedding == test_embeddings
 
+    def test_image_embedding_model_with_cache(self, tmp_path):
+        aiplatform.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        with mock.patch.object(
+            target=model_garden_service_client.ModelGardenServiceClient,
+            attribute="get_publisher_model",
+            return_value=gca_publisher_model.PublisherModel(
+                _IMAGE_EMBEDDING_PUBLISHER_MODEL_DICT
+            ),
+        ):
+            model = ga_vision_models.MultiModalEmbeddingModel.from_pretrained(
+                "multimodalembedding@001"
+            )
+
+        test_embeddings = [0.5] * 16
+        gca_predict_response = gca_prediction_service.PredictResponse()
+        gca_predict_response.predictions.append(
+            {
+                "imageEmbedding": test_embeddings,
+                "textEmbedding": test_embeddings,
+            }
+        )
+        image = generate_image_from_file()
+        cache_path = str(tmp_path / "embeddings.sqlite")
+
+        with mock.patch.object(
+            target=prediction_service_client.PredictionServiceClient,
+            attribute="predict",
+            return_value=gca_predict_response,
+        ) as mock_predict:
+            cache = ga_vision_models.EmbeddingCache(path=cache_path)
+            model.get_embeddings(
+                image=image, contextual_text="hello world", cache=cache
+            )
+            cache.close()
+            # A new cache reads the embeddings from disk.
+            cache = ga_vision_models.EmbeddingCache(path=cache_path)
+            embedding_response = model.get_embeddings(
+                image=image, contextual_text="hello world", cache=cache
+            )
+            model.get_embeddings(image=image, contextual_text="other", cache=cache)
+            cache.close()
+
+        assert mock_predict.call_count == 2
+        assert embedding_response.image_embedding == test_embeddings
+        assert embedding_response.text_embedding == test_embeddings
+        assert (cache.hits, cache.misses) == (1, 1)
+
     def test_image_embedding_model_with_only_text(self):
         aiplatform.init(
             project=_TEST_PROJECT,
@@ -16,11 +16,14 @@
 #
 
 # pylint: disable=protected-access,bad-continuation
+import asyncio
 import pytest
+import threading
 from typing import Iterable, MutableSequence, Optional
 from unittest import mock
 
 import vertexai
+from google.api_core import exceptions as api_core_exceptions
 from google.cloud.aiplatform import initializer
 from vertexai import generative_models
 from vertexai.preview import (
@@ -34,6 +37,7 @@ from vertexai.generative_models._generative_models import (
     gapic_tool_types,
 )
 from vertexai.generative_models import _function_calling_utils
+from vertexai.generative_models import _generative_models
 
 
 _TEST_PROJECT = "test-project"
@@ -984,6 +988,37 @@ class TestGenerativeModels:
             chat2.send_message("What is the weather like in Boston?")
         assert err.match("Exceeded the maximum")
 
+    @pytest.mark.asyncio
+    async def test_chat_automatic_function_calling_async(self):
+        generative_models = preview_generative_models
+        weather_tool = generative_models.Tool(
+            function_declarations=[
+                generative_models.FunctionDeclaration.from_func(get_current_weather)
+            ],
+        )
+        model = generative_models.GenerativeModel("gemini-pro", tools=[weather_tool])
+        chat = model.start_chat(
+            responder=generative_models.AutomaticFunctionCallingResponder(
+                max_automatic_function_calls=5,
+            )
+        )
+
+        async def generate_content(self, request, **kwargs):
+            return mock_generate_content(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceAsyncClient,
+            "generate_content",
+            new=generate_content,
+        ):
+            response = await chat.send_message_async(
+                "What is the weather like in Boston?"
+            )
+
+        assert response.text.startswith("The weather in Boston is")
+        assert len(chat.history) == 4
+        assert chat.history[-2].parts[0].function_response
+
 
 EXPECTED_SCHEMA_FOR_GET_CURRENT_WEATHER = {
     "title": "get_current_weather",
@@ -1034,3 +1069,824 @@ class TestFunctionCallingUtils:
                 parameters=fixed_schema,
             )
             assert function_declaration
+
+
+class TestImagePart:
+    def test_image_part_is_built_once(self):
+        image = generative_models.Image.from_bytes(
+            b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+        )
+        with mock.patch.object(_generative_models, "PIL_Image", None):
+            part = generative_models.Part.from_image(image)
+        assert part.inline_data.mime_type == "image/png"
+
+        content = _generative_models._to_content(["Describe", image])
+        assert content.parts[1] == part._raw_part
+        assert image._to_gapic_part() is image._to_gapic_part()
+        assert image._to_gapic_part() is not part._raw_part
+
+        part._raw_part.inline_data.mime_type = "image/gif"
+        assert image._to_gapic_part().inline_data.mime_type == "image/png"
+
+        image._image_bytes = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+        part = generative_models.Part.from_image(image)
+        assert part.inline_data.mime_type == "image/jpeg"
+        assert part.inline_data.data == image.data
+
+
+class TestPrepareRequest:
+    def setup_method(self):
+        vertexai.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+
+    def test_prepare_request_reuses_request_template(self):
+        model = generative_models.GenerativeModel(
+            "gemini-pro",
+            generation_config={"temperature": 0.5},
+            safety_settings={
+                generative_models.HarmCategory.HARM_CATEGORY_HATE_SPEECH: generative_models.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+            },
+            system_instruction="Be brief.",
+        )
+        template = model._get_request_template()
+
+        with mock.patch.object(
+            _generative_models,
+            "_to_gapic_generation_config",
+            wraps=_generative_models._to_gapic_generation_config,
+        ) as to_gapic_generation_config:
+            first_request = model._prepare_request(contents="first")
+            second_request = model._prepare_request(
+                contents="second",
+                generation_config=generative_models.GenerationConfig(temperature=0.1),
+            )
+
+        assert model._get_request_template() is template
+        # Only the per-call override is converted.
+        assert to_gapic_generation_config.call_count == 1
+        assert first_request.model == template.model
+        assert first_request.contents[0].parts[0].text == "first"
+        assert first_request.generation_config.temperature == 0.5
+        assert first_request.system_instruction.parts[0].text == "Be brief."
+        assert len(first_request.safety_settings) == 1
+        assert second_request.contents[0].parts[0].text == "second"
+        assert second_request.generation_config.temperature == pytest.approx(0.1)
+        assert second_request.safety_settings == first_request.safety_settings
+        # Requests do not share state with the template.
+        assert not template.contents
+
+    def test_request_template_follows_replaced_defaults(self):
+        model = generative_models.GenerativeModel(
+            "gemini-pro", generation_config={"temperature": 0.5}
+        )
+        model._prepare_request(contents="test")
+
+        model._generation_config = {"temperature": 0.2}
+        request = model._prepare_request(contents="test")
+
+        assert request.generation_config.temperature == pytest.approx(0.2)
+
+    @pytest.mark.usefixtures("google_auth_mock")
+    def test_generate_content_follows_defaults_modified_in_place(self):
+        generation_config = {"temperature": 0.5}
+        safety_settings = [
+            generative_models.SafetySetting(
+                category=generative_models.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+                threshold=generative_models.HarmBlockThreshold.BLOCK_ONLY_HIGH,
+            )
+        ]
+        model = generative_models.GenerativeModel(
+            "gemini-pro",
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+        )
+        requests = []
+
+        def generate_content(self, request, **kwargs):
+            requests.append(request)
+            return mock_generate_content_echo(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ):
+            model.generate_content("first")
+            generation_config["temperature"] = 0.2
+            safety_settings.clear()
+            model.generate_content("second")
+            model.generate_content("third")
+
+        assert requests[0].generation_config.temperature == 0.5
+        assert len(requests[0].safety_settings) == 1
+        assert requests[1].generation_config.temperature == pytest.approx(0.2)
+        assert not requests[1].safety_settings
+        assert requests[2].generation_config.temperature == pytest.approx(0.2)
+
+
+class TestGenerationResponseAccumulator:
+    @staticmethod
+    def _chunk(response_dict):
+        return generative_models.GenerationResponse.from_dict(response_dict)
+
+    def test_merges_text_parts(self):
+        accumulator = _generative_models._GenerationResponseAccumulator()
+        assert accumulator.response is None
+
+        num_chunks = 10000
+        for i in range(num_chunks):
+            accumulator.add(
+                self._chunk(
+                    {
+                        "candidates": [
+                            {
+                                "index": 0,
+                                "content": {
+                                    "role": "model" if i == 0 else "",
+                                    "parts": [{"text": f"{i},"}],
+                                },
+                            }
+                        ],
+                        "usage_metadata": {"candidates_token_count": i + 1},
+                    }
+                )
+            )
+
+        response = accumulator.response
+        assert response.text == "".join(f"{i}," for i in range(num_chunks))
+        assert response.candidates[0].content.role == "model"
+        assert response.usage_metadata.candidates_token_count == num_chunks
+
+    def test_merges_candidates_and_non_text_parts(self):
+        accumulator = _generative_models._GenerationResponseAccumulator()
+        first_chunk = self._chunk(
+            {
+                "candidates": [
+                    {"index": 0, "content": {"role": "model", "parts": [{"text": "a"}]}}
+                ],
+                "prompt_feedback": {"block_reason_message": "first"},
+            }
+        )
+        accumulator.add(first_chunk)
+        accumulator.add(
+            self._chunk(
+                {
+                    "candidates": [
+                        {
+                            "index": 0,
+                            "content": {
+                                "parts": [
+                                    {"text": "b"},
+                                    _RESPONSE_FUNCTION_CALL_PART_STRUCT,
+                                ]
+                            },
+                            "safety_ratings": _RESPONSE_SAFETY_RATINGS_STRUCT,
+                        },
+                        {"index": 1, "content": {"parts": [{"text": "c"}]}},
+                    ],
+                    "prompt_feedback": {"block_reason_message": "second"},
+                }
+            )
+        )
+        intermediate_response = accumulator.response
+        accumulator.add(
+            self._chunk(
+                {
+                    "candidates": [
+                        {
+                            "index": 0,
+                            "content": {"parts": [{"text": "d"}]},
+                            "finish_reason": "STOP",
+                        }
+                    ]
+                }
+            )
+        )
+
+        response = accumulator.response
+        candidate_0, candidate_1 = response.candidates
+        assert candidate_0.content.parts[0].text == "abd"
+        assert candidate_0.content.parts[1].function_call.name == "get_current_weather"
+        assert candidate_0.finish_reason == generative_models.FinishReason.STOP
+        assert len(candidate_0.safety_ratings) == len(_RESPONSE_SAFETY_RATINGS_STRUCT)
+        assert candidate_1.text == "c"
+        assert response.prompt_feedback.block_reason_message == "first"
+        # Responses and chunks are not modified by later chunks.
+        assert intermediate_response.candidates[0].content.parts[0].text == "ab"
+        assert first_chunk.text == "a"
+
+    def test_role_mismatch_raises_error(self):
+        accumulator = _generative_models._GenerationResponseAccumulator()
+        accumulator.add(
+            self._chunk({"candidates": [{"index": 0, "content": {"role": "model"}}]})
+        )
+
+        with pytest.raises(ValueError, match="Content roles do not match"):
+            accumulator.add(
+                self._chunk({"candidates": [{"index": 0, "content": {"role": "user"}}]})
+            )
+
+
+def mock_generate_content_echo(self, request, **kwargs):
+    prompt = request.contents[-1].parts[0].text
+    return gapic_prediction_service_types.GenerateContentResponse(
+        candidates=[
+            gapic_content_types.Candidate(
+                index=0,
+                content=gapic_content_types.Content(
+                    role="model", parts=[gapic_content_types.Part(text=prompt)]
+                ),
+                finish_reason=gapic_content_types.Candidate.FinishReason.STOP,
+            )
+        ]
+    )
+
+
+async def mock_generate_content_echo_async(self, request, **kwargs):
+    return mock_generate_content_echo(self, request)
+
+
+@pytest.mark.usefixtures("google_auth_mock")
+class TestGenerateContentBatch:
+    def setup_method(self):
+        vertexai.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+
+    @mock.patch.object(
+        target=prediction_service.PredictionServiceClient,
+        attribute="generate_content",
+        new=mock_generate_content_echo,
+    )
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_generate_content_batch(self, ordered):
+        model = generative_models.GenerativeModel("gemini-pro")
+        prompts = (f"prompt {i}" for i in range(50))
+
+        results = list(
+            model.generate_content_batch(prompts, max_concurrency=4, ordered=ordered)
+        )
+
+        if ordered:
+            assert [index for index, _ in results] == list(range(50))
+        assert sorted((index, response.text) for index, response in results) == [
+            (i, f"prompt {i}") for i in range(50)
+        ]
+
+    def test_generate_content_batch_retries_transient_errors(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        calls = []
+
+        def generate_content(self, request, **kwargs):
+            calls.append(request)
+            if len(calls) == 1:
+                raise api_core_exceptions.ServiceUnavailable("Unavailable")
+            return mock_generate_content_echo(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ), mock.patch.object(_generative_models, "_batch_retry_delay", return_value=0):
+            results = list(model.generate_content_batch(["prompt"]))
+
+        assert len(calls) == 2
+        assert results[0][1].text == "prompt"
+
+    def test_generate_content_batch_raises_non_transient_errors(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            side_effect=api_core_exceptions.InvalidArgument("Invalid"),
+        ) as generate_content_mock:
+            with pytest.raises(api_core_exceptions.InvalidArgument):
+                list(model.generate_content_batch(["prompt"]))
+
+        assert generate_content_mock.call_count == 1
+
+    def test_generate_content_batch_resumes_from_checkpoint(self, tmp_path):
+        model = generative_models.GenerativeModel("gemini-pro")
+        checkpoint_file = str(tmp_path / "checkpoint.jsonl")
+        prompts = [f"prompt {i}" for i in range(5)]
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            autospec=True,
+            side_effect=mock_generate_content_echo,
+        ) as generate_content_mock:
+            batch = model.generate_content_batch(
+                prompts, max_concurrency=1, checkpoint_file=checkpoint_file
+            )
+            # Interrupts the batch after two responses.
+            assert [next(batch)[0], next(batch)[0]] == [0, 1]
+            batch.close()
+            calls_before_resume = generate_content_mock.call_count
+
+            results = list(
+                model.generate_content_batch(
+                    prompts, max_concurrency=1, checkpoint_file=checkpoint_file
+                )
+            )
+
+        assert calls_before_resume >= 2
+        assert [response.text for _, response in results] == prompts
+        # Each prompt is sent once, whether it completed before or after resuming.
+        assert generate_content_mock.call_count == len(prompts)
+
+    def test_generate_content_batch_checkpoints_responses_on_completion(self, tmp_path):
+        model = generative_models.GenerativeModel("gemini-pro")
+        checkpoint_file = str(tmp_path / "checkpoint.jsonl")
+
+        def generate_content(self, request, **kwargs):
+            if request.contents[0].parts[0].text == "prompt 0":
+                raise api_core_exceptions.InvalidArgument("Invalid")
+            return mock_generate_content_echo(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ):
+            with pytest.raises(api_core_exceptions.InvalidArgument):
+                list(
+                    model.generate_content_batch(
+                        ["prompt 0", "prompt 1"],
+                        max_concurrency=2,
+                        checkpoint_file=checkpoint_file,
+                    )
+                )
+
+        # The response of prompt 1 is kept although prompt 0 failed first.
+        checkpoint = _generative_models._BatchCheckpoint(checkpoint_file)
+        assert list(checkpoint.responses) == [1]
+        assert checkpoint.responses[1].text == "prompt 1"
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"max_concurrency": 0},
+            {"rate_limit": 0},
+            {"rate_limit": -1},
+            {"max_retries": -1},
+        ],
+    )
+    def test_generate_content_batch_invalid_arguments(self, kwargs):
+        model = generative_models.GenerativeModel("gemini-pro")
+
+        with pytest.raises(ValueError):
+            list(model.generate_content_batch(["prompt"], **kwargs))
+
+    def test_token_bucket(self):
+        with mock.patch.object(
+            _generative_models.time, "monotonic", return_value=100.0
+        ):
+            token_bucket = _generative_models._TokenBucket(rate=2, capacity=2)
+            delays = [token_bucket.reserve() for _ in range(4)]
+
+        assert delays == [0.0, 0.0, 0.5, 1.0]
+
+    @pytest.mark.asyncio
+    @mock.patch.object(
+        target=prediction_service.PredictionServiceAsyncClient,
+        attribute="generate_content",
+        new=mock_generate_content_echo_async,
+    )
+    @pytest.mark.parametrize("ordered", [True, False])
+    async def test_generate_content_batch_async(self, ordered):
+        model = generative_models.GenerativeModel("gemini-pro")
+
+        results = [
+            result
+            async for result in model.generate_content_batch_async(
+                [f"prompt {i}" for i in range(20)],
+                max_concurrency=3,
+                rate_limit=60000,
+                ordered=ordered,
+            )
+        ]
+
+        if ordered:
+            assert [index for index, _ in results] == list(range(20))
+        assert sorted((index, response.text) for index, response in results) == [
+            (i, f"prompt {i}") for i in range(20)
+        ]
+
+
+def mock_generate_content_echo_with_usage(self, request, **kwargs):
+    response = mock_generate_content_echo(self, request)
+    # Every message and the system instruction count as 10 tokens.
+    response.usage_metadata = (
+        gapic_prediction_service_types.GenerateContentResponse.UsageMetadata(
+            prompt_token_count=10 * len(request.contents)
+            + (10 if request.system_instruction else 0),
+            candidates_token_count=10,
+        )
+    )
+    return response
+
+
+def mock_count_tokens_with_usage(self, request, **kwargs):
+    return gapic_prediction_service_types.CountTokensResponse(
+        total_tokens=10 * len(request.contents)
+    )
+
+
+@pytest.mark.usefixtures("google_auth_mock")
+class TestChatHistory:
+    def setup_method(self):
+        vertexai.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        _generative_models._count_tokens_cache.clear()
+
+    def teardown_method(self):
+        _generative_models._count_tokens_cache.clear()
+
+    def test_send_message_with_max_history_messages(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        chat = model.start_chat(max_history_messages=4)
+        requests = []
+
+        def generate_content(self, request, **kwargs):
+            requests.append(request)
+            return mock_generate_content_echo(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ):
+            for i in range(3):
+                chat.send_message(f"message {i}")
+
+        assert [content.text for content in chat.history] == [
+            "message 1",
+            "message 1",
+            "message 2",
+            "message 2",
+        ]
+        assert [content.role for content in chat.history] == [
+            "user",
+            "model",
+            "user",
+            "model",
+        ]
+        assert [content.parts[0].text for content in requests[-1].contents] == [
+            "message 0",
+            "message 0",
+            "message 1",
+            "message 1",
+            "message 2",
+        ]
+
+    @mock.patch.object(
+        target=prediction_service.PredictionServiceClient,
+        attribute="count_tokens",
+        new=mock_count_tokens_with_usage,
+    )
+    @mock.patch.object(
+        target=prediction_service.PredictionServiceClient,
+        attribute="generate_content",
+        new=mock_generate_content_echo_with_usage,
+    )
+    def test_send_message_with_max_history_tokens(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        chat = model.start_chat(max_history_tokens=35)
+
+        chat.send_message("message 0")
+        assert chat._history._total_tokens == 20
+        chat.send_message("message 1")
+
+        assert [content.text for content in chat.history] == [
+            "message 1",
+            "message 1",
+        ]
+        assert chat._history._total_tokens == 20
+
+    def test_send_message_with_history_and_max_history_tokens(self):
+        model = generative_models.GenerativeModel(
+            "gemini-pro", system_instruction="Be brief."
+        )
+        chat = model.start_chat(
+            history=[
+                generative_models.Content(
+                    role=role,
+                    parts=[generative_models.Part.from_text(f"history {i}")],
+                )
+                for i in range(2)
+                for role in ("user", "model")
+            ],
+            max_history_tokens=35,
+        )
+        requests = []
+
+        def generate_content(self, request, **kwargs):
+            requests.append(request)
+            return mock_generate_content_echo_with_usage(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ), mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "count_tokens",
+            autospec=True,
+            side_effect=mock_count_tokens_with_usage,
+        ) as count_tokens:
+            chat.send_message("message 0")
+            # The initial history and the first message are counted once, to
+            # learn the prompt tokens of the system instruction.
+            assert count_tokens.call_count == 5
+            chat.send_message("message 1")
+            assert count_tokens.call_count == 5
+
+        # The initial history is counted, so its oldest turn is dropped before
+        # the first request instead of the turns sent afterwards.
+        assert [content.parts[0].text for content in requests[0].contents] == [
+            "history 1",
+            "history 1",
+            "message 0",
+        ]
+        # The tokens of the system instruction are not attributed to messages.
+        assert [content.parts[0].text for content in requests[1].contents] == [
+            "message 0",
+            "message 0",
+            "message 1",
+        ]
+        assert [content.text for content in chat.history] == [
+            "message 1",
+            "message 1",
+        ]
+        assert chat._history._total_tokens == 20
+
+    @mock.patch.object(
+        target=prediction_service.PredictionServiceClient,
+        attribute="generate_content",
+        new=mock_generate_content_echo,
+    )
+    def test_send_message_after_modifying_history(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        chat = model.start_chat()
+        chat.send_message("message 0")
+
+        chat.history.clear()
+        chat.history.append(generative_models.Content(role="user", parts=[]))
+        chat.history.pop()
+        response = chat.send_message("message 1")
+
+        assert response.text == "message 1"
+        assert [content.text for content in chat.history] == [
+            "message 1",
+            "message 1",
+        ]
+
+    def test_send_message_after_replacing_middle_message(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        chat = model.start_chat()
+        requests = []
+
+        def generate_content(self, request, **kwargs):
+            requests.append(request)
+            return mock_generate_content_echo(self, request)
+
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "generate_content",
+            new=generate_content,
+        ):
+            chat.send_message("message 0")
+            chat.send_message("message 1")
+            chat.history[1] = generative_models.Content(
+                role="model", parts=[generative_models.Part.from_text("replaced")]
+            )
+            chat.send_message("message 2")
+
+        assert [content.parts[0].text for content in requests[-1].contents] == [
+            "message 0",
+            "replaced",
+            "message 1",
+            "message 1",
+            "message 2",
+        ]
+
+    def test_start_chat_with_invalid_history_limits(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        with pytest.raises(ValueError):
+            model.start_chat(max_history_messages=0)
+        with pytest.raises(ValueError):
+            model.start_chat(max_history_tokens=0)
+
+
+def _function_calls_response(*function_calls):
+    return generative_models.GenerationResponse.from_dict(
+        {
+            "candidates": [
+                {
+                    "content": {
+                        "role": "model",
+                        "parts": [
+                            {"function_call": {"name": name, "args": args}}
+                            for name, args in function_calls
+                        ],
+                    }
+                }
+            ]
+        }
+    )
+
+
+class TestAutomaticFunctionCallingResponder:
+    @staticmethod
+    def _responder_for(functions, **kwargs):
+        tool = preview_generative_models.Tool(
+            function_declarations=[
+                preview_generative_models.FunctionDeclaration.from_func(function)
+                for function in functions
+            ]
+        )
+        return preview_generative_models.AutomaticFunctionCallingResponder(
+            max_automatic_function_calls=5, **kwargs
+        )._create_responder_for_message(tools=[tool])
+
+    def test_respond_to_model_response_in_parallel(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_temperature(location: str):
+            """Gets the temperature."""
+            barrier.wait()
+            return {"temperature": len(location)}
+
+        def get_humidity(location: str):
+            """Gets the humidity."""
+            barrier.wait()
+            return {"humidity": len(location) * 2}
+
+        responder = self._responder_for(
+            [get_temperature, get_humidity], max_parallel_function_calls=2
+        )
+        content = responder.respond_to_model_response(
+            response=_function_calls_response(
+                ("get_temperature", {"location": "Boston"}),
+                ("get_humidity", {"location": "Paris"}),
+            )
+        )
+
+        assert [part.function_response.name for part in content.parts] == [
+            "get_temperature",
+            "get_humidity",
+        ]
+        assert [dict(part.function_response.response) for part in content.parts] == [
+            {"temperature": 6},
+            {"humidity": 10},
+        ]
+
+    def test_respond_to_model_response_with_timeout(self):
+        event = threading.Event()
+
+        def get_temperature(location: str):
+            """Gets the temperature."""
+            event.wait(5)
+            return {"temperature": 20}
+
+        responder = self._responder_for([get_temperature], function_call_timeout=0.01)
+        with pytest.raises(RuntimeError, match="did not return within"):
+            responder.respond_to_model_response(
+                response=_function_calls_response(
+                    ("get_temperature", {"location": "Boston"})
+                )
+            )
+        event.set()
+
+    @pytest.mark.asyncio
+    async def test_respond_to_model_response_async(self):
+        started = []
+
+        async def get_temperature(location: str):
+            """Gets the temperature."""
+            started.append(location)
+            await asyncio.sleep(0)
+            # Both calls have started before either returns.
+            assert len(started) == 2
+            return {"temperature": len(location)}
+
+        responder = self._responder_for(
+            [get_temperature], max_parallel_function_calls=2
+        )
+        content = await responder.respond_to_model_response_async(
+            response=_function_calls_response(
+                ("get_temperature", {"location": "Boston"}),
+                ("get_temperature", {"location": "Paris"}),
+            )
+        )
+
+        assert [dict(part.function_response.response) for part in content.parts] == [
+            {"temperature": 6},
+            {"temperature": 5},
+        ]
+
+
+@pytest.mark.usefixtures("google_auth_mock")
+class TestCountTokensCache:
+    def setup_method(self):
+        vertexai.init(
+            project=_TEST_PROJECT,
+            location=_TEST_LOCATION,
+        )
+        _generative_models._count_tokens_cache.clear()
+
+    def teardown_method(self):
+        _generative_models._count_tokens_cache.clear()
+
+    @staticmethod
+    def _count_tokens(self, request, **kwargs):
+        text = "".join(
+            part.text for content in request.contents for part in content.parts
+        )
+        return gapic_prediction_service_types.CountTokensResponse(
+            total_tokens=len(text.split()),
+            total_billable_characters=len(text),
+        )
+
+    def test_count_tokens_is_cached(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "count_tokens",
+            autospec=True,
+            side_effect=self._count_tokens,
+        ) as count_tokens:
+            first_response = model.count_tokens("Why is the sky blue?")
+            second_response = model.count_tokens("Why is the sky blue?")
+            other_model_response = generative_models.GenerativeModel(
+                "gemini-1.0-pro"
+            ).count_tokens("Why is the sky blue?")
+
+        assert count_tokens.call_count == 2
+        assert first_response.total_tokens == 5
+        assert second_response == first_response
+        assert second_response is not first_response
+        assert other_model_response.total_tokens == 5
+        assert _generative_models._count_tokens_cache.hits == 1
+
+    def test_count_tokens_many(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "count_tokens",
+            autospec=True,
+            side_effect=self._count_tokens,
+        ) as count_tokens:
+            model.count_tokens("one")
+            responses = model.count_tokens_many(
+                ["one", "one two", "one two three", "one two"],
+                max_concurrency=2,
+            )
+
+        assert [response.total_tokens for response in responses] == [1, 2, 3, 2]
+        # "one" is cached and "one two" is counted once.
+        assert count_tokens.call_count == 3
+        assert responses[1] == responses[3]
+        assert responses[1] is not responses[3]
+
+    def test_count_tokens_without_cache(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "count_tokens",
+            autospec=True,
+            side_effect=self._count_tokens,
+        ) as count_tokens:
+            model.count_tokens("Why is the sky blue?", use_cache=False)
+            model.count_tokens("Why is the sky blue?", use_cache=False)
+            model.count_tokens_many(["one", "one"], use_cache=False)
+
+        assert count_tokens.call_count == 4
+        assert len(_generative_models._count_tokens_cache) == 0
+
+    def test_count_tokens_with_file_data_is_not_cached(self):
+        model = generative_models.GenerativeModel("gemini-pro")
+        contents = [
+            "Describe this image.",
+            generative_models.Part.from_uri(
+                "gs://bucket/image.png", mime_type="image/png"
+            ),
+        ]
+        with mock.patch.object(
+            prediction_service.PredictionServiceClient,
+            "count_tokens",
+            autospec=True,
+            side_effect=self._count_tokens,
+        ) as count_tokens:
+            model.count_tokens(contents)
+            model.count_tokens(contents)
+
+        assert count_tokens.call_count == 2
+        assert len(_generative_models._count_tokens_cache) == 0
@@ -15,25 +15,39 @@
 """Classes for working with generative models."""
 # pylint: disable=bad-continuation, line-too-long, protected-access
 
+import asyncio
+import collections
+from concurrent import futures
 import copy
+import functools
+import inspect
 import io
 import json
 import pathlib
+import random
+import threading
+import time
 from typing import (
     Any,
     AsyncIterable,
+    AsyncIterator,
     Awaitable,
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
+    Tuple,
     Union,
 )
 
+from google.api_core import exceptions as api_core_exceptions
 from google.cloud.aiplatform import initializer as aiplatform_initializer
 from google.cloud.aiplatform import utils as aiplatform_utils
+from google.cloud.aiplatform.utils import _image_utils
+from google.cloud.aiplatform.utils import cache_utils
 from google.cloud.aiplatform_v1beta1 import types as aiplatform_types
 from google.cloud.aiplatform_v1beta1.services import prediction_service
 from google.cloud.aiplatform_v1beta1.types import (
@@ -97,6 +111,88 @@ SafetySettingsType = Union[
 ]
 
 
+_COUNT_TOKENS_CACHE_SIZE = 1024
+_DEFAULT_COUNT_TOKENS_MAX_CONCURRENCY = 8
+
+_DEFAULT_BATCH_MAX_CONCURRENCY = 8
+_DEFAULT_BATCH_MAX_RETRIES = 5
+_BATCH_RETRY_INITIAL_DELAY = 1.0
+_BATCH_RETRY_MAX_DELAY = 60.0
+_BATCH_RETRYABLE_EXCEPTIONS = (
+    api_core_exceptions.Aborted,
+    api_core_exceptions.DeadlineExceeded,
+    api_core_exceptions.InternalServerError,
+    api_core_exceptions.ResourceExhausted,
+    api_core_exceptions.ServiceUnavailable,
+)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket limiting the rate of requests."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initializes the bucket.
+
+        Args:
+            rate: The number of tokens added per second.
+            capacity: The maximum number of tokens, which is the largest burst.
+        """
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns the time in seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._last_refill) * self._rate
+            )
+            self._last_refill = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+
+def _batch_retry_delay(attempt: int) -> float:
+    """Returns the backoff before a retry, exponential with full jitter."""
+    return random.uniform(
+        0, min(_BATCH_RETRY_MAX_DELAY, _BATCH_RETRY_INITIAL_DELAY * 2**attempt)
+    )
+
+
+class _BatchCheckpoint:
+    """JSON Lines file with the responses of the completed prompts of a batch."""
+
+    def __init__(self, path: Optional[str]):
+        self._path = path
+        self._lock = threading.Lock()
+        self.responses: Dict[int, GenerationResponse] = {}
+        if path and pathlib.Path(path).exists():
+            with open(path, "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last line of an interrupted run may be incomplete.
+                        continue
+                    self.responses[record["index"]] = GenerationResponse.from_dict(
+                        record["response"]
+                    )
+
+    def write(self, index: int, response: "GenerationResponse") -> None:
+        """Appends the response of a completed prompt. Safe to call from any thread."""
+        if not self._path:
+            return
+        line = json.dumps({"index": index, "response": response.to_dict()}) + "\n"
+        with self._lock:
+            with open(self._path, "a") as f:
+                f.write(line)
+
+
 class _GenerativeModel:
     r"""A model that can generate content.
 
@@ -192,15 +288,8 @@ class _GenerativeModel:
         self._tool_config = tool_config
         self._system_instruction = system_instruction
 
-        # Validating the parameters
-        self._prepare_request(
-            contents="test",
-            generation_config=generation_config,
-            safety_settings=safety_settings,
-            tools=tools,
-            tool_config=tool_config,
-            system_instruction=system_instruction,
-        )
+        # Validating the parameters and building the request template
+        self._prepare_request(contents="test")
 
     @property
     def _prediction_client(self) -> prediction_service.PredictionServiceClient:
@@ -230,6 +319,44 @@ class _GenerativeModel:
             )
         return self._prediction_async_client_value
 
+    def _get_request_template(
+        self,
+    ) -> gapic_prediction_service_types.GenerateContentRequest:
+        """Returns the request fields built from the model defaults.
+
+        The template is built once and rebuilt only if a default changes, so
+        repeated calls do not convert the default configs, tools and system
+        instruction again. Dicts and lists are compared with a snapshot taken
+        when the template was built, so defaults modified in place are noticed.
+        """
+        defaults = (
+            self._generation_config,
+            self._safety_settings,
+            self._tools,
+            self._tool_config,
+            self._system_instruction,
+        )
+        cached = getattr(self, "_request_template_value", None)
+        if cached is None or cached[0] != defaults:
+            template = gapic_prediction_service_types.GenerateContentRequest(
+                # The `model` parameter now needs to be set for the vision models.
+                # Always need to pass the resource via the `model` parameter.
+                # Even when resource is an endpoint.
+                model=self._prediction_resource_name,
+                generation_config=_to_gapic_generation_config(self._generation_config),
+                safety_settings=_to_gapic_safety_settings(self._safety_settings),
+                tools=_to_gapic_tools(self._tools),
+                tool_config=_to_gapic_tool_config(self._tool_config),
+                system_instruction=(
+                    _to_content(self._system_instruction)
+                    if self._system_instruction
+                    else None
+                ),
+            )
+            cached = (_snapshot_defaults(defaults), template)
+            self._request_template_value = cached
+        return cached[1]
+
     def _prepare_request(
         self,
         contents: ContentsType,
@@ -240,123 +367,31 @@ class _GenerativeModel:
         tool_config: Optional["ToolConfig"] = None,
         system_instruction: Optional[PartsType] = None,
     ) -> gapic_prediction_service_types.GenerateContentRequest:
-        """Prepares a GAPIC GenerateContentRequest."""
+        """Prepares a GAPIC GenerateContentRequest.
+
+        Only the arguments given per call are converted, the model defaults are
+        copied from the cached request template.
+        """
         if not contents:
             raise TypeError("contents must not be empty")
 
-        generation_config = generation_config or self._generation_config
-        safety_settings = safety_settings or self._safety_settings
-        tools = tools or self._tools
-        tool_config = tool_config or self._tool_config
-        system_instruction = system_instruction or self._system_instruction
-
-        # contents can either be a list of Content objects (most generic case)
-        if isinstance(contents, Sequence) and any(
-            isinstance(c, gapic_content_types.Content) for c in contents
-        ):
-            if not all(isinstance(c, gapic_content_types.Content) for c in contents):
-                raise TypeError(
-                    "When passing a list with Content objects, every item in a list must be a Content object."
-                )
-        elif isinstance(contents, Sequence) and any(
-            isinstance(c, Content) for c in contents
-        ):
-            if not all(isinstance(c, Content) for c in contents):
-                raise TypeError(
-                    "When passing a list with Content objects, every item in a list must be a Content object."
-                )
-            contents = [content._raw_content for content in contents]
-        elif isinstance(contents, Sequence) and any(
-            isinstance(c, dict) for c in contents
-        ):
-            if not all(isinstance(c, dict) for c in contents):
-                raise TypeError(
-                    "When passing a list with Content dict objects, every item in a list must be a Content dict object."
-                )
-            contents = [
-                gapic_content_types.Content(content_dict) for content_dict in contents
-            ]
-        # or a value that can be converted to a *single* Content object
+        request = gapic_prediction_service_types.GenerateContentRequest()
+        request._pb.CopyFrom(self._get_request_template()._pb)
+        if isinstance(contents, _RawContents):
+            request._pb.contents.extend(contents)
         else:
-            contents = [_to_content(contents)]
-
-        gapic_system_instruction: Optional[gapic_content_types.Content] = None
-        if system_instruction:
-            gapic_system_instruction = _to_content(system_instruction)
-
-        gapic_generation_config: Optional[gapic_content_types.GenerationConfig] = None
+            request.contents = _to_gapic_contents(contents)
         if generation_config:
-            if isinstance(generation_config, gapic_content_types.GenerationConfig):
-                gapic_generation_config = generation_config
-            elif isinstance(generation_config, GenerationConfig):
-                gapic_generation_config = generation_config._raw_generation_config
-            elif isinstance(generation_config, Dict):
-                gapic_generation_config = gapic_content_types.GenerationConfig(
-                    **generation_config
-                )
-            else:
-                raise TypeError(
-                    "generation_config must either be a GenerationConfig object or a dictionary representation of it."
-                )
-
-        gapic_safety_settings = None
+            request.generation_config = _to_gapic_generation_config(generation_config)
         if safety_settings:
-            if isinstance(safety_settings, Sequence):
-                gapic_safety_settings = []
-                for safety_setting in safety_settings:
-                    if isinstance(safety_setting, gapic_content_types.SafetySetting):
-                        gapic_safety_settings.append(safety_setting)
-                    elif isinstance(safety_setting, SafetySetting):
-                        gapic_safety_settings.append(safety_setting._raw_safety_setting)
-                    else:
-                        raise TypeError(
-                            "When passing a list with SafetySettings objects, every item in a list must be a SafetySetting object."
-                        )
-            elif isinstance(safety_settings, dict):
-                gapic_safety_settings = [
-                    gapic_content_types.SafetySetting(
-                        category=gapic_content_types.HarmCategory(category),
-                        threshold=gapic_content_types.SafetySetting.HarmBlockThreshold(
-                            threshold
-                        ),
-                    )
-                    for category, threshold in safety_settings.items()
-                ]
-            else:
-                raise TypeError(
-                    "safety_settings must either be a list of SafetySettings objects or a dictionary mapping from HarmCategory to HarmBlockThreshold."
-                )
-
-        gapic_tools = None
+            request.safety_settings = _to_gapic_safety_settings(safety_settings)
         if tools:
-            gapic_tools = []
-            for tool in tools:
-                if isinstance(tool, gapic_tool_types.Tool):
-                    gapic_tools.append(tool)
-                elif isinstance(tool, Tool):
-                    gapic_tools.append(tool._raw_tool)
-                else:
-                    raise TypeError(f"Unexpected tool type: {tool}.")
-
-        gapic_tool_config = None
+            request.tools = _to_gapic_tools(tools)
         if tool_config:
-            if isinstance(tool_config, ToolConfig):
-                gapic_tool_config = tool_config._gapic_tool_config
-            else:
-                raise TypeError("tool_config must be a ToolConfig object.")
-
-        return gapic_prediction_service_types.GenerateContentRequest(
-            # The `model` parameter now needs to be set for the vision models.
-            # Always need to pass the resource via the `model` parameter.
-            # Even when resource is an endpoint.
-            model=self._prediction_resource_name,
-            contents=contents,
-            generation_config=gapic_generation_config,
-            safety_settings=gapic_safety_settings,
-            tools=gapic_tools,
-            tool_config=gapic_tool_config,
-            system_instruction=gapic_system_instruction,
-        )
+            request.tool_config = _to_gapic_tool_config(tool_config)
+        if system_instruction:
+            request.system_instruction = _to_content(system_instruction)
+        return request
 
     def _parse_response(
         self,
@@ -459,6 +494,261 @@ class _GenerativeModel:
                 tool_config=tool_config,
             )
 
+    def generate_content_batch(
+        self,
+        prompts: Iterable[ContentsType],
+        *,
+        generation_config: Optional[GenerationConfigType] = None,
+        safety_settings: Optional[SafetySettingsType] = None,
+        tools: Optional[List["Tool"]] = None,
+        tool_config: Optional["ToolConfig"] = None,
+        max_concurrency: int = _DEFAULT_BATCH_MAX_CONCURRENCY,
+        rate_limit: Optional[float] = None,
+        ordered: bool = True,
+        max_retries: int = _DEFAULT_BATCH_MAX_RETRIES,
+        checkpoint_file: Optional[str] = None,
+    ) -> Iterator[Tuple[int, "GenerationResponse"]]:
+        """Generates content for many prompts concurrently.
+
+        Usage:
+            ```
+            model = GenerativeModel("gemini-pro")
+            for index, response in model.generate_content_batch(
+                prompts, rate_limit=300, checkpoint_file="batch.jsonl"
+            ):
+                print(index, response.text)
+            ```
+
+        Args:
+            prompts: The contents of each request. Prompts are consumed lazily,
+                so a generator can be passed for large batches.
+                Each prompt supports the same values as `contents` of `generate_content`.
+            generation_config: Parameters for the generation.
+            safety_settings: Safety settings as a mapping from HarmCategory to HarmBlockThreshold.
+            tools: A list of tools (functions) that the model can try calling.
+            tool_config: Config shared for all tools provided in the request.
+            max_concurrency: The maximum number of concurrent requests.
+            rate_limit: The maximum number of requests per minute, including
+                retries. Unlimited if not set.
+            ordered: Whether to yield the responses in the order of the prompts,
+                or as soon as they complete.
+            max_retries: The maximum number of retries of a request failing
+                with a transient error. Retries back off exponentially.
+            checkpoint_file: Optional path of a JSON Lines file the responses are
+                appended to as soon as they complete. Prompts with a response in the file are not sent
+                again, so an interrupted batch resumes where it stopped when
+                called again with the same prompts and file.
+
+        Yields:
+            Tuples of the index of the prompt and its GenerationResponse.
+
+        Raises:
+            ValueError: If `max_concurrency` or `rate_limit` is not positive, or
+                if `max_retries` is negative.
+            GoogleAPICallError: If a request fails with a non-transient error or
+                still fails after `max_retries` retries.
+        """
+        token_bucket, checkpoint = self._prepare_batch(
+            max_concurrency=max_concurrency,
+            rate_limit=rate_limit,
+            max_retries=max_retries,
+            checkpoint_file=checkpoint_file,
+        )
+
+        def generate(index: int, prompt: ContentsType) -> "GenerationResponse":
+            for attempt in range(max_retries + 1):
+                if token_bucket:
+                    time.sleep(token_bucket.reserve())
+                try:
+                    response = self._generate_content(
+                        contents=prompt,
+                        generation_config=generation_config,
+                        safety_settings=safety_settings,
+                        tools=tools,
+                        tool_config=tool_config,
+                    )
+                except _BATCH_RETRYABLE_EXCEPTIONS:
+                    if attempt == max_retries:
+                        raise
+                else:
+                    # Checkpointed on completion rather than when yielded, so
+                    # responses finishing behind a slow prompt are kept.
+                    checkpoint.write(index, response)
+                    return response
+                time.sleep(_batch_retry_delay(attempt))
+
+        # Keeps the workers busy while the caller consumes ordered responses.
+        max_pending = 2 * max_concurrency
+        pending = collections.deque()
+        prompts_iter = enumerate(prompts)
+        with futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            try:
+                while True:
+                    for index, prompt in prompts_iter:
+                        if index in checkpoint.responses:
+                            future = futures.Future()
+                            future.set_result(checkpoint.responses.pop(index))
+                            pending.append((index, future))
+                        else:
+                            future = executor.submit(generate, index, prompt)
+                            pending.append((index, future))
+                        if len(pending) >= max_pending:
+                            break
+                    if not pending:
+                        return
+
+                    if ordered:
+                        entry = pending.popleft()
+                    else:
+                        futures.wait(
+                            [future for _, future in pending],
+                            return_when=futures.FIRST_COMPLETED,
+                        )
+                        entry = next(entry for entry in pending if entry[1].done())
+                        pending.remove(entry)
+                    index, future = entry
+                    yield index, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    async def generate_content_batch_async(
+        self,
+        prompts: Iterable[ContentsType],
+        *,
+        generation_config: Optional[GenerationConfigType] = None,
+        safety_settings: Optional[SafetySettingsType] = None,
+        tools: Optional[List["Tool"]] = None,
+        tool_config: Optional["ToolConfig"] = None,
+        max_concurrency: int = _DEFAULT_BATCH_MAX_CONCURRENCY,
+        rate_limit: Optional[float] = None,
+        ordered: bool = True,
+        max_retries: int = _DEFAULT_BATCH_MAX_RETRIES,
+        checkpoint_file: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[int, "GenerationResponse"]]:
+        """Generates content for many prompts concurrently and asynchronously.
+
+        Usage:
+            ```
+            model = GenerativeModel("gemini-pro")
+            async for index, response in model.generate_content_batch_async(
+                prompts, rate_limit=300
+            ):
+                print(index, response.text)
+            ```
+
+        Args:
+            prompts: The contents of each request. Prompts are consumed lazily,
+                so a generator can be passed for large batches.
+                Each prompt supports the same values as `contents` of `generate_content`.
+            generation_config: Parameters for the generation.
+            safety_settings: Safety settings as a mapping from HarmCategory to HarmBlockThreshold.
+            tools: A list of tools (functions) that the model can try calling.
+            tool_config: Config shared for all tools provided in the request.
+            max_concurrency: The maximum number of concurrent requests.
+            rate_limit: The maximum number of requests per minute, including
+                retries. Unlimited if not set.
+            ordered: Whether to yield the responses in the order of the prompts,
+                or as soon as they complete.
+            max_retries: The maximum number of retries of a request failing
+                with a transient error. Retries back off exponentially.
+            checkpoint_file: Optional path of a JSON Lines file the responses are
+                appended to as soon as they complete. Prompts with a response in the file are not sent
+                again, so an interrupted batch resumes where it stopped when
+                called again with the same prompts and file.
+
+        Yields:
+            Tuples of the index of the prompt and its GenerationResponse.
+
+        Raises:
+            ValueError: If `max_concurrency` or `rate_limit` is not positive, or
+                if `max_retries` is negative.
+            GoogleAPICallError: If a request fails with a non-transient error or
+                still fails after `max_retries` retries.
+        """
+        token_bucket, checkpoint = self._prepare_batch(
+            max_concurrency=max_concurrency,
+            rate_limit=rate_limit,
+            max_retries=max_retries,
+            checkpoint_file=checkpoint_file,
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate(index: int, prompt: ContentsType) -> "GenerationResponse":
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    if token_bucket:
+                        await asyncio.sleep(token_bucket.reserve())
+                    try:
+                        response = await self.generate_content_async(
+                            contents=prompt,
+                            generation_config=generation_config,
+                            safety_settings=safety_settings,
+                            tools=tools,
+                            tool_config=tool_config,
+                        )
+                    except _BATCH_RETRYABLE_EXCEPTIONS:
+                        if attempt == max_retries:
+                            raise
+                    else:
+                        checkpoint.write(index, response)
+                        return response
+                    await asyncio.sleep(_batch_retry_delay(attempt))
+
+        loop = asyncio.get_running_loop()
+        max_pending = 2 * max_concurrency
+        pending = collections.deque()
+        prompts_iter = enumerate(prompts)
+        try:
+            while True:
+                for index, prompt in prompts_iter:
+                    if index in checkpoint.responses:
+                        task = loop.create_future()
+                        task.set_result(checkpoint.responses.pop(index))
+                    else:
+                        task = asyncio.ensure_future(generate(index, prompt))
+                    pending.append((index, task))
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+
+                if ordered:
+                    entry = pending.popleft()
+                else:
+                    await asyncio.wait(
+                        [task for _, task in pending],
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    entry = next(entry for entry in pending if entry[1].done())
+                    pending.remove(entry)
+                index, task = entry
+                yield index, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def _prepare_batch(
+        self,
+        max_concurrency: int,
+        rate_limit: Optional[float],
+        max_retries: int,
+        checkpoint_file: Optional[str],
+    ) -> Tuple[Optional[_TokenBucket], _BatchCheckpoint]:
+        """Validates the batch arguments and creates its rate limiter and checkpoint."""
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative.")
+        token_bucket = None
+        if rate_limit is not None:
+            if rate_limit <= 0:
+                raise ValueError("rate_limit must be positive.")
+            token_bucket = _TokenBucket(
+                rate=rate_limit / 60, capacity=min(max_concurrency, rate_limit)
+            )
+        return token_bucket, _BatchCheckpoint(checkpoint_file)
+
     def _generate_content(
         self,
         contents: ContentsType,
@@ -620,10 +910,14 @@ class _GenerativeModel:
         return async_generator()
 
     def count_tokens(
-        self, contents: ContentsType
+        self, contents: ContentsType, *, use_cache: bool = True
     ) -> gapic_prediction_service_types.CountTokensResponse:
         """Counts tokens.
 
+        Token counts are cached on the client, keyed by the model and the
+        contents. Contents referencing files by URI are not cached, because
+        the files can change.
+
         Args:
             contents: Contents to send to the model.
                 Supports either a list of Content objects (passing a multi-turn conversation)
@@ -632,25 +926,28 @@ class _GenerativeModel:
                 * str, Image, Part,
                 * List[Union[str, Image, Part]],
                 * List[Content]
+            use_cache: Whether to use the client-side cache of token counts.
 
         Returns:
             A CountTokensResponse object that has the following attributes:
                 total_tokens: The total number of tokens counted across all instances from the request.
                 total_billable_characters: The total number of billable characters counted across all instances from the request.
         """
-        return self._prediction_client.count_tokens(
-            request=gapic_prediction_service_types.CountTokensRequest(
-                endpoint=self._prediction_resource_name,
-                model=self._prediction_resource_name,
-                contents=self._prepare_request(contents=contents).contents,
-            )
-        )
+        request = self._prepare_count_tokens_request(contents)
+        cache_key = _count_tokens_cache_key(request) if use_cache else None
+        response = _get_cached_count_tokens_response(cache_key)
+        if response is None:
+            response = self._prediction_client.count_tokens(request=request)
+            _cache_count_tokens_response(cache_key, response)
+        return response
 
     async def count_tokens_async(
-        self, contents: ContentsType
+        self, contents: ContentsType, *, use_cache: bool = True
     ) -> gapic_prediction_service_types.CountTokensResponse:
         """Counts tokens asynchronously.
 
+        Token counts are cached like those of `count_tokens`.
+
         Args:
             contents: Contents to send to the model.
                 Supports either a list of Content objects (passing a multi-turn conversation)
@@ -659,18 +956,95 @@ class _GenerativeModel:
                 * str, Image, Part,
                 * List[Union[str, Image, Part]],
                 * List[Content]
+            use_cache: Whether to use the client-side cache of token counts.
 
         Returns:
             And awaitable for a CountTokensResponse object that has the following attributes:
                 total_tokens: The total number of tokens counted across all instances from the request.
                 total_billable_characters: The total number of billable characters counted across all instances from the request.
         """
-        return await self._prediction_async_client.count_tokens(
-            request=gapic_prediction_service_types.CountTokensRequest(
-                endpoint=self._prediction_resource_name,
-                model=self._prediction_resource_name,
-                contents=self._prepare_request(contents=contents).contents,
-            )
+        request = self._prepare_count_tokens_request(contents)
+        cache_key = _count_tokens_cache_key(request) if use_cache else None
+        response = _get_cached_count_tokens_response(cache_key)
+        if response is None:
+            response = await self._prediction_async_client.count_tokens(request=request)
+            _cache_count_tokens_response(cache_key, response)
+        return response
+
+    def count_tokens_many(
+        self,
+        contents_list: Iterable[ContentsType],
+        *,
+        max_concurrency: int = _DEFAULT_COUNT_TOKENS_MAX_CONCURRENCY,
+        use_cache: bool = True,
+    ) -> List[gapic_prediction_service_types.CountTokensResponse]:
+        """Counts tokens of several contents.
+
+        Token counts are cached like those of `count_tokens`. Identical cached
+        contents are counted once and the contents missing from the cache are
+        counted concurrently.
+
+        Args:
+            contents_list: The contents to count tokens of. Each item supports
+                the same values as the `contents` argument of `count_tokens`.
+            max_concurrency: The maximum number of concurrent requests.
+            use_cache: Whether to use the client-side cache of token counts.
+
+        Returns:
+            A CountTokensResponse object for each item of `contents_list`, in
+            the same order.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        # Requests keyed by their cache key, or by their index if not cached.
+        requests = {}
+        request_keys = []
+        for index, contents in enumerate(contents_list):
+            request = self._prepare_count_tokens_request(contents)
+            cache_key = _count_tokens_cache_key(request) if use_cache else None
+            request_key = index if cache_key is None else cache_key
+            requests.setdefault(request_key, (cache_key, request))
+            request_keys.append(request_key)
+
+        responses = {}
+        missing = []
+        for request_key, (cache_key, _) in requests.items():
+            response = _get_cached_count_tokens_response(cache_key)
+            if response is None:
+                missing.append(request_key)
+            else:
+                responses[request_key] = response
+
+        def count_tokens(request_key):
+            cache_key, request = requests[request_key]
+            response = self._prediction_client.count_tokens(request=request)
+            _cache_count_tokens_response(cache_key, response)
+            return response
+
+        if missing:
+            with futures.ThreadPoolExecutor(
+                max_workers=min(len(missing), max_concurrency)
+            ) as executor:
+                responses.update(zip(missing, executor.map(count_tokens, missing)))
+
+        results = []
+        returned = set()
+        for request_key in request_keys:
+            response = responses[request_key]
+            if request_key in returned:
+                # Repeated contents get their own copy of the response.
+                response = copy.deepcopy(response)
+            returned.add(request_key)
+            results.append(response)
+        return results
+
+    def _prepare_count_tokens_request(
+        self, contents: ContentsType
+    ) -> gapic_prediction_service_types.CountTokensRequest:
+        return gapic_prediction_service_types.CountTokensRequest(
+            endpoint=self._prediction_resource_name,
+            model=self._prediction_resource_name,
+            contents=self._prepare_request(contents=contents).contents,
         )
 
     def start_chat(
@@ -678,6 +1052,8 @@ class _GenerativeModel:
         *,
         history: Optional[List["Content"]] = None,
         response_validation: bool = True,
+        max_history_messages: Optional[int] = None,
+        max_history_tokens: Optional[int] = None,
     ) -> "ChatSession":
         """Creates a stateful chat session.
 
@@ -691,6 +1067,13 @@ class _GenerativeModel:
                 accumulate the request and response messages even if the
                 reponse if blocked or incomplete. This can result in an unusable
                 chat session state.
+            max_history_messages: The maximum number of messages kept in the
+                chat session history. The oldest turns are dropped first.
+            max_history_tokens: The maximum number of tokens kept in the chat
+                session history, as reported by the usage metadata of the
+                responses. The tokens of messages that are not known from the
+                responses, like those of the initial history, are counted with
+                `count_tokens`. The oldest turns are dropped first.
 
         Returns:
             A ChatSession object.
@@ -699,6 +1082,8 @@ class _GenerativeModel:
             model=self,
             history=history,
             response_validation=response_validation,
+            max_history_messages=max_history_messages,
+            max_history_tokens=max_history_tokens,
         )
 
 
@@ -742,6 +1127,254 @@ def _validate_response(
         )
 
 
+class _ChatHistory:
+    """Append-only store of the messages of a chat session.
+
+    The raw protobuf of every message is kept next to the message, so sending a
+    message copies the stored contents into the request instead of converting
+    the whole history again. The copy still grows with the history, unless the
+    history is bounded by a message or token limit, in which case the oldest
+    turns are dropped.
+
+    Token counts are derived from the usage metadata of the responses. The
+    prompt tokens of the system instruction and tools are not attributed to
+    any message, and messages whose token counts are not known, like those of
+    the initial history, are counted before the next request.
+    """
+
+    def __init__(
+        self,
+        messages: List["Content"],
+        *,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_history_messages must be at least 1.")
+        if max_tokens is not None and max_tokens < 1:
+            raise ValueError("max_history_tokens must be at least 1.")
+        self.messages = messages
+        self._max_messages = max_messages
+        self._max_tokens = max_tokens
+        self._contents_pb = []
+        # None if the token count of a message is not known yet.
+        self._token_counts: List[Optional[int]] = []
+        self._total_tokens = 0
+        # Prompt tokens of the system instruction and the tools sent with them.
+        self._prompt_tokens: Optional[int] = None
+        self._prompt_tools = None
+        self._sync()
+        self._truncate(keep=0)
+
+    def _sync(self) -> None:
+        """Rebuilds the stored contents if the messages were modified directly."""
+        messages = self.messages
+        contents_pb = self._contents_pb
+        if len(messages) == len(contents_pb) and all(
+            message._raw_content._pb is content_pb
+            for message, content_pb in zip(messages, contents_pb)
+        ):
+            return
+        # Messages that are still stored keep their token counts, those of
+        # messages added directly are unknown.
+        token_counts = {
+            id(content_pb): token_count
+            for content_pb, token_count in zip(contents_pb, self._token_counts)
+        }
+        self._contents_pb = [message._raw_content._pb for message in messages]
+        self._token_counts = [
+            token_counts.get(id(content_pb)) for content_pb in self._contents_pb
+        ]
+        self._total_tokens = sum(filter(None, self._token_counts))
+
+    def _messages_to_count(
+        self, pending: List["Content"], tools: Optional[List["Tool"]]
+    ) -> List["Content"]:
+        """Returns the messages whose token counts are needed for a request.
+
+        The last pending message is included if the prompt tokens of the
+        system instruction and tools are not known yet.
+        """
+        if self._max_tokens is None:
+            return []
+        self._sync()
+        messages = [
+            message
+            for message, token_count in zip(self.messages, self._token_counts)
+            if token_count is None
+        ]
+        if self._prompt_tokens is None or self._prompt_tools is not tools:
+            messages.append(pending[-1])
+        return messages
+
+    def _set_token_counts(
+        self,
+        messages: List["Content"],
+        responses: List[gapic_prediction_service_types.CountTokensResponse],
+        pending: List["Content"],
+    ) -> Optional[int]:
+        """Stores the counted token counts and drops the turns exceeding the limit.
+
+        Returns:
+            The token count of the last pending message if it was counted.
+        """
+        token_counts = [response.total_tokens for response in responses]
+        pending_token_count = None
+        if messages and messages[-1] is pending[-1]:
+            pending_token_count = token_counts.pop()
+        token_counts.reverse()
+        for index, token_count in enumerate(self._token_counts):
+            if token_count is None:
+                self._token_counts[index] = token_counts.pop()
+        self._total_tokens = sum(self._token_counts)
+        self._truncate(keep=0)
+        return pending_token_count
+
+    def count_tokens(
+        self,
+        model: "_GenerativeModel",
+        pending: List["Content"],
+        tools: Optional[List["Tool"]],
+    ) -> Optional[int]:
+        """Counts the tokens that cannot be derived from the next response.
+
+        Only done if the history is bounded by a token limit. The turns
+        exceeding the limit are dropped before the request is sent.
+
+        Args:
+            model: The model of the chat session.
+            pending: The messages sent after the history.
+            tools: The tools sent with the request instead of the model tools.
+
+        Returns:
+            The token count of the last pending message if it was counted.
+        """
+        messages = self._messages_to_count(pending, tools)
+        if not messages:
+            return None
+        responses = model.count_tokens_many([[message] for message in messages])
+        return self._set_token_counts(messages, responses, pending)
+
+    async def count_tokens_async(
+        self,
+        model: "_GenerativeModel",
+        pending: List["Content"],
+        tools: Optional[List["Tool"]],
+    ) -> Optional[int]:
+        """Counts the tokens that cannot be derived from the next response.
+
+        Same as `count_tokens`, but counts the tokens asynchronously.
+        """
+        messages = self._messages_to_count(pending, tools)
+        if not messages:
+            return None
+        responses = await asyncio.gather(
+            *[model.count_tokens_async([message]) for message in messages]
+        )
+        return self._set_token_counts(messages, responses, pending)
+
+    def request_contents(self, pending: List["Content"]) -> "_RawContents":
+        """Returns the contents of a request sending the pending messages.
+
+        Args:
+            pending: The messages sent after the history.
+
+        Returns:
+            The raw contents of the history followed by the pending messages.
+        """
+        self._sync()
+        contents = _RawContents(self._contents_pb)
+        contents.extend(message._raw_content._pb for message in pending)
+        return contents
+
+    def token_counts_of(
+        self,
+        response: "GenerationResponse",
+        pending_token_counts: List[int],
+        tools: Optional[List["Tool"]] = None,
+        pending_token_count: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Derives the token counts of a request and its response.
+
+        Args:
+            response: The response to a request sending the history and the
+                pending messages.
+            pending_token_counts: The token counts of the pending messages sent
+                before the last one.
+            tools: The tools sent with the request instead of the model tools.
+            pending_token_count: The token count of the last pending message,
+                if it was counted before the request.
+
+        Returns:
+            The token counts of the last pending message and of the response.
+        """
+        usage_metadata = response._raw_response.usage_metadata
+        sent_tokens = self._total_tokens + sum(pending_token_counts)
+        if pending_token_count is not None:
+            # The remaining prompt tokens were sent for the system instruction
+            # and the tools.
+            self._prompt_tokens = max(
+                usage_metadata.prompt_token_count - sent_tokens - pending_token_count,
+                0,
+            )
+            self._prompt_tools = tools
+        else:
+            pending_token_count = max(
+                usage_metadata.prompt_token_count
+                - sent_tokens
+                - (self._prompt_tokens or 0),
+                0,
+            )
+        return pending_token_count, usage_metadata.candidates_token_count
+
+    def extend(self, messages: List["Content"], token_counts: List[int]) -> None:
+        """Appends a turn to the history and drops the oldest turns if needed.
+
+        Args:
+            messages: The messages of the turn.
+            token_counts: The token count of each message.
+        """
+        self._sync()
+        self.messages.extend(messages)
+        self._contents_pb.extend(message._raw_content._pb for message in messages)
+        self._token_counts.extend(token_counts)
+        self._total_tokens += sum(token_counts)
+        self._truncate(keep=len(messages))
+
+    def _truncate(self, keep: int) -> None:
+        """Drops the oldest turns exceeding the limits, except the last messages."""
+        droppable = len(self.messages) - keep
+        total_tokens = self._total_tokens
+        drop = 0
+        while drop < droppable and (
+            (
+                self._max_messages is not None
+                and len(self.messages) - drop > self._max_messages
+            )
+            or (self._max_tokens is not None and total_tokens > self._max_tokens)
+        ):
+            total_tokens -= self._token_counts[drop] or 0
+            drop += 1
+        if not drop:
+            return
+        # Only whole turns are dropped, so the history still starts with a user
+        # message that is not a function response.
+        while drop < droppable and not _is_turn_start(self._contents_pb[drop]):
+            total_tokens -= self._token_counts[drop] or 0
+            drop += 1
+        del self.messages[:drop]
+        del self._contents_pb[:drop]
+        del self._token_counts[:drop]
+        self._total_tokens = total_tokens
+
+
+def _is_turn_start(content_pb) -> bool:
+    """Returns whether a raw content starts a turn of a chat session."""
+    return content_pb.role != ChatSession._MODEL_ROLE and not any(
+        part.HasField("function_response") for part in content_pb.parts
+    )
+
+
 class ChatSession:
     """Chat session holds the chat history."""
 
@@ -754,20 +1387,26 @@ class ChatSession:
         *,
         history: Optional[List["Content"]] = None,
         response_validation: bool = True,
+        max_history_messages: Optional[int] = None,
+        max_history_tokens: Optional[int] = None,
     ):
         if history:
             if not all(isinstance(item, Content) for item in history):
                 raise ValueError("history must be a list of Content objects.")
 
         self._model = model
-        self._history = history or []
+        self._history = _ChatHistory(
+            history or [],
+            max_messages=max_history_messages,
+            max_tokens=max_history_tokens,
+        )
         self._response_validator = _validate_response if response_validation else None
         # _responder is currently only set by PreviewChatSession
         self._responder: Optional["AutomaticFunctionCallingResponder"] = None
 
     @property
     def history(self) -> List["Content"]:
-        return self._history
+        return self._history.messages
 
     def send_message(
         self,
@@ -891,6 +1530,7 @@ class ChatSession:
             _to_content(value=content, role=self._USER_ROLE)
         )
         history_delta = [request_message]
+        token_counts = []
 
         message_responder = (
             self._responder._create_responder_for_message(
@@ -901,9 +1541,12 @@ class ChatSession:
         )
 
         while True:
-            request_history = self._history + history_delta
+            pending_token_count = self._history.count_tokens(
+                self._model, history_delta, tools
+            )
+            request_history = self._history.messages + history_delta
             response = self._model._generate_content(
-                contents=request_history,
+                contents=self._history.request_contents(history_delta),
                 generation_config=generation_config,
                 safety_settings=safety_settings,
                 tools=tools,
@@ -921,6 +1564,11 @@ class ChatSession:
             # Response role is NOT set by the model.
             response_message.role = self._MODEL_ROLE
             history_delta.append(response_message)
+            token_counts.extend(
+                self._history.token_counts_of(
+                    response, token_counts, tools, pending_token_count
+                )
+            )
 
             auto_responder_content = (
                 message_responder.respond_to_model_response(response=response)
@@ -933,7 +1581,7 @@ class ChatSession:
             else:
                 break
 
-        self._history.extend(history_delta)
+        self._history.extend(history_delta, token_counts)
         return response
 
     async def _send_message_async(
@@ -967,29 +1615,61 @@ class ChatSession:
         request_message = Content._from_gapic(
             _to_content(value=content, role=self._USER_ROLE)
         )
-        request_history = list(self._history)
-        request_history.append(request_message)
+        history_delta = [request_message]
+        token_counts = []
 
-        response = await self._model._generate_content_async(
-            contents=request_history,
-            generation_config=generation_config,
-            safety_settings=safety_settings,
-            tools=tools,
+        message_responder = (
+            self._responder._create_responder_for_message(
+                tools=tools or self._model._tools
+            )
+            if self._responder
+            else None
         )
-        # By default we're not adding incomplete interactions to history.
-        if self._response_validator is not None:
-            self._response_validator(
-                response=response,
-                request_contents=request_history,
-                response_chunks=[response],
+
+        while True:
+            pending_token_count = await self._history.count_tokens_async(
+                self._model, history_delta, tools
             )
+            request_history = self._history.messages + history_delta
+            response = await self._model._generate_content_async(
+                contents=self._history.request_contents(history_delta),
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                tools=tools,
+            )
+            # By default we're not adding incomplete interactions to history.
+            if self._response_validator is not None:
+                self._response_validator(
+                    response=response,
+                    request_contents=request_history,
+                    response_chunks=[response],
+                )
 
-        # Adding the request and the first response candidate to history
-        response_message = response.candidates[0].content
-        # Response role is NOT set by the model.
-        response_message.role = self._MODEL_ROLE
-        self._history.append(request_message)
-        self._history.append(response_message)
+            # Adding the request and the first response candidate to history
+            response_message = response.candidates[0].content
+            # Response role is NOT set by the model.
+            response_message.role = self._MODEL_ROLE
+            history_delta.append(response_message)
+            token_counts.extend(
+                self._history.token_counts_of(
+                    response, token_counts, tools, pending_token_count
+                )
+            )
+
+            auto_responder_content = (
+                await message_responder.respond_to_model_response_async(
+                    response=response
+                )
+                if message_responder
+                else None
+            )
+            if auto_responder_content:
+                auto_responder_content.role = self._USER_ROLE
+                history_delta.append(auto_responder_content)
+            else:
+                break
+
+        self._history.extend(history_delta, token_counts)
         return response
 
     def _send_message_streaming(
@@ -1023,17 +1703,19 @@ class ChatSession:
         request_message = Content._from_gapic(
             _to_content(value=content, role=self._USER_ROLE)
         )
-        request_history = list(self._history)
-        request_history.append(request_message)
+        pending_token_count = self._history.count_tokens(
+            self._model, [request_message], tools
+        )
+        request_history = self._history.messages + [request_message]
 
         stream = self._model._generate_content_streaming(
-            contents=request_history,
+            contents=self._history.request_contents([request_message]),
             generation_config=generation_config,
             safety_settings=safety_settings,
             tools=tools,
         )
         chunks = []
-        full_response = None
+        accumulator = _GenerationResponseAccumulator()
         for chunk in stream:
             chunks.append(chunk)
             # By default we're not adding incomplete interactions to history.
@@ -1043,11 +1725,9 @@ class ChatSession:
                     request_contents=request_history,
                     response_chunks=chunks,
                 )
-            if full_response:
-                _append_response(full_response, chunk)
-            else:
-                full_response = chunk
+            accumulator.add(chunk)
             yield chunk
+        full_response = accumulator.response
         if not full_response:
             return
 
@@ -1055,8 +1735,12 @@ class ChatSession:
         response_message = full_response.candidates[0].content
         # Response role is NOT set by the model.
         response_message.role = self._MODEL_ROLE
-        self._history.append(request_message)
-        self._history.append(response_message)
+        self._history.extend(
+            [request_message, response_message],
+            self._history.token_counts_of(
+                full_response, [], tools, pending_token_count
+            ),
+        )
 
     async def _send_message_streaming_async(
         self,
@@ -1088,11 +1772,13 @@ class ChatSession:
         request_message = Content._from_gapic(
             _to_content(value=content, role=self._USER_ROLE)
         )
-        request_history = list(self._history)
-        request_history.append(request_message)
+        pending_token_count = await self._history.count_tokens_async(
+            self._model, [request_message], tools
+        )
+        request_history = self._history.messages + [request_message]
 
         stream = await self._model._generate_content_streaming_async(
-            contents=request_history,
+            contents=self._history.request_contents([request_message]),
             generation_config=generation_config,
             safety_settings=safety_settings,
             tools=tools,
@@ -1100,7 +1786,7 @@ class ChatSession:
 
         async def async_generator():
             chunks = []
-            full_response = None
+            accumulator = _GenerationResponseAccumulator()
             async for chunk in stream:
                 chunks.append(chunk)
                 # By default we're not adding incomplete interactions to history.
@@ -1110,19 +1796,21 @@ class ChatSession:
                         request_contents=request_history,
                         response_chunks=chunks,
                     )
-                if full_response:
-                    _append_response(full_response, chunk)
-                else:
-                    full_response = chunk
+                accumulator.add(chunk)
                 yield chunk
+            full_response = accumulator.response
             if not full_response:
                 return
             # Adding the request and the first response candidate to history
             response_message = full_response.candidates[0].content
             # Response role is NOT set by the model.
             response_message.role = self._MODEL_ROLE
-            self._history.append(request_message)
-            self._history.append(response_message)
+            self._history.extend(
+                [request_message, response_message],
+                self._history.token_counts_of(
+                    full_response, [], tools, pending_token_count
+                ),
+            )
 
         return async_generator()
 
@@ -1138,6 +1826,8 @@ class _PreviewChatSession(ChatSession):
         *,
         history: Optional[List["Content"]] = None,
         response_validation: bool = True,
+        max_history_messages: Optional[int] = None,
+        max_history_tokens: Optional[int] = None,
         # Preview features:
         responder: Optional["AutomaticFunctionCallingResponder"] = None,
         # Deprecated
@@ -1156,6 +1846,8 @@ class _PreviewChatSession(ChatSession):
             model=model,
             history=history,
             response_validation=response_validation,
+            max_history_messages=max_history_messages,
+            max_history_tokens=max_history_tokens,
         )
         self._responder = responder
 
@@ -1660,8 +2352,7 @@ class GenerationResponse:
             raise ValueError(
                 "Response has no candidates (and thus no text)."
                 " The response is likely blocked by the safety filters.\n"
-                "Response:\n"
-                + _dict_to_pretty_string(self.to_dict())
+                "Response:\n" + _dict_to_pretty_string(self.to_dict())
             )
         try:
             return self.candidates[0].text
@@ -1671,8 +2362,7 @@ class GenerationResponse:
             raise ValueError(
                 "Cannot get the response text.\n"
                 f"{e}\n"
-                "Response:\n"
-                + _dict_to_pretty_string(self.to_dict())
+                "Response:\n" + _dict_to_pretty_string(self.to_dict())
             ) from e
 
     @property
@@ -1754,8 +2444,7 @@ class Candidate:
             raise ValueError(
                 "Cannot get the Candidate text.\n"
                 f"{e}\n"
-                "Candidate:\n"
-                + _dict_to_pretty_string(self.to_dict())
+                "Candidate:\n" + _dict_to_pretty_string(self.to_dict())
             ) from e
 
     @property
@@ -1830,8 +2519,7 @@ class Content:
             raise ValueError(
                 "Response candidate content has no parts (and thus no text)."
                 " The candidate is likely blocked by the safety filters.\n"
-                "Content:\n"
-                + _dict_to_pretty_string(self.to_dict())
+                "Content:\n" + _dict_to_pretty_string(self.to_dict())
             )
         return self.parts[0].text
 
@@ -1900,7 +2588,8 @@ class Part:
 
     @staticmethod
     def from_image(image: "Image") -> "Part":
-        return Part.from_data(data=image.data, mime_type=image._mime_type)
+        # The part can be modified, so it must not share the cached part.
+        return Part._from_gapic(raw_part=copy.deepcopy(image._to_gapic_part()))
 
     @staticmethod
     def from_function_response(name: str, response: Dict[str, Any]) -> "Part":
@@ -1921,8 +2610,7 @@ class Part:
         if "text" not in self._raw_part:
             raise AttributeError(
                 "Response candidate content part has no text.\n"
-                "Part:\n"
-                + _dict_to_pretty_string(self.to_dict())
+                "Part:\n" + _dict_to_pretty_string(self.to_dict())
             )
         return self._raw_part.text
 
@@ -2023,8 +2711,7 @@ class grounding:  # pylint: disable=invalid-name
         """
 
         def __init__(self):
-            """Initializes a Google Search Retrieval tool.
-            """
+            """Initializes a Google Search Retrieval tool."""
             self._raw_google_search_retrieval = gapic_tool_types.GoogleSearchRetrieval()
 
 
@@ -2146,11 +2833,7 @@ def _to_content(
         elif isinstance(item, str):
             part = gapic_content_types.Part(text=item)
         elif isinstance(item, Image):
-            part = gapic_content_types.Part(
-                inline_data=gapic_content_types.Blob(
-                    data=item.data, mime_type=item._mime_type
-                )
-            )
+            part = item._to_gapic_part()
         elif isinstance(item, gapic_content_types.Content):
             raise TypeError(f"A list of Content objects is not supported here: {items}")
         else:
@@ -2162,94 +2845,309 @@ def _to_content(
     return gapic_content_types.Content(parts=parts, role=role)
 
 
-def _append_response(
-    base_response: GenerationResponse,
-    new_response: GenerationResponse,
-):
-    _append_gapic_response(
-        base_response=base_response._raw_response,
-        new_response=new_response._raw_response,
+def _snapshot_defaults(value: Any) -> Any:
+    """Copies the dicts and lists of model defaults, keeping the other objects.
+
+    Other objects are kept, so they still compare equal to the defaults.
+    """
+    if isinstance(value, dict):
+        return {key: _snapshot_defaults(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot_defaults(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_snapshot_defaults(item) for item in value)
+    return value
+
+
+# Token counts of recent requests, keyed by the hash of the serialized request.
+_count_tokens_cache = cache_utils.LruCache(max_size=_COUNT_TOKENS_CACHE_SIZE)
+
+
+def _count_tokens_cache_key(
+    request: gapic_prediction_service_types.CountTokensRequest,
+) -> Optional[str]:
+    """Returns the cache key of a request, or None if it must not be cached."""
+    request_pb = gapic_prediction_service_types.CountTokensRequest.pb(request)
+    # Files referenced by URI can change without the request changing.
+    if any(
+        part.HasField("file_data")
+        for content in request_pb.contents
+        for part in content.parts
+    ):
+        return None
+    # The request holds the model and the contents.
+    return cache_utils.hash_key(request_pb.SerializeToString(deterministic=True))
+
+
+def _get_cached_count_tokens_response(
+    cache_key: Optional[str],
+) -> Optional[gapic_prediction_service_types.CountTokensResponse]:
+    if cache_key is None:
+        return None
+    serialized_response = _count_tokens_cache.get(cache_key)
+    if serialized_response is None:
+        return None
+    # Callers get their own copy of the response.
+    return gapic_prediction_service_types.CountTokensResponse.deserialize(
+        serialized_response
     )
 
 
-def _append_gapic_response(
-    base_response: gapic_prediction_service_types.GenerateContentResponse,
-    new_response: gapic_prediction_service_types.GenerateContentResponse,
-):
-    for idx, candidate in enumerate(new_response.candidates):
-        if candidate.index != idx:
-            raise ValueError(
-                f"Incorrect new candidate ordering: {base_response.candidates}"
+def _cache_count_tokens_response(
+    cache_key: Optional[str],
+    response: gapic_prediction_service_types.CountTokensResponse,
+) -> None:
+    if cache_key is None:
+        return
+    _count_tokens_cache.put(
+        cache_key,
+        gapic_prediction_service_types.CountTokensResponse.serialize(response),
+    )
+
+
+class _RawContents(list):
+    """Raw protobuf contents that are copied into a request without conversion."""
+
+
+def _to_gapic_contents(
+    contents: ContentsType,
+) -> List[gapic_content_types.Content]:
+    """Converts contents of a request to a list of GAPIC Content objects."""
+    # contents can either be a list of Content objects (most generic case)
+    if isinstance(contents, Sequence) and any(
+        isinstance(c, gapic_content_types.Content) for c in contents
+    ):
+        if not all(isinstance(c, gapic_content_types.Content) for c in contents):
+            raise TypeError(
+                "When passing a list with Content objects, every item in a list must be a Content object."
+            )
+    elif isinstance(contents, Sequence) and any(
+        isinstance(c, Content) for c in contents
+    ):
+        if not all(isinstance(c, Content) for c in contents):
+            raise TypeError(
+                "When passing a list with Content objects, every item in a list must be a Content object."
+            )
+        contents = [content._raw_content for content in contents]
+    elif isinstance(contents, Sequence) and any(isinstance(c, dict) for c in contents):
+        if not all(isinstance(c, dict) for c in contents):
+            raise TypeError(
+                "When passing a list with Content dict objects, every item in a list must be a Content dict object."
+            )
+        contents = [
+            gapic_content_types.Content(content_dict) for content_dict in contents
+        ]
+    # or a value that can be converted to a *single* Content object
+    else:
+        contents = [_to_content(contents)]
+    return contents
+
+
+def _to_gapic_generation_config(
+    generation_config: Optional[GenerationConfigType],
+) -> Optional[gapic_content_types.GenerationConfig]:
+    """Converts a generation config to a GAPIC GenerationConfig."""
+    gapic_generation_config: Optional[gapic_content_types.GenerationConfig] = None
+    if generation_config:
+        if isinstance(generation_config, gapic_content_types.GenerationConfig):
+            gapic_generation_config = generation_config
+        elif isinstance(generation_config, GenerationConfig):
+            gapic_generation_config = generation_config._raw_generation_config
+        elif isinstance(generation_config, Dict):
+            gapic_generation_config = gapic_content_types.GenerationConfig(
+                **generation_config
             )
-        if idx < len(base_response.candidates):
-            if base_response.candidates[idx].index != idx:
-                raise ValueError(
-                    f"Incorrect base candidate ordering: {base_response.candidates}"
-                )
-            _append_gapic_candidate(base_response.candidates[idx], candidate)
         else:
-            if idx != len(base_response.candidates):
-                raise ValueError(
-                    f"Incorrect base candidate ordering: {base_response.candidates}"
+            raise TypeError(
+                "generation_config must either be a GenerationConfig object or a dictionary representation of it."
+            )
+    return gapic_generation_config
+
+
+def _to_gapic_safety_settings(
+    safety_settings: Optional[SafetySettingsType],
+) -> Optional[List[gapic_content_types.SafetySetting]]:
+    """Converts safety settings to a list of GAPIC SafetySetting objects."""
+    gapic_safety_settings = None
+    if safety_settings:
+        if isinstance(safety_settings, Sequence):
+            gapic_safety_settings = []
+            for safety_setting in safety_settings:
+                if isinstance(safety_setting, gapic_content_types.SafetySetting):
+                    gapic_safety_settings.append(safety_setting)
+                elif isinstance(safety_setting, SafetySetting):
+                    gapic_safety_settings.append(safety_setting._raw_safety_setting)
+                else:
+                    raise TypeError(
+                        "When passing a list with SafetySettings objects, every item in a list must be a SafetySetting object."
+                    )
+        elif isinstance(safety_settings, dict):
+            gapic_safety_settings = [
+                gapic_content_types.SafetySetting(
+                    category=gapic_content_types.HarmCategory(category),
+                    threshold=gapic_content_types.SafetySetting.HarmBlockThreshold(
+                        threshold
+                    ),
                 )
-            base_response.candidates.append(candidate)
-    # prompt_feedback is always taken from the base_response
-    # usage_metadata is always taken from the new_response
-    if new_response.usage_metadata:
-        base_response.usage_metadata = new_response.usage_metadata
-
-
-def _append_gapic_candidate(
-    base_candidate: gapic_content_types.Candidate,
-    new_candidate: gapic_content_types.Candidate,
-):
-    if base_candidate.index != new_candidate.index:
-        raise ValueError(
-            f"Incorrect candidate indexes: {base_candidate.index} != {new_candidate.index}"
-        )
+                for category, threshold in safety_settings.items()
+            ]
+        else:
+            raise TypeError(
+                "safety_settings must either be a list of SafetySettings objects or a dictionary mapping from HarmCategory to HarmBlockThreshold."
+            )
+    return gapic_safety_settings
+
+
+def _to_gapic_tools(
+    tools: Optional[List["Tool"]],
+) -> Optional[List[gapic_tool_types.Tool]]:
+    """Converts tools to a list of GAPIC Tool objects."""
+    gapic_tools = None
+    if tools:
+        gapic_tools = []
+        for tool in tools:
+            if isinstance(tool, gapic_tool_types.Tool):
+                gapic_tools.append(tool)
+            elif isinstance(tool, Tool):
+                gapic_tools.append(tool._raw_tool)
+            else:
+                raise TypeError(f"Unexpected tool type: {tool}.")
+    return gapic_tools
+
+
+def _to_gapic_tool_config(
+    tool_config: Optional["ToolConfig"],
+) -> Optional[gapic_tool_types.ToolConfig]:
+    """Converts a tool config to a GAPIC ToolConfig."""
+    gapic_tool_config = None
+    if tool_config:
+        if isinstance(tool_config, ToolConfig):
+            gapic_tool_config = tool_config._gapic_tool_config
+        else:
+            raise TypeError("tool_config must be a ToolConfig object.")
+    return gapic_tool_config
 
-    # Only merge content if it exists.
-    if "content" in new_candidate:
-        _append_gapic_content(base_candidate.content, new_candidate.content)
-
-    # For these attributes, the last value wins
-    if new_candidate.finish_reason:
-        base_candidate.finish_reason = new_candidate.finish_reason
-    if new_candidate.safety_ratings:
-        base_candidate.safety_ratings = new_candidate.safety_ratings
-    if new_candidate.finish_message:
-        base_candidate.finish_message = new_candidate.finish_message
-    if new_candidate.citation_metadata:
-        base_candidate.citation_metadata = new_candidate.citation_metadata
-
-
-def _append_gapic_content(
-    base_content: gapic_content_types.Content,
-    new_content: gapic_content_types.Content,
-):
-    # Handling empty role is a workaround for a case when service returns
-    # some chunks with missing role field (e.g. when response is blocked).
-    if new_content.role and base_content.role != new_content.role:
-        raise ValueError(
-            f"Content roles do not match: {base_content.role} != {new_content.role}"
-        )
 
-    for part_idx, part in enumerate(new_content.parts):
-        if part_idx < len(base_content.parts):
-            _append_gapic_part(base_content.parts[part_idx], part)
-        else:
-            base_content.parts.append(part)
+class _GenerationResponseAccumulator:
+    """Merges the chunks of a streamed response into a single response.
 
+    Text is buffered and joined when the merged response is materialized, so
+    merging a stream takes time linear in its length. Chunks are merged as
+    follows: text parts are concatenated and other parts are replaced by the
+    latest one, the finish reason, safety ratings, finish message and citation
+    metadata of a candidate are taken from the latest chunk setting them, the
+    usage metadata is taken from the latest chunk and the prompt feedback from
+    the first one.
+    """
 
-def _append_gapic_part(
-    base_part: gapic_content_types.Part,
-    new_part: gapic_content_types.Part,
-):
-    # Text is appended. For other cases, new wins.
-    if new_part.text:
-        base_part.text += new_part.text
-    else:
-        base_part._pb = copy.deepcopy(new_part._pb)
+    def __init__(self):
+        self._response_pb = None
+        # Text to append to each part, indexed by candidate and part index.
+        self._pending_texts: List[List[List[str]]] = []
+
+    def add(self, response: GenerationResponse) -> None:
+        """Merges a chunk into the accumulated response.
+
+        Args:
+            response: The next chunk of the stream.
+
+        Raises:
+            ValueError: If candidates are out of order or content roles mismatch.
+        """
+        new_response_pb = response._raw_response._pb
+        if self._response_pb is None:
+            self._response_pb = type(new_response_pb)()
+            self._response_pb.CopyFrom(new_response_pb)
+            self._pending_texts = [
+                [[] for _ in candidate.content.parts]
+                for candidate in self._response_pb.candidates
+            ]
+            return
+
+        base_candidates = self._response_pb.candidates
+        for idx, candidate in enumerate(new_response_pb.candidates):
+            if candidate.index != idx:
+                raise ValueError(
+                    f"Incorrect new candidate ordering: {self._materialize()}"
+                )
+            if idx < len(base_candidates):
+                if base_candidates[idx].index != idx:
+                    raise ValueError(
+                        f"Incorrect base candidate ordering: {self._materialize()}"
+                    )
+                self._add_candidate(idx, candidate)
+            else:
+                if idx != len(base_candidates):
+                    raise ValueError(
+                        f"Incorrect base candidate ordering: {self._materialize()}"
+                    )
+                base_candidates.add().CopyFrom(candidate)
+                self._pending_texts.append([[] for _ in candidate.content.parts])
+        if new_response_pb.usage_metadata.ByteSize():
+            self._response_pb.usage_metadata.CopyFrom(new_response_pb.usage_metadata)
+
+    def _add_candidate(self, idx: int, candidate) -> None:
+        """Merges a candidate into the accumulated candidate with the same index."""
+        base_candidate = self._response_pb.candidates[idx]
+        pending_texts = self._pending_texts[idx]
+
+        # Only merge content if it exists.
+        if candidate.HasField("content"):
+            content = candidate.content
+            # Handling empty role is a workaround for a case when service returns
+            # some chunks with missing role field (e.g. when response is blocked).
+            if content.role and base_candidate.content.role != content.role:
+                raise ValueError(
+                    "Content roles do not match: "
+                    f"{base_candidate.content.role} != {content.role}"
+                )
+            base_parts = base_candidate.content.parts
+            for part_idx, part in enumerate(content.parts):
+                if part_idx < len(base_parts):
+                    # Text is appended. For other cases, new wins.
+                    if part.text:
+                        pending_texts[part_idx].append(part.text)
+                    else:
+                        pending_texts[part_idx].clear()
+                        base_parts[part_idx].CopyFrom(part)
+                else:
+                    base_parts.add().CopyFrom(part)
+                    pending_texts.append([])
+
+        # For these attributes, the last value wins
+        if candidate.finish_reason:
+            base_candidate.finish_reason = candidate.finish_reason
+        if candidate.safety_ratings:
+            del base_candidate.safety_ratings[:]
+            base_candidate.safety_ratings.extend(candidate.safety_ratings)
+        if candidate.finish_message:
+            base_candidate.finish_message = candidate.finish_message
+        if candidate.citation_metadata.ByteSize():
+            base_candidate.citation_metadata.CopyFrom(candidate.citation_metadata)
+
+    def _materialize(self):
+        """Joins the buffered text into the accumulated response and returns it."""
+        for candidate, pending_texts in zip(
+            self._response_pb.candidates, self._pending_texts
+        ):
+            for part, texts in zip(candidate.content.parts, pending_texts):
+                if texts:
+                    part.text = part.text + "".join(texts)
+                    texts.clear()
+        return self._response_pb
+
+    @property
+    def response(self) -> Optional[GenerationResponse]:
+        """The merged response of the chunks added so far, or None if there are none.
+
+        Each access returns a new response object that is not updated by
+        chunks added later.
+        """
+        if self._response_pb is None:
+            return None
+        raw_response = gapic_prediction_service_types.GenerateContentResponse()
+        raw_response._pb.CopyFrom(self._materialize())
+        return GenerationResponse._from_gapic(raw_response=raw_response)
 
 
 def _proto_to_dict(message) -> Dict[str, Any]:
@@ -2276,8 +3174,11 @@ _FORMAT_TO_MIME_TYPE = {
 class Image:
     """The image that can be sent to a generative model."""
 
-    _image_bytes: bytes
+    _loaded_bytes: Optional[bytes] = None
     _loaded_image: Optional["PIL_Image.Image"] = None
+    # Encodings cached until the image bytes are replaced.
+    _sniffed_mime_type: Optional[str] = None
+    _raw_part: Optional[gapic_content_types.Part] = None
 
     @staticmethod
     def load_from_file(location: str) -> "Image":
@@ -2308,6 +3209,17 @@ class Image:
         image._image_bytes = data
         return image
 
+    @property
+    def _image_bytes(self) -> bytes:
+        return self._loaded_bytes
+
+    @_image_bytes.setter
+    def _image_bytes(self, value: bytes):
+        self._loaded_bytes = value
+        self._loaded_image = None
+        self._sniffed_mime_type = None
+        self._raw_part = None
+
     @property
     def _pil_image(self) -> "PIL_Image.Image":
         if self._loaded_image is None:
@@ -2321,11 +3233,32 @@ class Image:
     @property
     def _mime_type(self) -> str:
         """Returns the MIME type of the image."""
-        if PIL_Image:
-            return _FORMAT_TO_MIME_TYPE[self._pil_image.format.lower()]
-        else:
-            # Fall back to jpeg
-            return "image/jpeg"
+        if self._sniffed_mime_type is None:
+            # The file signature is enough for common formats, PIL is only
+            # needed for the others.
+            mime_type = _image_utils.sniff_mime_type(
+                self._image_bytes[: _image_utils.HEADER_SIZE]
+            )
+            if mime_type:
+                self._sniffed_mime_type = mime_type
+            elif PIL_Image:
+                self._sniffed_mime_type = _FORMAT_TO_MIME_TYPE[
+                    self._pil_image.format.lower()
+                ]
+            else:
+                # Fall back to jpeg
+                self._sniffed_mime_type = "image/jpeg"
+        return self._sniffed_mime_type
+
+    def _to_gapic_part(self) -> gapic_content_types.Part:
+        """Returns the inline data part of the image, built once per image."""
+        if self._raw_part is None:
+            self._raw_part = gapic_content_types.Part(
+                inline_data=gapic_content_types.Blob(
+                    data=self._image_bytes, mime_type=self._mime_type
+                )
+            )
+        return self._raw_part
 
     @property
     def data(self) -> bytes:
@@ -2339,20 +3272,40 @@ class Image:
 class AutomaticFunctionCallingResponder:
     """Responder that automatically responds to model's function calls."""
 
-    def __init__(self, max_automatic_function_calls: int = 1):
+    def __init__(
+        self,
+        max_automatic_function_calls: int = 1,
+        *,
+        max_parallel_function_calls: int = 1,
+        function_call_timeout: Optional[float] = None,
+    ):
         """Initializes the responder.
 
         Args:
             max_automatic_function_calls: Maximum number of automatic function calls.
+            max_parallel_function_calls: Maximum number of function calls of a
+                model response that run concurrently. Functions run on a thread
+                pool, or as coroutines when sending messages asynchronously.
+            function_call_timeout: The time in seconds to wait for the result of
+                each function call. Functions running on a thread are not
+                interrupted when the timeout expires.
         """
         if not (max_automatic_function_calls > 0):
             raise ValueError("max_automatic_function_calls must be positive.")
+        if not (max_parallel_function_calls > 0):
+            raise ValueError("max_parallel_function_calls must be positive.")
+        if function_call_timeout is not None and not (function_call_timeout > 0):
+            raise ValueError("function_call_timeout must be positive.")
         self._max_automatic_function_calls = max_automatic_function_calls
+        self._max_parallel_function_calls = max_parallel_function_calls
+        self._function_call_timeout = function_call_timeout
 
     def _create_responder_for_message(self, tools: List[Tool]) -> "_MessageResponder":
         return AutomaticFunctionCallingResponder._MessageResponder(
             tools=tools,
             max_automatic_function_calls=self._max_automatic_function_calls,
+            max_parallel_function_calls=self._max_parallel_function_calls,
+            function_call_timeout=self._function_call_timeout,
         )
 
     class _MessageResponder:
@@ -2363,11 +3316,51 @@ class AutomaticFunctionCallingResponder:
             *,
             tools: List[Tool],
             max_automatic_function_calls: int = 1,
+            max_parallel_function_calls: int = 1,
+            function_call_timeout: Optional[float] = None,
             **_,
         ):
             self._tools = tools
             self._max_automatic_function_calls = max_automatic_function_calls
             self._remaining_function_calls = max_automatic_function_calls
+            self._max_parallel_function_calls = max_parallel_function_calls
+            self._function_call_timeout = function_call_timeout
+            # Index of the callable functions of all tools by name.
+            self._callable_functions: Dict[str, "CallableFunctionDeclaration"] = {}
+            self._duplicate_functions: Dict[str, str] = {}
+            for tool in tools or []:
+                for name, callable_function in tool._callable_functions.items():
+                    if name in self._callable_functions:
+                        self._duplicate_functions[name] = (
+                            "Multiple functions with the same name are not supported."
+                            f" Found {self._callable_functions[name]} and {callable_function}."
+                        )
+                    self._callable_functions[name] = callable_function
+
+        def _get_function_calls(
+            self, response: "GenerationResponse"
+        ) -> List[Tuple[gapic_tool_types.FunctionCall, "CallableFunctionDeclaration"]]:
+            """Returns the function calls of a response and the functions to call."""
+            function_calls = response.candidates[0].function_calls
+            calls = []
+            for function_call in function_calls:
+                if self._remaining_function_calls > 0:
+                    self._remaining_function_calls -= 1
+                else:
+                    raise RuntimeError(
+                        f"Exceeded the maximum number of automatic function calls ({self._max_automatic_function_calls})."
+                        " If more automatic function calls are needed, set `max_automatic_function_calls` to a higher number."
+                        f" The last function calls: {function_calls}"
+                    )
+                if function_call.name in self._duplicate_functions:
+                    raise ValueError(self._duplicate_functions[function_call.name])
+                callable_function = self._callable_functions.get(function_call.name)
+                if not callable_function:
+                    raise RuntimeError(
+                        f"""Model has asked to call function "{function_call.name}" which was not found."""
+                    )
+                calls.append((function_call, callable_function))
+            return calls
 
         def respond_to_model_response(
             self,
@@ -2383,53 +3376,152 @@ class AutomaticFunctionCallingResponder:
             Returns:
                 Optional response to model's response.
             """
-            chosen_candidate = response.candidates[0]
-            function_calls = chosen_candidate.function_calls
-            if not function_calls:
+            calls = self._get_function_calls(response)
+            if not calls:
                 return None
-            tools = self._tools or self._model._tools
-            function_response_parts = []
-            for function_call in function_calls:
-                if self._remaining_function_calls > 0:
-                    self._remaining_function_calls -= 1
-                else:
-                    raise RuntimeError(
-                        f"Exceeded the maximum number of automatic function calls ({self._max_automatic_function_calls})."
-                        " If more automatic function calls are needed, set `max_automatic_function_calls` to a higher number."
-                        f" The last function calls: {function_calls}"
-                    )
-                callable_function = None
-                for tool in tools:
-                    new_callable_function = tool._callable_functions.get(function_call.name)
-                    if new_callable_function and callable_function:
-                        raise ValueError(
-                            "Multiple functions with the same name are not supported."
-                            f" Found {callable_function} and {new_callable_function}."
+            if (
+                self._max_parallel_function_calls == 1
+                and self._function_call_timeout is None
+            ):
+                results = [
+                    _call_function(function_call, callable_function)
+                    for function_call, callable_function in calls
+                ]
+            else:
+                executor = futures.ThreadPoolExecutor(
+                    max_workers=min(len(calls), self._max_parallel_function_calls),
+                    thread_name_prefix="function_call",
+                )
+                try:
+                    submitted = [
+                        executor.submit(
+                            _call_function, function_call, callable_function
                         )
-                    callable_function = new_callable_function
-                if not callable_function:
-                    raise RuntimeError(
-                        f"""Model has asked to call function "{function_call.name}" which was not found."""
+                        for function_call, callable_function in calls
+                    ]
+                    results = [
+                        _get_function_call_result(
+                            future, function_call, self._function_call_timeout
+                        )
+                        for (function_call, _), future in zip(calls, submitted)
+                    ]
+                finally:
+                    executor.shutdown(wait=False)
+            return _to_function_response_content(calls, results)
+
+        async def respond_to_model_response_async(
+            self,
+            *,
+            response: "GenerationResponse",
+            **_,
+        ) -> Optional["Content"]:
+            """Responds to model's response asynchronously.
+
+            Coroutine functions are awaited, other functions run on the default
+            executor of the event loop.
+
+            Args:
+                response: Model's response that can be auto-responded.
+
+            Returns:
+                Optional response to model's response.
+            """
+            calls = self._get_function_calls(response)
+            if not calls:
+                return None
+            semaphore = asyncio.Semaphore(self._max_parallel_function_calls)
+
+            async def call_function(function_call, callable_function):
+                async with semaphore:
+                    return await _call_function_async(
+                        function_call,
+                        callable_function,
+                        self._function_call_timeout,
                     )
 
-                try:
-                    # We cannot use `function_args = type(function_call.args).to_dict(function_call.args)`
-                    # due to: AttributeError: type object 'MapComposite' has no attribute 'to_dict'
-                    function_args = type(function_call).to_dict(function_call)["args"]
-                    function_call_result = callable_function._function(**function_args)
-                except Exception as ex:
-                    raise RuntimeError(
-                        f"""Error raised when calling function "{function_call.name}" as requested by the model."""
-                    ) from ex
-                function_response_part = Part.from_function_response(
-                    name=function_call.name,
-                    response=function_call_result,
+            results = await asyncio.gather(
+                *(
+                    call_function(function_call, callable_function)
+                    for function_call, callable_function in calls
                 )
-                function_response_parts.append(function_response_part)
-            function_response_content = Content(
-                parts=function_response_parts,
             )
-            return function_response_content
+            return _to_function_response_content(calls, results)
+
+
+def _function_call_args(function_call: gapic_tool_types.FunctionCall) -> Dict[str, Any]:
+    # We cannot use `function_args = type(function_call.args).to_dict(function_call.args)`
+    # due to: AttributeError: type object 'MapComposite' has no attribute 'to_dict'
+    return type(function_call).to_dict(function_call)["args"]
+
+
+def _call_function(
+    function_call: gapic_tool_types.FunctionCall,
+    callable_function: "CallableFunctionDeclaration",
+) -> Any:
+    """Calls the function requested by the model."""
+    try:
+        return callable_function._function(**_function_call_args(function_call))
+    except Exception as ex:
+        raise RuntimeError(
+            f"""Error raised when calling function "{function_call.name}" as requested by the model."""
+        ) from ex
+
+
+def _get_function_call_result(
+    future: futures.Future,
+    function_call: gapic_tool_types.FunctionCall,
+    timeout: Optional[float],
+) -> Any:
+    """Waits for the result of a function call running on a thread pool."""
+    try:
+        return future.result(timeout=timeout)
+    except futures.TimeoutError as ex:
+        raise RuntimeError(
+            f"""Function "{function_call.name}" requested by the model did not return within {timeout} seconds."""
+        ) from ex
+
+
+async def _call_function_async(
+    function_call: gapic_tool_types.FunctionCall,
+    callable_function: "CallableFunctionDeclaration",
+    timeout: Optional[float],
+) -> Any:
+    """Calls the function requested by the model asynchronously."""
+    function = callable_function._function
+    try:
+        function_args = _function_call_args(function_call)
+        if inspect.iscoroutinefunction(function):
+            call = function(**function_args)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(function, **function_args)
+            )
+        return await asyncio.wait_for(call, timeout=timeout)
+    except asyncio.TimeoutError as ex:
+        raise RuntimeError(
+            f"""Function "{function_call.name}" requested by the model did not return within {timeout} seconds."""
+        ) from ex
+    except Exception as ex:
+        raise RuntimeError(
+            f"""Error raised when calling function "{function_call.name}" as requested by the model."""
+        ) from ex
+
+
+def _to_function_response_content(
+    calls: List[Tuple[gapic_tool_types.FunctionCall, "CallableFunctionDeclaration"]],
+    results: List[Any],
+) -> "Content":
+    """Builds the content responding to function calls, in the order of the calls."""
+    function_response_parts = [
+        Part.from_function_response(
+            name=function_call.name,
+            response=function_call_result,
+        )
+        for (function_call, _), function_call_result in zip(calls, results)
+    ]
+    return Content(
+        parts=function_response_parts,
+    )
 
 
 class GenerativeModel(_GenerativeModel):
@@ -2445,6 +3537,8 @@ class _PreviewGenerativeModel(_GenerativeModel):
         *,
         history: Optional[List["Content"]] = None,
         response_validation: bool = True,
+        max_history_messages: Optional[int] = None,
+        max_history_tokens: Optional[int] = None,
         # Preview features:
         responder: Optional["AutomaticFunctionCallingResponder"] = None,
     ) -> "ChatSession":
@@ -2460,6 +3554,13 @@ class _PreviewGenerativeModel(_GenerativeModel):
                 accumulate the request and response messages even if the
                 response if blocked or incomplete. This can result in an unusable
                 chat session state.
+            max_history_messages: The maximum number of messages kept in the
+                chat session history. The oldest turns are dropped first.
+            max_history_tokens: The maximum number of tokens kept in the chat
+                session history, as reported by the usage metadata of the
+                responses. The tokens of messages that are not known from the
+                responses, like those of the initial history, are counted with
+                `count_tokens`. The oldest turns are dropped first.
             responder: An responder object that can automatically respond to
                 some model messages. Supported responder classes:
                 `AutomaticFunctionCallingResponder`.
@@ -2471,5 +3572,7 @@ class _PreviewGenerativeModel(_GenerativeModel):
             model=self,
             history=history,
             response_validation=response_validation,
+            max_history_messages=max_history_messages,
+            max_history_tokens=max_history_tokens,
             responder=responder,
         )
@@ -14,6 +14,7 @@
 #
 """Classes for working with language models."""
 
+from google.cloud.aiplatform.utils.cache_utils import EmbeddingCache
 from vertexai.language_models._language_models import (
     ChatMessage,
     ChatModel,
@@ -37,6 +38,7 @@ __all__ = [
     "CodeChatModel",
     "CodeChatSession",
     "CodeGenerationModel",
+    "EmbeddingCache",
     "InputOutputTextPair",
     "TextEmbedding",
     "TextEmbeddingInput",
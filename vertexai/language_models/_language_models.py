@@ -15,8 +15,11 @@
 """Classes for working with language models."""
 
 import abc
+import concurrent.futures
+import copy
 import dataclasses
 import collections.abc
+import itertools
 from typing import (
     Any,
     AsyncIterator,
@@ -27,6 +30,7 @@ from typing import (
     Optional,
     Sequence,
     Tuple,
+    TYPE_CHECKING,
     Union,
 )
 import warnings
@@ -37,6 +41,7 @@ from google.cloud.aiplatform import base
 from google.cloud.aiplatform import initializer as aiplatform_initializer
 from google.cloud.aiplatform import utils as aiplatform_utils
 from google.cloud.aiplatform.compat import types as aiplatform_types
+from google.cloud.aiplatform.utils import cache_utils
 from google.cloud.aiplatform.utils import gcs_utils
 from vertexai._model_garden import _model_garden_models
 from vertexai.language_models import (
@@ -48,6 +53,9 @@ try:
 except ImportError:
     pandas = None
 
+if TYPE_CHECKING:
+    import numpy
+
 
 _LOGGER = base.Logger(__name__)
 
@@ -61,6 +69,11 @@ _DEFAULT_RLHF_TUNING_PIPELINE_URI = "https://us-kfp.pkg.dev/ml-pipeline/google-c
 _ACCELERATOR_TYPES = ["TPU", "GPU"]
 _ACCELERATOR_TYPE_TYPE = Literal["TPU", "GPU"]
 
+_COUNT_TOKENS_CACHE_SIZE = 1024
+_DEFAULT_COUNT_TOKENS_MAX_CONCURRENCY = 8
+
+_DEFAULT_EMBEDDING_MAX_CONCURRENCY = 8
+
 
 def _get_model_id_from_tuning_model_id(tuning_model_id: str) -> str:
     """Gets the base model ID for the model ID labels used the tuned models.
@@ -980,31 +993,48 @@ class _CountTokensMixin(_LanguageModel):
     def count_tokens(
         self,
         prompts: List[str],
+        *,
+        use_cache: bool = True,
     ) -> CountTokensResponse:
         """Counts the tokens and billable characters for a given prompt.
 
         Note: this does not make a prediction request to the model, it only counts the tokens
         in the request.
 
+        Token counts are cached on the client, keyed by the model and the
+        prompts.
+
         Args:
             prompts (List[str]):
                 Required. A list of prompts to ask the model. For example: ["What should I do today?", "How's it going?"]
+            use_cache (bool):
+                Optional. Whether to use the client-side cache of token counts.
 
         Returns:
             A `CountTokensResponse` object that contains the number of tokens
             in the text and the number of billable characters.
         """
-        instances = []
+        cache_key = cache_utils.hash_key(self._endpoint_name, *prompts)
+        count_tokens_response = None
+        if use_cache:
+            count_tokens_response = _count_tokens_cache.get(cache_key)
+        if count_tokens_response is not None:
+            # Callers get their own copy of the cached response.
+            count_tokens_response = copy.deepcopy(count_tokens_response)
+        else:
+            instances = []
 
-        for prompt in prompts:
-            instances.append({"content": prompt})
+            for prompt in prompts:
+                instances.append({"content": prompt})
 
-        count_tokens_response = self._endpoint._prediction_client.select_version(
-            "v1beta1"
-        ).count_tokens(
-            endpoint=self._endpoint_name,
-            instances=instances,
-        )
+            count_tokens_response = self._endpoint._prediction_client.select_version(
+                "v1beta1"
+            ).count_tokens(
+                endpoint=self._endpoint_name,
+                instances=instances,
+            )
+            if use_cache:
+                _count_tokens_cache.put(cache_key, copy.deepcopy(count_tokens_response))
 
         return CountTokensResponse(
             total_tokens=count_tokens_response.total_tokens,
@@ -1012,6 +1042,67 @@ class _CountTokensMixin(_LanguageModel):
             _count_tokens_response=count_tokens_response,
         )
 
+    def count_tokens_many(
+        self,
+        prompts_list: Sequence[List[str]],
+        *,
+        max_concurrency: int = _DEFAULT_COUNT_TOKENS_MAX_CONCURRENCY,
+        use_cache: bool = True,
+    ) -> List[CountTokensResponse]:
+        """Counts the tokens and billable characters of several lists of prompts.
+
+        Token counts are cached like those of `count_tokens`. Identical lists
+        of prompts are counted once and the lists missing from the cache are
+        counted concurrently.
+
+        Args:
+            prompts_list (Sequence[List[str]]):
+                Required. The lists of prompts to count tokens of. Each list is
+                counted like the `prompts` argument of `count_tokens`.
+            max_concurrency (int):
+                Optional. The maximum number of concurrent requests.
+            use_cache (bool):
+                Optional. Whether to use the client-side cache of token counts.
+
+        Returns:
+            A `CountTokensResponse` object for each list of prompts, in the
+            same order.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        unique_prompts = {}
+        for prompts in prompts_list:
+            unique_prompts.setdefault(tuple(prompts), list(prompts))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max(len(unique_prompts), 1), max_concurrency)
+        ) as executor:
+            responses = dict(
+                zip(
+                    unique_prompts,
+                    executor.map(
+                        lambda prompts: self.count_tokens(prompts, use_cache=use_cache),
+                        unique_prompts.values(),
+                    ),
+                )
+            )
+
+        results = []
+        returned = set()
+        for prompts in prompts_list:
+            key = tuple(prompts)
+            response = responses[key]
+            if key in returned:
+                # Repeated prompts get their own copy of the response.
+                response = copy.deepcopy(response)
+            returned.add(key)
+            results.append(response)
+        return results
+
+
+# Token counts of recent requests, keyed by the hash of the endpoint and prompts.
+_count_tokens_cache = cache_utils.LruCache(max_size=_COUNT_TOKENS_CACHE_SIZE)
+
 
 @dataclasses.dataclass
 class TuningEvaluationSpec:
@@ -1509,6 +1600,7 @@ class _TextGenerationModel(_LanguageModel):
         presence_penalty: Optional[float] = None,
         frequency_penalty: Optional[float] = None,
         logit_bias: Optional[Dict[int, float]] = None,
+        buffer_size: Optional[int] = None,
     ) -> Iterator[TextGenerationResponse]:
         """Gets a streaming model response for a single prompt.
 
@@ -1541,6 +1633,10 @@ class _TextGenerationModel(_LanguageModel):
                 Larger positive bias increases the probability of choosing the token.
                 Smaller negative bias decreases the probability of choosing the token.
                 Range: [-100.0, 100.0]
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -1567,6 +1663,7 @@ class _TextGenerationModel(_LanguageModel):
             endpoint_name=self._endpoint_name,
             instance=prediction_request.instance,
             parameters=prediction_request.parameters,
+            buffer_size=buffer_size,
         ):
             prediction_obj = aiplatform.models.Prediction(
                 predictions=[prediction_dict],
@@ -1587,6 +1684,7 @@ class _TextGenerationModel(_LanguageModel):
         presence_penalty: Optional[float] = None,
         frequency_penalty: Optional[float] = None,
         logit_bias: Optional[Dict[int, float]] = None,
+        buffer_size: Optional[int] = None,
     ) -> AsyncIterator[TextGenerationResponse]:
         """Asynchronously gets a streaming model response for a single prompt.
 
@@ -1619,6 +1717,10 @@ class _TextGenerationModel(_LanguageModel):
                 Larger positive bias increases the probability of choosing the token.
                 Smaller negative bias decreases the probability of choosing the token.
                 Range: [-100.0, 100.0]
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -1638,17 +1740,21 @@ class _TextGenerationModel(_LanguageModel):
         )
 
         prediction_service_async_client = self._endpoint._prediction_async_client
-        async for prediction_dict in _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
-            prediction_service_async_client=prediction_service_async_client,
-            endpoint_name=self._endpoint_name,
-            instance=prediction_request.instance,
-            parameters=prediction_request.parameters,
-        ):
-            prediction_obj = aiplatform.models.Prediction(
-                predictions=[prediction_dict],
-                deployed_model_id="",
+        async with _streaming_prediction.aclosing(
+            _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
+                prediction_service_async_client=prediction_service_async_client,
+                endpoint_name=self._endpoint_name,
+                instance=prediction_request.instance,
+                parameters=prediction_request.parameters,
+                buffer_size=buffer_size,
             )
-            yield _parse_text_generation_model_response(prediction_obj)
+        ) as prediction_dicts:
+            async for prediction_dict in prediction_dicts:
+                prediction_obj = aiplatform.models.Prediction(
+                    predictions=[prediction_dict],
+                    deployed_model_id="",
+                )
+                yield _parse_text_generation_model_response(prediction_obj)
 
 
 def _create_text_generation_prediction_request(
@@ -2079,6 +2185,9 @@ class _TextEmbeddingModel(_LanguageModel):
         "gs://google-cloud-aiplatform/schema/predict/instance/text_embedding_1.0.0.yaml"
     )
 
+    # The maximum number of instances of a text embedding request.
+    _MAX_BATCH_SIZE = 250
+
     def _prepare_text_embedding_request(
         self,
         texts: List[Union[str, TextEmbeddingInput]],
@@ -2125,34 +2234,79 @@ class _TextEmbeddingModel(_LanguageModel):
         *,
         auto_truncate: bool = True,
         output_dimensionality: Optional[int] = None,
-    ) -> List["TextEmbedding"]:
+        batch_size: Optional[int] = None,
+        max_concurrency: int = _DEFAULT_EMBEDDING_MAX_CONCURRENCY,
+        return_numpy: bool = False,
+        cache: Optional[cache_utils.EmbeddingCache] = None,
+    ) -> Union[List["TextEmbedding"], "numpy.ndarray"]:
         """Calculates embeddings for the given texts.
 
+        Texts are split into batches of at most `batch_size` texts, which are
+        sent as concurrent requests.
+
         Args:
             texts: A list of texts or `TextEmbeddingInput` objects to embed.
             auto_truncate: Whether to automatically truncate long texts. Default: True.
             output_dimensionality: Optional dimensions of embeddings. Range: [1, 768]. Default: None.
+            batch_size: The maximum number of texts embedded by one request.
+                Default: the maximum number of instances supported by the service.
+            max_concurrency: The maximum number of requests in flight. Default: 8.
+            return_numpy: Whether to return the embeddings as a single float32
+                NumPy array with one row per text. Default: False.
+            cache: Optional cache of embeddings. Only the texts missing from
+                the cache are sent to the model.
 
         Returns:
-            A list of `TextEmbedding` objects.
+            A list of `TextEmbedding` objects, or a NumPy array if
+            `return_numpy` is True.
         """
         prediction_request = self._prepare_text_embedding_request(
             texts=texts,
             auto_truncate=auto_truncate,
             output_dimensionality=output_dimensionality,
         )
+        batch_size = batch_size or self._MAX_BATCH_SIZE
+        instances = prediction_request.instances
+        if cache is not None:
+            cache_keys = [
+                cache_utils.embedding_cache_key(
+                    self._endpoint_name, instance, prediction_request.parameters
+                )
+                for instance in instances
+            ]
+            cached_predictions = cache.get_many(cache_keys)
+            missing_instances = {
+                cache_key: instance
+                for cache_key, instance in zip(cache_keys, instances)
+                if cache_key not in cached_predictions
+            }
+            instances = list(missing_instances.values())
+
+        prediction_response = None
+        if len(instances) > batch_size:
+            prediction_response = self._endpoint.predict_many(
+                instances=instances,
+                shard_size=batch_size,
+                max_concurrency=max_concurrency,
+                parameters=prediction_request.parameters,
+            )
+        elif instances or cache is None:
+            prediction_response = self._endpoint.predict(
+                instances=instances,
+                parameters=prediction_request.parameters,
+            )
 
-        prediction_response = self._endpoint.predict(
-            instances=prediction_request.instances,
-            parameters=prediction_request.parameters,
-        )
-
-        return [
-            TextEmbedding._parse_text_embedding_response(
-                prediction_response, i_prediction
+        if cache is not None:
+            prediction_response = _merge_cached_predictions(
+                cache=cache,
+                cache_keys=cache_keys,
+                cached_predictions=cached_predictions,
+                missing_keys=list(missing_instances),
+                prediction_response=prediction_response,
             )
-            for i_prediction, _ in enumerate(prediction_response.predictions)
-        ]
+        return _parse_text_embedding_predictions(
+            prediction_response, return_numpy=return_numpy
+        )
 
     async def get_embeddings_async(
         self,
@@ -2160,28 +2314,129 @@ class _TextEmbeddingModel(_LanguageModel):
         *,
         auto_truncate: bool = True,
         output_dimensionality: Optional[int] = None,
-    ) -> List["TextEmbedding"]:
+        batch_size: Optional[int] = None,
+        max_concurrency: int = _DEFAULT_EMBEDDING_MAX_CONCURRENCY,
+        return_numpy: bool = False,
+        cache: Optional[cache_utils.EmbeddingCache] = None,
+    ) -> Union[List["TextEmbedding"], "numpy.ndarray"]:
         """Asynchronously calculates embeddings for the given texts.
 
+        Texts are split into batches of at most `batch_size` texts, which are
+        sent as concurrent requests.
+
         Args:
             texts: A list of texts or `TextEmbeddingInput` objects to embed.
             auto_truncate: Whether to automatically truncate long texts. Default: True.
             output_dimensionality: Optional dimensions of embeddings. Range: [1, 768]. Default: None.
+            batch_size: The maximum number of texts embedded by one request.
+                Default: the maximum number of instances supported by the service.
+            max_concurrency: The maximum number of requests in flight. Default: 8.
+            return_numpy: Whether to return the embeddings as a single float32
+                NumPy array with one row per text. Default: False.
+            cache: Optional cache of embeddings. Only the texts missing from
+                the cache are sent to the model.
 
         Returns:
-            A list of `TextEmbedding` objects.
+            A list of `TextEmbedding` objects, or a NumPy array if
+            `return_numpy` is True.
         """
         prediction_request = self._prepare_text_embedding_request(
             texts=texts,
             auto_truncate=auto_truncate,
             output_dimensionality=output_dimensionality,
         )
+        batch_size = batch_size or self._MAX_BATCH_SIZE
+        instances = prediction_request.instances
+        if cache is not None:
+            cache_keys = [
+                cache_utils.embedding_cache_key(
+                    self._endpoint_name, instance, prediction_request.parameters
+                )
+                for instance in instances
+            ]
+            cached_predictions = cache.get_many(cache_keys)
+            missing_instances = {
+                cache_key: instance
+                for cache_key, instance in zip(cache_keys, instances)
+                if cache_key not in cached_predictions
+            }
+            instances = list(missing_instances.values())
+
+        prediction_response = None
+        if len(instances) > batch_size:
+            prediction_response = await self._endpoint.predict_many_async(
+                instances=instances,
+                shard_size=batch_size,
+                max_concurrency=max_concurrency,
+                parameters=prediction_request.parameters,
+            )
+        elif instances or cache is None:
+            prediction_response = await self._endpoint.predict_async(
+                instances=instances,
+                parameters=prediction_request.parameters,
+            )
 
-        prediction_response = await self._endpoint.predict_async(
-            instances=prediction_request.instances,
-            parameters=prediction_request.parameters,
+        if cache is not None:
+            prediction_response = _merge_cached_predictions(
+                cache=cache,
+                cache_keys=cache_keys,
+                cached_predictions=cached_predictions,
+                missing_keys=list(missing_instances),
+                prediction_response=prediction_response,
+            )
+        return _parse_text_embedding_predictions(
+            prediction_response, return_numpy=return_numpy
         )
 
+
+def _merge_cached_predictions(
+    *,
+    cache: cache_utils.EmbeddingCache,
+    cache_keys: List[str],
+    cached_predictions: Dict[str, Any],
+    missing_keys: List[str],
+    prediction_response: Optional[aiplatform.models.Prediction],
+) -> aiplatform.models.Prediction:
+    """Caches new predictions and merges them with the cached ones.
+
+    Args:
+        cache: The embedding cache.
+        cache_keys: The cache keys of all instances, in order.
+        cached_predictions: The cached predictions by key.
+        missing_keys: The cache keys of the instances that were sent.
+        prediction_response: The prediction of the instances that were sent,
+            if any.
+
+    Returns:
+        A prediction with the predictions of all instances, in order.
+    """
+    if prediction_response is None:
+        prediction_response = aiplatform.models.Prediction(
+            predictions=[], deployed_model_id=""
+        )
+    new_predictions = dict(zip(missing_keys, prediction_response.predictions))
+    cache.put_many(new_predictions)
+    cached_predictions.update(new_predictions)
+    return prediction_response._replace(
+        predictions=[cached_predictions[cache_key] for cache_key in cache_keys]
+    )
+
+
+def _parse_text_embedding_predictions(
+    prediction_response: aiplatform.models.Prediction,
+    return_numpy: bool = False,
+) -> Union[List["TextEmbedding"], "numpy.ndarray"]:
+    """Parses the embeddings of a text embedding prediction.
+
+    Args:
+        prediction_response: `aiplatform.models.Prediction` object.
+        return_numpy: Whether to return the embeddings as a float32 NumPy array.
+
+    Returns:
+        A list of `TextEmbedding` objects, or a NumPy array with one row per
+        embedding if `return_numpy` is True.
+    """
+    if not return_numpy:
         return [
             TextEmbedding._parse_text_embedding_response(
                 prediction_response, i_prediction
@@ -2189,6 +2444,36 @@ class _TextEmbeddingModel(_LanguageModel):
             for i_prediction, _ in enumerate(prediction_response.predictions)
         ]
 
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is not installed. Please install numpy to return embeddings "
+            "as NumPy arrays."
+        )
+
+    predictions = prediction_response.predictions
+    if not len(predictions):
+        return numpy.zeros((0, 0), dtype=numpy.float32)
+    # Predictions of pretrained models hold the values with statistics.
+    vectors = [
+        prediction["embeddings"]["values"]
+        if isinstance(prediction, collections.abc.Mapping)
+        else prediction
+        for prediction in predictions
+    ]
+    dimensions = len(vectors[0])
+    if any(len(vector) != dimensions for vector in vectors):
+        raise ValueError(
+            "Embeddings must have the same dimensions to be returned as a NumPy array."
+        )
+    # Filling a preallocated buffer avoids building nested float lists.
+    return numpy.fromiter(
+        itertools.chain.from_iterable(vectors),
+        dtype=numpy.float32,
+        count=len(vectors) * dimensions,
+    ).reshape(len(vectors), dimensions)
+
 
 # TODO(b/625884109): Support Union[str, "pandas.core.frame.DataFrame"]
 # for corpus, queries, test and validation data.
@@ -3086,6 +3371,7 @@ class _ChatSessionBase:
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> Iterator[TextGenerationResponse]:
         """Sends message to the language model and gets a streamed response.
 
@@ -3103,6 +3389,10 @@ class _ChatSessionBase:
                 Uses the value specified when calling `ChatModel.start_chat` by default.
             stop_sequences: Customized stop sequences to stop the decoding process.
                 Uses the value specified when calling `ChatModel.start_chat` by default.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3128,6 +3418,7 @@ class _ChatSessionBase:
             endpoint_name=self._model._endpoint_name,
             instance=prediction_request.instance,
             parameters=prediction_request.parameters,
+            buffer_size=buffer_size,
         ):
             prediction_response = aiplatform.models.Prediction(
                 predictions=[prediction_dict],
@@ -3157,6 +3448,7 @@ class _ChatSessionBase:
         top_k: Optional[int] = None,
         top_p: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> AsyncIterator[TextGenerationResponse]:
         """Asynchronously sends message to the language model and gets a streamed response.
 
@@ -3174,6 +3466,10 @@ class _ChatSessionBase:
                 Uses the value specified when calling `ChatModel.start_chat` by default.
             stop_sequences: Customized stop sequences to stop the decoding process.
                 Uses the value specified when calling `ChatModel.start_chat` by default.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3192,21 +3488,25 @@ class _ChatSessionBase:
 
         full_response_text = ""
 
-        async for prediction_dict in _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
-            prediction_service_async_client=prediction_service_async_client,
-            endpoint_name=self._model._endpoint_name,
-            instance=prediction_request.instance,
-            parameters=prediction_request.parameters,
-        ):
-            prediction_response = aiplatform.models.Prediction(
-                predictions=[prediction_dict],
-                deployed_model_id="",
-            )
-            text_generation_response = self._parse_chat_prediction_response(
-                prediction_response=prediction_response
+        async with _streaming_prediction.aclosing(
+            _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
+                prediction_service_async_client=prediction_service_async_client,
+                endpoint_name=self._model._endpoint_name,
+                instance=prediction_request.instance,
+                parameters=prediction_request.parameters,
+                buffer_size=buffer_size,
             )
-            full_response_text += text_generation_response.text
-            yield text_generation_response
+        ) as prediction_dicts:
+            async for prediction_dict in prediction_dicts:
+                prediction_response = aiplatform.models.Prediction(
+                    predictions=[prediction_dict],
+                    deployed_model_id="",
+                )
+                text_generation_response = self._parse_chat_prediction_response(
+                    prediction_response=prediction_response
+                )
+                full_response_text += text_generation_response.text
+                yield text_generation_response
 
         # We only add the question and answer to the history if/when the answer
         # was read fully. Otherwise, the answer would have been truncated.
@@ -3407,6 +3707,7 @@ class CodeChatSession(_ChatSessionBase):
         max_output_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> Iterator[TextGenerationResponse]:
         """Sends message to the language model and gets a streamed response.
 
@@ -3420,6 +3721,10 @@ class CodeChatSession(_ChatSessionBase):
                 Uses the value specified when calling `ChatModel.start_chat` by default.
             stop_sequences: Customized stop sequences to stop the decoding process.
                 Uses the value specified when calling `ChatModel.start_chat` by default.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Returns:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3430,6 +3735,7 @@ class CodeChatSession(_ChatSessionBase):
             max_output_tokens=max_output_tokens,
             temperature=temperature,
             stop_sequences=stop_sequences,
+            buffer_size=buffer_size,
         )
 
     def send_message_streaming_async(
@@ -3439,6 +3745,7 @@ class CodeChatSession(_ChatSessionBase):
         max_output_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> AsyncIterator[TextGenerationResponse]:
         """Asynchronously sends message to the language model and gets a streamed response.
 
@@ -3452,6 +3759,10 @@ class CodeChatSession(_ChatSessionBase):
                 Uses the value specified when calling `ChatModel.start_chat` by default.
             stop_sequences: Customized stop sequences to stop the decoding process.
                 Uses the value specified when calling `ChatModel.start_chat` by default.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Returns:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3462,6 +3773,7 @@ class CodeChatSession(_ChatSessionBase):
             max_output_tokens=max_output_tokens,
             temperature=temperature,
             stop_sequences=stop_sequences,
+            buffer_size=buffer_size,
         )
 
 
@@ -3621,6 +3933,7 @@ class _CodeGenerationModel(_LanguageModel):
         max_output_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> Iterator[TextGenerationResponse]:
         """Predicts the code based on previous code.
 
@@ -3632,6 +3945,10 @@ class _CodeGenerationModel(_LanguageModel):
             max_output_tokens: Max length of the output text in tokens. Range: [1, 1000].
             temperature: Controls the randomness of predictions. Range: [0, 1].
             stop_sequences: Customized stop sequences to stop the decoding process.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3653,6 +3970,7 @@ class _CodeGenerationModel(_LanguageModel):
             endpoint_name=self._endpoint_name,
             instance=prediction_request.instance,
             parameters=prediction_request.parameters,
+            buffer_size=buffer_size,
         ):
             prediction_obj = aiplatform.models.Prediction(
                 predictions=[prediction_dict],
@@ -3668,6 +3986,7 @@ class _CodeGenerationModel(_LanguageModel):
         max_output_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         stop_sequences: Optional[List[str]] = None,
+        buffer_size: Optional[int] = None,
     ) -> AsyncIterator[TextGenerationResponse]:
         """Asynchronously predicts the code based on previous code.
 
@@ -3679,6 +3998,10 @@ class _CodeGenerationModel(_LanguageModel):
             max_output_tokens: Max length of the output text in tokens. Range: [1, 1000].
             temperature: Controls the randomness of predictions. Range: [0, 1].
             stop_sequences: Customized stop sequences to stop the decoding process.
+            buffer_size: The number of partial responses read ahead of the
+                consumer. Reading stops while the buffer is full. By default,
+                or if 0, responses are only read when the consumer asks for
+                them. Must not be negative.
 
         Yields:
             A stream of `TextGenerationResponse` objects that contain partial
@@ -3693,17 +4016,21 @@ class _CodeGenerationModel(_LanguageModel):
         )
 
         prediction_service_async_client = self._endpoint._prediction_async_client
-        async for prediction_dict in _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
-            prediction_service_async_client=prediction_service_async_client,
-            endpoint_name=self._endpoint_name,
-            instance=prediction_request.instance,
-            parameters=prediction_request.parameters,
-        ):
-            prediction_obj = aiplatform.models.Prediction(
-                predictions=[prediction_dict],
-                deployed_model_id="",
+        async with _streaming_prediction.aclosing(
+            _streaming_prediction.predict_stream_of_dicts_from_single_dict_async(
+                prediction_service_async_client=prediction_service_async_client,
+                endpoint_name=self._endpoint_name,
+                instance=prediction_request.instance,
+                parameters=prediction_request.parameters,
+                buffer_size=buffer_size,
             )
-            yield _parse_text_generation_model_response(prediction_obj)
+        ) as prediction_dicts:
+            async for prediction_dict in prediction_dicts:
+                prediction_obj = aiplatform.models.Prediction(
+                    predictions=[prediction_dict],
+                    deployed_model_id="",
+                )
+                yield _parse_text_generation_model_response(prediction_obj)
 
 
 class _CountTokensCodeGenerationMixin(_LanguageModel):
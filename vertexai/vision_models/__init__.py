@@ -14,6 +14,7 @@
 #
 """Classes for working with vision models."""
 
+from google.cloud.aiplatform.utils.cache_utils import EmbeddingCache
 from vertexai.vision_models._vision_models import (
     Image,
     ImageCaptioningModel,
@@ -27,6 +28,7 @@ from vertexai.vision_models._vision_models import (
 )
 
 __all__ = [
+    "EmbeddingCache",
     "Image",
     "ImageCaptioningModel",
     "ImageQnAModel",
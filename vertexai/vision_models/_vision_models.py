@@ -25,9 +25,12 @@ import typing
 from typing import Any, Dict, List, Literal, Optional, Union
 import urllib
 
+from google.cloud import aiplatform
 from google.cloud import storage
 
 from google.cloud.aiplatform import initializer as aiplatform_initializer
+from google.cloud.aiplatform.utils import _image_utils
+from google.cloud.aiplatform.utils import cache_utils
 from vertexai._model_garden import _model_garden_models
 
 # pylint: disable=g-import-not-at-top
@@ -53,6 +56,9 @@ class Image:
     _loaded_bytes: Optional[bytes] = None
     _loaded_image: Optional["PIL_Image.Image"] = None
     _gcs_uri: Optional[str] = None
+    # Encodings cached until the image bytes are replaced.
+    _base64_string: Optional[str] = None
+    _sniffed_mime_type: Optional[str] = None
 
     def __init__(
         self,
@@ -121,6 +127,9 @@ class Image:
     @_image_bytes.setter
     def _image_bytes(self, value: bytes):
         self._loaded_bytes = value
+        self._loaded_image = None
+        self._base64_string = None
+        self._sniffed_mime_type = None
 
     @property
     def _pil_image(self) -> "PIL_Image.Image":
@@ -141,10 +150,17 @@ class Image:
         """Returns the MIME type of the image."""
         if self._gcs_uri:
             return self._blob.content_type
-        if PIL_Image:
-            return PIL_Image.MIME.get(self._pil_image.format, "image/jpeg")
-        # Fall back to jpeg
-        return "image/jpeg"
+        if self._sniffed_mime_type is None:
+            # The file signature is enough for common formats, PIL is only
+            # needed for the others.
+            mime_type = _image_utils.sniff_mime_type(
+                self._image_bytes[: _image_utils.HEADER_SIZE]
+            )
+            if not mime_type and PIL_Image:
+                mime_type = PIL_Image.MIME.get(self._pil_image.format)
+            # Fall back to jpeg
+            self._sniffed_mime_type = mime_type or "image/jpeg"
+        return self._sniffed_mime_type
 
     def show(self):
         """Shows the image.
@@ -168,10 +184,12 @@ class Image:
         Returns:
             Base64 encoding of the image as a string.
         """
-        # ! b64encode returns `bytes` object, not `str`.
-        # We need to convert `bytes` to `str`, otherwise we get service error:
-        # "received initial metadata size exceeds limit"
-        return base64.b64encode(self._image_bytes).decode("ascii")
+        if self._base64_string is None:
+            # ! b64encode returns `bytes` object, not `str`.
+            # We need to convert `bytes` to `str`, otherwise we get service error:
+            # "received initial metadata size exceeds limit"
+            self._base64_string = base64.b64encode(self._image_bytes).decode("ascii")
+        return self._base64_string
 
 
 class Video:
@@ -180,6 +198,8 @@ class Video:
     __module__ = "vertexai.vision_models"
 
     _loaded_bytes: Optional[bytes] = None
+    # Cached until the video bytes are replaced.
+    _base64_string: Optional[str] = None
     _gcs_uri: Optional[str] = None
 
     def __init__(
@@ -239,6 +259,7 @@ class Video:
     @_video_bytes.setter
     def _video_bytes(self, value: bytes):
         self._loaded_bytes = value
+        self._base64_string = None
 
     @property
     def _mime_type(self) -> str:
@@ -262,10 +283,12 @@ class Video:
         Returns:
             Base64 encoding of the video as a string.
         """
-        # ! b64encode returns `bytes` object, not `str`.
-        # We need to convert `bytes` to `str`, otherwise we get service error:
-        # "received initial metadata size exceeds limit"
-        return base64.b64encode(self._video_bytes).decode("ascii")
+        if self._base64_string is None:
+            # ! b64encode returns `bytes` object, not `str`.
+            # We need to convert `bytes` to `str`, otherwise we get service error:
+            # "received initial metadata size exceeds limit"
+            self._base64_string = base64.b64encode(self._video_bytes).decode("ascii")
+        return self._base64_string
 
 
 class VideoSegmentConfig:
@@ -1119,6 +1142,7 @@ class MultiModalEmbeddingModel(_model_garden_models._ModelGardenModel):
         contextual_text: Optional[str] = None,
         dimension: Optional[int] = None,
         video_segment_config: Optional[VideoSegmentConfig] = None,
+        cache: Optional[cache_utils.EmbeddingCache] = None,
     ) -> "MultiModalEmbeddingResponse":
         """Gets embedding vectors from the provided image.
 
@@ -1140,6 +1164,10 @@ class MultiModalEmbeddingModel(_model_garden_models._ModelGardenModel):
               Available values: `128`, `256`, `512`, and `1408` (default).
             video_segment_config (VideoSegmentConfig): Optional. The specific
               video segments (in seconds) the embeddings are generated for.
+            cache (EmbeddingCache): Optional. The cache of embeddings. The model
+              is only called if the embeddings are not cached. Images and videos
+              referenced by a Cloud Storage URI are not cached, since their
+              content can change.
 
         Returns:
             MultiModalEmbeddingResponse:
@@ -1187,13 +1215,34 @@ class MultiModalEmbeddingModel(_model_garden_models._ModelGardenModel):
         if dimension:
             parameters["dimension"] = dimension
 
-        response = self._endpoint.predict(
-            instances=[instance],
-            parameters=parameters,
-        )
-        image_embedding = response.predictions[0].get("imageEmbedding")
+        cache_key = None
+        prediction = None
+        if (
+            cache is not None
+            and not (image and image._gcs_uri)  # pylint: disable=protected-access
+            and not (video and video._gcs_uri)  # pylint: disable=protected-access
+        ):
+            cache_key = cache_utils.embedding_cache_key(
+                self._endpoint_name, instance, parameters
+            )
+            prediction = cache.get_many([cache_key]).get(cache_key)
+
+        if prediction is None:
+            response = self._endpoint.predict(
+                instances=[instance],
+                parameters=parameters,
+            )
+            prediction = response.predictions[0]
+            if cache_key:
+                cache.put_many({cache_key: prediction})
+        else:
+            response = aiplatform.models.Prediction(
+                predictions=[prediction], deployed_model_id=""
+            )
+
+        image_embedding = prediction.get("imageEmbedding")
         video_embeddings = []
-        for video_embedding in response.predictions[0].get("videoEmbeddings", []):
+        for video_embedding in prediction.get("videoEmbeddings", []):
             video_embeddings.append(
                 VideoEmbedding(
                     embedding=video_embedding["embedding"],
@@ -1202,9 +1251,7 @@ class MultiModalEmbeddingModel(_model_garden_models._ModelGardenModel):
                 )
             )
         text_embedding = (
-            response.predictions[0].get("textEmbedding")
-            if "textEmbedding" in response.predictions[0]
-            else None
+            prediction.get("textEmbedding") if "textEmbedding" in prediction else None
         )
         return MultiModalEmbeddingResponse(
             image_embedding=image_embedding,